@@ -0,0 +1,91 @@
+import pygame
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from DataClasses.Images import ImageResources
+from DataClasses.Pieces import pieceOrder
+
+# The sprite sheet holds one row per color, in the same K Q B N R P order as pieceOrder
+ATLAS_COLUMNS = 6
+ATLAS_ROWS = 2
+
+# Process-wide caches, shared by every game, panel and menu
+_piece_atlas: Dict[str, pygame.Surface] = {}
+_piece_sprites: Dict[int, Dict[str, pygame.Surface]] = {}
+_sounds: Dict[str, pygame.mixer.Sound] = {}
+_fonts: Dict[Tuple[Optional[str], int, bool], pygame.font.Font] = {}
+_board_surfaces: Dict[Tuple[int, Tuple[int, int, int], Tuple[int, int, int]], pygame.Surface] = {}
+
+
+def _prepare(surface: pygame.Surface) -> pygame.Surface:
+    """Convert to the display's pixel format for fast blits, when there is a display"""
+    return surface.convert_alpha() if pygame.display.get_surface() else surface
+
+
+def get_piece_atlas() -> Dict[str, pygame.Surface]:
+    """Load the sprite sheet once and cut it into one subsurface per piece"""
+    if not _piece_atlas:
+        sheet = _prepare(pygame.image.load(ImageResources.PIECES.value))
+        width, height = sheet.get_size()
+        for i, piece_key in enumerate(pieceOrder):
+            column, row = i % ATLAS_COLUMNS, i // ATLAS_COLUMNS
+            # Cells are not a whole number of pixels wide, so round each edge
+            left = round(column * width / ATLAS_COLUMNS)
+            right = round((column + 1) * width / ATLAS_COLUMNS)
+            top = round(row * height / ATLAS_ROWS)
+            bottom = round((row + 1) * height / ATLAS_ROWS)
+            _piece_atlas[piece_key] = sheet.subsurface(pygame.Rect(left, top, right - left, bottom - top))
+    return _piece_atlas
+
+
+def get_piece_sprites(size: int) -> Dict[str, pygame.Surface]:
+    """Piece sprites pre-scaled to size x size, built once per size"""
+    if size not in _piece_sprites:
+        _piece_sprites[size] = {
+            piece_key: pygame.transform.smoothscale(sprite, (size, size))
+            for piece_key, sprite in get_piece_atlas().items()
+        }
+    return _piece_sprites[size]
+
+
+def get_board_surface(slot_size: int, light: Tuple[int, int, int], dark: Tuple[int, int, int]) -> pygame.Surface:
+    """The empty 8x8 board, rendered once per size and color scheme"""
+    key = (slot_size, light, dark)
+    if key not in _board_surfaces:
+        surface = pygame.Surface((slot_size * 8, slot_size * 8))
+        for x in range(8):
+            for y in range(8):
+                color = light if (x + y) % 2 == 0 else dark
+                pygame.draw.rect(surface, color, (x * slot_size, y * slot_size, slot_size, slot_size))
+        _board_surfaces[key] = surface.convert() if pygame.display.get_surface() else surface
+    return _board_surfaces[key]
+
+
+def get_sound(path: str) -> pygame.mixer.Sound:
+    """Load a sound effect once per process"""
+    if path not in _sounds:
+        _sounds[path] = pygame.mixer.Sound(path)
+    return _sounds[path]
+
+
+def get_font(name: Optional[str], size: int, bold: bool = False) -> pygame.font.Font:
+    """Shared font instances; a name of None means pygame's default font"""
+    key = (name, size, bold)
+    if key not in _fonts:
+        if name is None:
+            font = pygame.font.Font(None, size)
+            font.set_bold(bold)
+        else:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = font
+    return _fonts[key]
+
+
+@lru_cache(maxsize=1024)
+def render_text(font: pygame.font.Font, text: str, color: Tuple[int, ...]) -> pygame.Surface:
+    """Antialiased text, rasterized once per (font, text, color) and then reused.
+
+    Fonts come from get_font, so the same font is always the same cache key.
+    Callers must treat the returned surface as read-only.
+    """
+    return font.render(text, True, color)
@@ -0,0 +1,176 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import chess
+
+# A small alpha-beta engine on python-chess for matches and tests: no
+# Stockfish, no subprocess, and deterministic for a given depth. It plays
+# weak but sensible chess (material, piece-square tables, quiescence search).
+MATE_SCORE = 100_000
+PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330, chess.ROOK: 500, chess.QUEEN: 900,
+                chess.KING: 0}
+
+# Piece-square tables from White's side, rank 8 first (as printed on a diagram)
+_TABLES = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20],
+    chess.ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0],
+    chess.QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20],
+}
+
+# Piece value plus placement, per (piece type, color, square) with a1 = 0
+_SQUARE_VALUES = {
+    (piece_type, color): [
+        PIECE_VALUES[piece_type] + table[chess.square_mirror(square) if color == chess.WHITE else square]
+        for square in chess.SQUARES
+    ]
+    for piece_type, table in _TABLES.items()
+    for color in chess.COLORS
+}
+
+
+@dataclass
+class SearchResult:
+    move: Optional[chess.Move]
+    score: int  # Centipawns for the side to move; +/- MATE_SCORE minus plies for mates
+    depth: int
+    nodes: int
+    pv: List[chess.Move]
+
+
+def evaluate(board: chess.Board) -> int:
+    """Static evaluation in centipawns for the side to move"""
+    score = 0
+    for square, piece in board.piece_map().items():
+        value = _SQUARE_VALUES[piece.piece_type, piece.color][square]
+        score += value if piece.color == chess.WHITE else -value
+    return score if board.turn == chess.WHITE else -score
+
+
+class BuiltinEngine:
+    """Iterative-deepening negamax with alpha-beta pruning and a captures-only quiescence search"""
+
+    def __init__(self, depth: int = 3):
+        self.depth = depth
+        self.nodes = 0
+
+    def play(self, board: chess.Board) -> SearchResult:
+        """Search board to self.depth and return the best move"""
+        self.nodes = 0
+        board = board.copy(stack=True)
+        pv: List[chess.Move] = []
+        score = 0
+        for depth in range(1, self.depth + 1):
+            # The previous iteration's principal variation is searched first
+            score, pv = self._negamax(board, depth, -MATE_SCORE - 1, MATE_SCORE + 1, 0, pv)
+        return SearchResult(move=pv[0] if pv else None, score=score, depth=self.depth, nodes=self.nodes, pv=pv)
+
+    def _negamax(self, board: chess.Board, depth: int, alpha: int, beta: int, ply: int,
+                 pv_hint: List[chess.Move]) -> Tuple[int, List[chess.Move]]:
+        self.nodes += 1
+        if ply > 0 and (board.is_repetition(2) or board.halfmove_clock >= 100 or board.is_insufficient_material()):
+            return 0, []
+        if depth == 0:
+            return self._quiesce(board, alpha, beta), []
+
+        moves = self._ordered_moves(board, pv_hint[0] if pv_hint else None)
+        if not moves:
+            return (-(MATE_SCORE - ply) if board.is_check() else 0), []
+
+        best_pv: List[chess.Move] = []
+        for move in moves:
+            board.push(move)
+            hint = pv_hint[1:] if pv_hint and move == pv_hint[0] else []
+            score, line = self._negamax(board, depth - 1, -beta, -alpha, ply + 1, hint)
+            score = -score
+            board.pop()
+            if score > alpha:
+                alpha = score
+                best_pv = [move] + line
+                if alpha >= beta:
+                    break
+        if not best_pv:
+            best_pv = [moves[0]]  # Every move fails low; still return one
+        return alpha, best_pv
+
+    def _quiesce(self, board: chess.Board, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        stand_pat = evaluate(board)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        for move in self._ordered_moves(board, None, captures_only=True):
+            board.push(move)
+            score = -self._quiesce(board, -beta, -alpha)
+            board.pop()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    @staticmethod
+    def _ordered_moves(board: chess.Board, first: Optional[chess.Move], captures_only: bool = False) -> List[chess.Move]:
+        """Hint first, then captures by most valuable victim / least valuable attacker, then quiet moves"""
+        moves = board.generate_legal_captures() if captures_only else board.legal_moves
+
+        def key(move: chess.Move) -> int:
+            if move == first:
+                return -10_000
+            order = 0
+            if move.promotion:
+                order -= PIECE_VALUES[move.promotion]
+            if board.is_capture(move):
+                victim = board.piece_type_at(move.to_square) or chess.PAWN  # En passant
+                order -= 10 * PIECE_VALUES[victim] - PIECE_VALUES[board.piece_type_at(move.from_square)]
+            return order
+        return sorted(moves, key=key)
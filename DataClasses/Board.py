@@ -2,6 +2,9 @@
 from typing import List, Tuple, Dict, Optional
 from . import Pieces
 from copy import deepcopy
+from Diagnostics import get_logger
+
+log = get_logger("board")
 
 class Board:
     def __init__(self):
@@ -36,9 +39,14 @@ class Board:
         
     def copy(self) -> 'Board':
         """Create a deep copy of the current board state."""
-        board_copy = Board()
-        board_copy.board = deepcopy(self.board)
-        board_copy.moved_pieces = deepcopy(self.moved_pieces)
+        # Rows hold strings and the flags are plain bools, so shallow copies of each
+        # are deep; skipping __init__ and deepcopy makes this the cheap path that
+        # move generation and the mate search take for every candidate move
+        board_copy = Board.__new__(Board)
+        board_copy.board = [row[:] for row in self.board]
+        board_copy.OriginalBoard = self.OriginalBoard  # Never modified once set up
+        board_copy.previous_states = []
+        board_copy.moved_pieces = dict(self.moved_pieces)
         board_copy.LastMove = self.LastMove
         board_copy.en_passant_target = self.en_passant_target
         return board_copy
@@ -135,8 +143,11 @@ class Board:
     
     def printBoard(self) -> None:
         """Print the current state of the board to the console."""
-        for row in self.board:
-            print(row)
+        print(self.boardText())
+
+    def boardText(self) -> str:
+        """The current state of the board, one row per line."""
+        return "\n".join(str(row) for row in self.board)
             
     def generateDefaultBoard(self) -> None:
         """Generate a default chess board."""
@@ -153,18 +164,67 @@ class Board:
         ]
         # Save initial state
         self.OriginalBoard = deepcopy(self.board)
-        print("Board initialized with pieces:")  # Debug print
-        self.printBoard()  # Debug print
+        if log.debug_enabled:
+            log.debug("Board initialized with pieces:\n%s", self.boardText())
+
+    def loadFen(self, fen: str) -> str:
+        """
+        Set up the board from a FEN string.
+        Castling rights and the en passant square are carried over; returns the side to move ("White" or "Black").
+        """
+        fields = fen.split()
+        ranks = fields[0].split('/')
+        if len(ranks) != 8:
+            raise ValueError(f"Invalid FEN piece placement: {fields[0]}")
+
+        board = []
+        for rank in ranks:  # FEN lists rank 8 first, matching row 0
+            row = []
+            for symbol in rank:
+                if symbol.isdigit():
+                    row.extend(['-'] * int(symbol))
+                elif symbol.upper() in 'KQBNRP':
+                    row.append(('W' if symbol.isupper() else 'B') + symbol.upper())
+                else:
+                    raise ValueError(f"Invalid FEN piece: {symbol}")
+            if len(row) != 8:
+                raise ValueError(f"Invalid FEN rank: {rank}")
+            board.append(row)
+
+        self.board = board
+        self.OriginalBoard = deepcopy(board)
+        self.previous_states = []
+        self.LastMove = ((-1, -1), (-1, -1))
+
+        # Pieces without castling rights are treated as having moved
+        castling = fields[2] if len(fields) > 2 else '-'
+        self.moved_pieces = {
+            'WK': 'K' not in castling and 'Q' not in castling,
+            'BK': 'k' not in castling and 'q' not in castling,
+            'WR1': 'Q' not in castling,
+            'WR2': 'K' not in castling,
+            'BR1': 'q' not in castling,
+            'BR2': 'k' not in castling
+        }
+
+        en_passant = fields[3] if len(fields) > 3 else '-'
+        if en_passant != '-':
+            self.en_passant_target = ('abcdefgh'.index(en_passant[0]), 8 - int(en_passant[1]))
+        else:
+            self.en_passant_target = None
+
+        return "Black" if len(fields) > 1 and fields[1] == 'b' else "White"
 
     def movePiece(self, x1: int, y1: int, x2: int, y2: int) -> None:
         """Move a piece from one position to another."""
         if not (0 <= x1 < 8 and 0 <= y1 < 8 and 0 <= x2 < 8 and 0 <= y2 < 8):
-            print(f"Invalid move coordinates: ({x1}, {y1}) -> ({x2}, {y2})")  # Debug print
+            log.debug("Invalid move coordinates: (%d, %d) -> (%d, %d)", x1, y1, x2, y2)
             return
             
         piece = self.getPiece(x1, y1)
         if piece:
-            print(f"Moving {piece.Type.value} from ({x1}, {y1}) to ({x2}, {y2})")  # Debug print
+            if log.debug_enabled:
+                log.debug("Moving %s from (%d, %d) to (%d, %d)", piece.Type.value, x1, y1, x2, y2)
             # Save the current state
             self.previous_states.append(self.copy())
             # Update the board
@@ -172,10 +232,10 @@ class Board:
             self.removePiece(x1, y1)
             # Update last move
             self.LastMove = ((x1, y1), (x2, y2))
-            print("Board after move:")  # Debug print
-            self.printBoard()  # Debug print
+            if log.debug_enabled:
+                log.debug("Board after move:\n%s", self.boardText())
         else:
-            print(f"No piece found at ({x1}, {y1})")  # Debug print
+            log.debug("No piece found at (%d, %d)", x1, y1)
 
     def undoMove(self) -> None:
         """Undo the last move if possible."""
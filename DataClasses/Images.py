@@ -5,10 +5,19 @@ import sys
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
-    try:
+    if hasattr(sys, '_MEIPASS'):
+        # PyInstaller path
         base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
+    elif getattr(sys, 'frozen', False):
+        # macOS app bundle Resources path
+        bundle_dir = os.path.abspath(os.path.dirname(sys.executable))
+        if bundle_dir.endswith('MacOS'):
+            base_path = os.path.abspath(os.path.join(bundle_dir, '..', 'Resources'))
+        else:
+            base_path = bundle_dir
+    else:
+        # The project root, so the game can be started from any directory
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     return os.path.join(base_path, relative_path)
 
 
@@ -16,4 +25,4 @@ class ImageResources(Enum):
     """Enum containing paths to image resources"""
     ICON = resource_path(os.path.join("res", "icon.png"))
     BOARD = resource_path(os.path.join("res", "board.png"))
-    PIECES = resource_path(os.path.join("res", "piece.png"))
+    PIECES = resource_path(os.path.join("res", "pieces.png"))
@@ -0,0 +1,129 @@
+# Move History Class
+import time
+from array import array
+from enum import IntFlag
+from typing import Iterator, List, Optional
+
+import chess
+
+
+class MoveFlags(IntFlag):
+    NONE = 0
+    CASTLING = 1
+    EN_PASSANT = 2
+
+
+class MoveRecord:
+    """One ply of a MoveHistory, unpacked on access"""
+    __slots__ = ("ply", "from_square", "to_square", "promotion", "captured", "flags", "timestamp", "player")
+
+    def __init__(self, ply: int, code: int, captured: int, flags: int, timestamp: float, player: str):
+        self.ply = ply
+        self.from_square: int = code & 0x3F  # python-chess square index (a1 = 0)
+        self.to_square: int = (code >> 6) & 0x3F
+        self.promotion: int = code >> 12  # python-chess piece type, 0 for none
+        self.captured: int = captured  # python-chess piece type, 0 for none
+        self.flags = MoveFlags(flags)
+        self.timestamp = timestamp  # time.monotonic() when the move was played
+        self.player = player  # "White" or "Black"
+
+    @property
+    def turn_number(self) -> int:
+        return self.ply // 2 + 1
+
+    @property
+    def uci(self) -> str:
+        return (chess.SQUARE_NAMES[self.from_square] + chess.SQUARE_NAMES[self.to_square]
+                + (chess.piece_symbol(self.promotion) if self.promotion else ""))
+
+
+class MoveHistory:
+    """The moves of a game, packed into parallel arrays (12 bytes per ply).
+
+    Moves use the GameArchive encoding, from | to << 6 | promotion << 12.
+    Access by ply is O(1), undo truncates the arrays in place, and UCI and
+    SAN strings are only built when asked for.
+    """
+    __slots__ = ("start_fen", "white_first", "_moves", "_captured", "_flags", "_timestamps")
+
+    def __init__(self, start_fen: Optional[str] = None):
+        self.start_fen = start_fen  # None for the standard starting position
+        self.white_first: bool = start_fen is None or start_fen.split()[1:2] != ["b"]
+        self._moves = array("H")
+        self._captured = array("B")
+        self._flags = array("B")
+        self._timestamps = array("d")
+
+    def append(self, from_square: int, to_square: int, promotion: int = 0, captured: int = 0,
+               flags: MoveFlags = MoveFlags.NONE, timestamp: Optional[float] = None) -> int:
+        """Record a move (squares and piece types as in python-chess); returns its ply"""
+        self._moves.append(from_square | (to_square << 6) | (promotion << 12))
+        self._captured.append(captured)
+        self._flags.append(flags)
+        self._timestamps.append(time.monotonic() if timestamp is None else timestamp)
+        return len(self._moves) - 1
+
+    def set_promotion(self, ply: int, promotion: int) -> None:
+        """Set the piece a pawn promoted to, once it has been chosen"""
+        self._moves[ply] = (self._moves[ply] & 0xFFF) | (promotion << 12)
+
+    def truncate(self, ply: int) -> None:
+        """Drop every move from ply on (undo)"""
+        del self._moves[ply:]
+        del self._captured[ply:]
+        del self._flags[ply:]
+        del self._timestamps[ply:]
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def __bool__(self) -> bool:
+        return len(self._moves) > 0
+
+    def __getitem__(self, ply: int) -> MoveRecord:
+        if ply < 0:
+            ply += len(self._moves)
+        if not 0 <= ply < len(self._moves):
+            raise IndexError(f"No move at ply {ply}")
+        return MoveRecord(ply, self._moves[ply], self._captured[ply], self._flags[ply], self._timestamps[ply],
+                          self.player(ply))
+
+    def __iter__(self) -> Iterator[MoveRecord]:
+        return (self[ply] for ply in range(len(self._moves)))
+
+    def player(self, ply: int) -> str:
+        """Who plays the move at ply"""
+        return "White" if (ply % 2 == 0) == self.white_first else "Black"
+
+    def uci(self, ply: int) -> str:
+        return self[ply].uci
+
+    def uci_moves(self) -> List[str]:
+        return [self.uci(ply) for ply in range(len(self._moves))]
+
+    def board(self, ply: Optional[int] = None) -> chess.Board:
+        """The position before the move at ply (after the last move by default)"""
+        board = chess.Board(self.start_fen) if self.start_fen else chess.Board()
+        for code in self._moves[:ply]:
+            board.push(_to_move(code))
+        return board
+
+    def san(self, ply: int) -> str:
+        """Standard algebraic notation of one move (replays the game up to it)"""
+        if ply < 0:
+            ply += len(self._moves)
+        return self.board(ply).san(_to_move(self._moves[ply]))
+
+    def san_moves(self) -> List[str]:
+        """Standard algebraic notation of every move, in one replay"""
+        board = chess.Board(self.start_fen) if self.start_fen else chess.Board()
+        sans = []
+        for code in self._moves:
+            move = _to_move(code)
+            sans.append(board.san(move))
+            board.push(move)
+        return sans
+
+
+def _to_move(code: int) -> chess.Move:
+    return chess.Move(code & 0x3F, (code >> 6) & 0x3F, (code >> 12) or None)
@@ -1,9 +1,8 @@
-from .Images import ImageResources
+from .Images import ImageResources, resource_path
 from dataclasses import dataclass
 from enum import Enum, auto
 from typing import Dict, Union, Final
 import os
-import sys
 
 class PieceColor(Enum):
     WHITE = "White"
@@ -38,9 +37,6 @@ class PieceImage:
     Type: PieceType  # The type of piece
     Color: PieceColor  # The color of the piece
 
-# Dictionary mapping piece identifiers to their PieceImage objects
-pieces: Dict[str, PieceImage] = {}
-
 # Mapping of piece identifiers to their types
 pieceOrder: Final[Dict[str, PieceType]] = {
     "WK": PieceType.KING,
@@ -57,35 +53,16 @@ pieceOrder: Final[Dict[str, PieceType]] = {
     "BP": PieceType.PAWN
 }
 
-import re
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# Function to extract the number from the filename
-def extract_number(filename: str) -> int:
-    match = re.search(r'Piece_(\d+)\.png', filename)
-    return int(match.group(1)) if match else float('inf')
-
-# Sort files by the numeric value in their names
+# res/ChessPieces holds Piece_1.png ... Piece_12.png in pieceOrder order
 chess_pieces_path = resource_path("res/ChessPieces")
-files = sorted(os.listdir(chess_pieces_path), key=extract_number)
 
-for i, file in enumerate(files):
-    if file.endswith(".png"):
-        piece_key = list(pieceOrder.keys())[i]
-        piece_color = PieceColor.WHITE if piece_key.startswith("W") else PieceColor.BLACK
-        
-        piece = PieceImage(
-            Name=piece_key,
-            Image=os.path.join(chess_pieces_path, file),
-            Type=pieceOrder[piece_key],
-            Color=piece_color
-        )
-        pieces[piece_key] = piece
\ No newline at end of file
+# Dictionary mapping piece identifiers to their PieceImage objects
+pieces: Dict[str, PieceImage] = {
+    piece_key: PieceImage(
+        Name=piece_key,
+        Image=os.path.join(chess_pieces_path, f"Piece_{i}.png"),
+        Type=piece_type,
+        Color=PieceColor.WHITE if piece_key.startswith("W") else PieceColor.BLACK
+    )
+    for i, (piece_key, piece_type) in enumerate(pieceOrder.items(), start=1)
+}
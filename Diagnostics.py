@@ -0,0 +1,145 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Callable, Dict, Optional, Tuple
+
+# Diagnostics for the game and the engine code, on top of the standard logging module.
+#
+#   log = get_logger("movegen")
+#   if log.debug_enabled:                      # A plain attribute check while disabled
+#       log.debug("Found %d moves: %s", len(moves), moves)
+#
+# Messages are %-formatted only when a record is emitted; lazy() defers more
+# expensive arguments. Levels are set per channel ("movegen=debug,engine=info"),
+# and the optional file sink writes from a background thread, so logging never
+# waits on the disk in the game loop.
+ROOT = "chessai"
+DEFAULT_LEVEL = logging.WARNING
+CONSOLE_FORMAT = "[%(name)s] %(message)s"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(threadName)s %(name)s: %(message)s"
+LOG_FILE_BYTES = 5 * 1024 * 1024  # Rotated once past this, keeping LOG_FILE_BACKUPS old files
+LOG_FILE_BACKUPS = 2
+
+
+class lazy:
+    """Log argument computed only if the message is actually formatted"""
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], object]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+
+class Channel:
+    """A named logger plus cached level flags for cheap guards"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.logger = logging.getLogger(f"{ROOT}.{name}")
+        self.debug_enabled = False
+        self.info_enabled = False
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read the level flags (after configure())"""
+        self.debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        self.info_enabled = self.logger.isEnabledFor(logging.INFO)
+
+    def debug(self, msg: str, *args) -> None:
+        if self.debug_enabled:
+            self.logger.debug(msg, *args)
+
+    def info(self, msg: str, *args) -> None:
+        if self.info_enabled:
+            self.logger.info(msg, *args)
+
+    def warning(self, msg: str, *args) -> None:
+        self.logger.warning(msg, *args)
+
+    def error(self, msg: str, *args) -> None:
+        self.logger.error(msg, *args)
+
+    def exception(self, msg: str, *args) -> None:
+        """An error with the current exception's traceback"""
+        self.logger.exception(msg, *args)
+
+
+_channels: Dict[str, Channel] = {}
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(name: str) -> Channel:
+    """The channel for one part of the game, e.g. "movegen", "sync" or "engine\""""
+    channel = _channels.get(name)
+    if channel is None:
+        channel = _channels[name] = Channel(name)
+    return channel
+
+
+def parse_levels(spec: str) -> Tuple[Optional[int], Dict[str, int]]:
+    """Parse "info,movegen=debug,sync=debug" into a default level and per-channel levels"""
+    default = None
+    levels = {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = part.rpartition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Unknown log level: {level}")
+        if name:
+            levels[name.strip()] = value
+        else:
+            default = value
+    return default, levels
+
+
+def configure(spec: str = "", log_file: Optional[str] = None, console: bool = True) -> None:
+    """Set levels from a spec (see parse_levels) and attach the console and file sinks"""
+    global _listener
+    default, levels = parse_levels(spec)
+    root = logging.getLogger(ROOT)
+    root.setLevel(DEFAULT_LEVEL if default is None else default)
+    root.propagate = False
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith(ROOT + "."):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, level in levels.items():
+        logging.getLogger(f"{ROOT}.{name}").setLevel(level)
+
+    shutdown()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if console:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        root.addHandler(handler)
+    if log_file:
+        # The game loop only enqueues records; the listener thread formats and writes them
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=LOG_FILE_BYTES,
+                                                            backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+        _listener.start()
+
+    for channel in _channels.values():
+        channel.refresh()
+
+
+def shutdown() -> None:
+    """Flush and stop the file sink's thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown)
+
+# Warnings and errors reach the console before configure() is called
+configure()
@@ -0,0 +1,188 @@
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import chess
+
+from Diagnostics import get_logger
+
+log = get_logger("engine")
+
+# Forced mates are clamped to this many centipawns for the evaluation bar
+MATE_SCORE = 10000
+
+
+@dataclass
+class AnalysisLine:
+    """One principal variation reported by the engine"""
+    score: int  # Centipawns from White's point of view
+    mate: Optional[int]  # Moves to mate from White's point of view, if any
+    depth: int
+    pv: List[str] = field(default_factory=list)  # SAN moves
+
+
+@dataclass
+class AnalysisSnapshot:
+    """The latest analysis of one position"""
+    fen: str
+    depth: int = 0
+    lines: List[AnalysisLine] = field(default_factory=list)
+    version: int = 0  # Increases each time the snapshot changes
+
+
+class LiveAnalysis:
+    """Runs an infinite engine search on the current position in a background thread.
+
+    The game loop calls set_position() whenever the board changes and polls
+    snapshot() when it wants to redraw; neither call ever waits on the engine.
+    """
+
+    def __init__(self, engine_path: str, multipv: int = 3, max_pv_moves: int = 6):
+        self.engine_path = engine_path
+        self.multipv = multipv
+        self.max_pv_moves = max_pv_moves
+        self.error: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._position_changed = threading.Event()
+        self._board: Optional[chess.Board] = None
+        self._analysis: Optional[chess.engine.SimpleAnalysisResult] = None
+        self._snapshot: Optional[AnalysisSnapshot] = None
+        self._version = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Spawn the engine and start analysing in the background"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="LiveAnalysis", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the search and shut the engine down"""
+        self._running = False
+        with self._lock:
+            if self._analysis:
+                self._analysis.stop()
+        self._position_changed.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def set_position(self, board: chess.Board) -> None:
+        """Restart the search on a new position (ignored if it has not changed)"""
+        with self._lock:
+            if self._board is not None and self._board.fen() == board.fen():
+                return
+            self._board = board.copy(stack=False)
+            self._version += 1
+            self._snapshot = AnalysisSnapshot(fen=self._board.fen(), version=self._version)
+            if self._analysis:
+                self._analysis.stop()
+        self._position_changed.set()
+
+    def snapshot(self) -> Optional[AnalysisSnapshot]:
+        """Latest analysis of the current position (cheap, never blocks on the engine)"""
+        with self._lock:
+            return self._snapshot
+
+    def _run(self) -> None:
+        # The game imports this module for its score helpers, so the engine
+        # protocol (and asyncio with it) is only loaded once analysis starts
+        import chess.engine
+
+        try:
+            engine = chess.engine.SimpleEngine.popen_uci(self.engine_path, timeout=10.0)
+        except Exception as e:
+            self.error = f"Could not start analysis engine: {e}"
+            log.error("%s", self.error)
+            self._running = False
+            return
+
+        try:
+            multipv = min(self.multipv, engine.options["MultiPV"].max) if "MultiPV" in engine.options else 1
+            while self._running:
+                self._position_changed.wait()
+                self._position_changed.clear()
+                with self._lock:
+                    board = self._board
+                if board is None or not self._running or board.is_game_over():
+                    continue
+
+                # Starting a search waits on the engine, so it happens outside the lock
+                analysis = engine.analysis(board, multipv=multipv)
+                with self._lock:
+                    self._analysis = analysis
+                    # The position may have moved on while the search was starting
+                    if self._board is not board or not self._running:
+                        analysis.stop()
+
+                with analysis:
+                    for info in analysis:
+                        self._publish(board, info)
+                with self._lock:
+                    self._analysis = None
+        except chess.engine.EngineError as e:
+            self.error = f"Analysis engine failed: {e}"
+            log.error("%s", self.error)
+        finally:
+            try:
+                engine.quit()
+            except Exception:
+                engine.close()
+
+    def _publish(self, board: chess.Board, info: dict) -> None:
+        """Fold one engine info line into the shared snapshot"""
+        if "score" not in info or "pv" not in info:
+            return
+        score = info["score"].white()
+        pv_board = board.copy(stack=False)
+        pv = []
+        for move in info["pv"][:self.max_pv_moves]:
+            if not pv_board.is_legal(move):
+                break
+            pv.append(pv_board.san(move))
+            pv_board.push(move)
+        line = AnalysisLine(
+            score=score.score(mate_score=MATE_SCORE),
+            mate=score.mate(),
+            depth=info.get("depth", 0),
+            pv=pv
+        )
+
+        index = info.get("multipv", 1) - 1
+        with self._lock:
+            # Drop lines from a search that was superseded by a new position
+            if self._board is not board or self._snapshot is None:
+                return
+            lines = list(self._snapshot.lines)
+            while len(lines) <= index:
+                lines.append(line)
+            lines[index] = line
+            self._version += 1
+            self._snapshot = AnalysisSnapshot(
+                fen=self._snapshot.fen,
+                depth=max(self._snapshot.depth, line.depth),
+                lines=lines,
+                version=self._version
+            )
+
+
+def format_score(line: AnalysisLine) -> str:
+    """Format a line's score the way analysis boards usually do (+1.25, -M3)"""
+    if line.mate is not None:
+        return f"M{line.mate}" if line.mate > 0 else f"-M{-line.mate}"
+    return f"{line.score / 100:+.2f}"
+
+
+def white_win_fraction(line: Optional[AnalysisLine]) -> float:
+    """Map a score onto 0..1 for the evaluation bar (0.5 is equal)"""
+    if line is None:
+        return 0.5
+    if line.mate is not None:
+        return 1.0 if line.mate > 0 else 0.0
+    # Logistic curve: +4 pawns fills roughly 90% of the bar
+    return 1.0 / (1.0 + 10 ** (-line.score / 400))
+
@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, Optional
+
+import chess
+import chess.engine
+
+from StockfishDifficulty import StockfishDifficulty, DIFFICULTY_PROFILES
+from StockfishDownloader import get_stockfish_dir, get_stockfish_path
+from Diagnostics import get_logger
+
+log = get_logger("engine")
+
+# Single-thread nodes/sec assumed until this host has been calibrated
+DEFAULT_NPS = 500_000
+
+# Replies may overrun their target latency by this factor before the search is
+# cut short; only then does the reply depend on machine load.
+LATENCY_CAP_FACTOR = 4.0
+
+# Middlegame and endgame positions used to measure search speed
+CALIBRATION_POSITIONS = [
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP2BPPP/R2QKB1R w KQ - 0 8",
+    "2r2rk1/pp1bqppp/2n1pn2/3p4/3P4/2PBPN2/P2N1PPP/R2Q1RK1 w - - 4 13",
+    "8/5pk1/6p1/3P4/1p3P2/1P4P1/5K2/8 w - - 0 45",
+]
+
+
+@dataclass
+class Calibration:
+    """Node budgets measured for one engine on one host"""
+    engine: str
+    nps: int
+    node_budgets: Dict[str, int] = field(default_factory=dict)  # StockfishDifficulty name -> nodes
+    created: str = ""
+
+
+def get_calibration_path() -> str:
+    """Where calibration results are stored (override with CHESS_AI_CALIBRATION)"""
+    return os.environ.get("CHESS_AI_CALIBRATION") or os.path.join(
+        os.path.dirname(get_stockfish_dir()), "calibration.json"
+    )
+
+
+def load_calibration(path: Optional[str] = None) -> Optional[Calibration]:
+    """Load stored calibration, or None if this host has not been calibrated"""
+    path = path or get_calibration_path()
+    try:
+        with open(path, "r") as f:
+            return Calibration(**json.load(f))
+    except (OSError, ValueError, TypeError) as e:
+        if os.path.exists(path):
+            log.warning("Ignoring unreadable calibration file %s: %s", path, e)
+        return None
+
+
+def save_calibration(calibration: Calibration, path: Optional[str] = None) -> str:
+    """Write calibration results, replacing any previous file atomically"""
+    path = path or get_calibration_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(asdict(calibration), f, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+def node_budget(difficulty: StockfishDifficulty, calibration: Optional[Calibration] = None) -> int:
+    """Nodes to search per reply for a difficulty level"""
+    if calibration and difficulty.name in calibration.node_budgets:
+        return calibration.node_budgets[difficulty.name]
+    return int(DEFAULT_NPS * DIFFICULTY_PROFILES[difficulty].target_latency)
+
+
+def engine_limit(difficulty: StockfishDifficulty, calibration: Optional[Calibration] = None) -> chess.engine.Limit:
+    """Search limit for a reply: the node budget, with a time cap as a safety net"""
+    profile = DIFFICULTY_PROFILES[difficulty]
+    return chess.engine.Limit(
+        nodes=node_budget(difficulty, calibration),
+        time=profile.target_latency * LATENCY_CAP_FACTOR
+    )
+
+
+def configure_engine(engine: chess.engine.SimpleEngine, difficulty: StockfishDifficulty) -> None:
+    """Apply a difficulty's strength settings to an engine.
+
+    Searches run on one thread: node counts, and therefore moves, are only
+    reproducible when the search is not split across threads.
+    """
+    profile = DIFFICULTY_PROFILES[difficulty]
+    options = engine.options
+    settings = {"Threads": 1, "Hash": profile.hash_mb}
+
+    if profile.elo is not None and "UCI_LimitStrength" in options and "UCI_Elo" in options:
+        elo_option = options["UCI_Elo"]
+        settings["UCI_LimitStrength"] = True
+        settings["UCI_Elo"] = max(elo_option.min, min(elo_option.max, profile.elo))
+    elif "Skill Level" in options:
+        settings["Skill Level"] = profile.skill_level
+    if profile.elo is None and "UCI_LimitStrength" in options:
+        settings["UCI_LimitStrength"] = False
+
+    engine.configure({name: value for name, value in settings.items() if name in options})
+
+
+def measure_nps(engine: chess.engine.SimpleEngine, seconds_per_position: float = 1.0) -> int:
+    """Measure single-thread search speed over the calibration positions"""
+    engine.configure({name: value for name, value in {"Threads": 1, "Hash": 16}.items() if name in engine.options})
+    total_nodes = 0
+    total_time = 0.0
+    for fen in CALIBRATION_POSITIONS:
+        board = chess.Board(fen)
+        start = time.perf_counter()
+        info = engine.analyse(board, chess.engine.Limit(time=seconds_per_position), game=object())
+        elapsed = time.perf_counter() - start
+        total_nodes += info.get("nodes", 0)
+        total_time += info["time"] if info.get("time") else elapsed
+    if total_nodes == 0 or total_time <= 0:
+        raise RuntimeError("Engine did not report node counts")
+    return int(total_nodes / total_time)
+
+
+def calibrate(engine_path: str, seconds_per_position: float = 1.0) -> Calibration:
+    """Benchmark this host and derive a node budget for each difficulty"""
+    engine = chess.engine.SimpleEngine.popen_uci(engine_path, timeout=10.0)
+    try:
+        nps = measure_nps(engine, seconds_per_position)
+        return Calibration(
+            engine=engine.id.get("name", os.path.basename(engine_path)),
+            nps=nps,
+            node_budgets={
+                difficulty.name: max(1, int(nps * profile.target_latency))
+                for difficulty, profile in DIFFICULTY_PROFILES.items()
+            },
+            created=datetime.now().isoformat(timespec="seconds")
+        )
+    finally:
+        engine.quit()
+
+
+def measure_reply_latency(engine_path: str, calibration: Calibration) -> Dict[StockfishDifficulty, float]:
+    """Average reply time for each difficulty with its calibrated settings"""
+    latencies = {}
+    engine = chess.engine.SimpleEngine.popen_uci(engine_path, timeout=10.0)
+    try:
+        for difficulty in StockfishDifficulty:
+            configure_engine(engine, difficulty)
+            limit = engine_limit(difficulty, calibration)
+            start = time.perf_counter()
+            for fen in CALIBRATION_POSITIONS:
+                engine.play(chess.Board(fen), limit, game=object())
+            latencies[difficulty] = (time.perf_counter() - start) / len(CALIBRATION_POSITIONS)
+    finally:
+        engine.quit()
+    return latencies
+
+
+def build_parser(parser) -> None:
+    """Add the calibrate command's arguments to an argparse parser"""
+    parser.add_argument("--engine", default=None, help="Path to a UCI engine (defaults to the downloaded Stockfish)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Search time per benchmark position")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Where to write the node budgets (defaults to the shared calibration file)")
+    parser.add_argument("--no-verify", action="store_true", help="Skip measuring reply latency with the new budgets")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai calibrate`"""
+    engine_path = args.engine or get_stockfish_path()
+    if not os.path.exists(engine_path):
+        print(f"Engine not found at: {engine_path}", file=sys.stderr)
+        return 1
+
+    calibration = calibrate(engine_path, args.seconds)
+    path = save_calibration(calibration, args.output)
+    print(f"{calibration.engine}: {calibration.nps} nodes/sec (1 thread)")
+
+    latencies = {} if args.no_verify else measure_reply_latency(engine_path, calibration)
+    for difficulty in StockfishDifficulty:
+        target = DIFFICULTY_PROFILES[difficulty].target_latency
+        line = f"  {difficulty.name:<7} {calibration.node_budgets[difficulty.name]:>10} nodes  target {target:.2f}s"
+        if difficulty in latencies:
+            line += f"  measured {latencies[difficulty]:.2f}s"
+        print(line)
+    print(f"Saved calibration to {path}")
+    return 0
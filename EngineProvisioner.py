@@ -0,0 +1,104 @@
+import threading
+import time
+from enum import Enum, auto
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from EngineSupervisor import EngineSupervisor
+
+
+class ProvisioningState(Enum):
+    PENDING = auto()
+    DOWNLOADING = auto()  # Locating, downloading and validating the binary
+    STARTING = auto()     # Spawning the engine and waiting for the UCI handshake
+    READY = auto()
+    FAILED = auto()
+
+
+class EngineProvisioner:
+    """Gets a Stockfish process ready in the background from the moment the game starts.
+
+    By the time the player picks an AI game the binary has usually been
+    located (or downloaded), validated, spawned and handshaken, so the game
+    can take over a warm engine instead of showing a loading screen.
+    """
+
+    def __init__(self, handshake_timeout: float = 15.0):
+        self.handshake_timeout = handshake_timeout
+        self.state = ProvisioningState.PENDING
+        self.progress = 0  # Download progress, 0-100
+        self.error: Optional[str] = None
+        self.stockfish_path: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._supervisor: Optional["EngineSupervisor"] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start provisioning in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.state = ProvisioningState.PENDING
+        self._thread = threading.Thread(target=self._provision, name="EngineProvisioner", daemon=True)
+        self._thread.start()
+
+    def is_finished(self) -> bool:
+        """Whether provisioning has either succeeded or failed"""
+        return self.state in (ProvisioningState.READY, ProvisioningState.FAILED)
+
+    def take_supervisor(self) -> Optional["EngineSupervisor"]:
+        """Hand the warm engine to a game and start warming up a spare for the next one"""
+        with self._lock:
+            supervisor, self._supervisor = self._supervisor, None
+        if supervisor is None:
+            return None
+        self.start()
+        return supervisor
+
+    def shutdown(self) -> None:
+        """Stop any engine that was provisioned but never handed out"""
+        if self._thread:
+            self._thread.join(timeout=self.handshake_timeout)
+        with self._lock:
+            supervisor, self._supervisor = self._supervisor, None
+        if supervisor:
+            supervisor.stop()
+
+    def _on_progress(self, progress: int) -> None:
+        self.progress = progress
+
+    def _provision(self) -> None:
+        # The download and engine modules (requests, asyncio, chess.engine) are
+        # imported here, on the provisioning thread, to keep them off the startup path
+        from StockfishDownloader import download_stockfish
+        from EngineSupervisor import EngineSupervisor, EngineHealth
+
+        if self.stockfish_path is None:
+            self.state = ProvisioningState.DOWNLOADING
+            self.stockfish_path = download_stockfish(self._on_progress)
+            if not self.stockfish_path:
+                self.error = "Failed to download Stockfish"
+                self.state = ProvisioningState.FAILED
+                return
+        self.progress = 100
+
+        self.state = ProvisioningState.STARTING
+        supervisor = EngineSupervisor(self.stockfish_path)
+        supervisor.start()
+        deadline = time.monotonic() + self.handshake_timeout
+        while time.monotonic() < deadline:
+            health = supervisor.metrics().health
+            if health in (EngineHealth.HEALTHY, EngineHealth.FAILED):
+                break
+            time.sleep(0.02)
+
+        metrics = supervisor.metrics()
+        if metrics.health != EngineHealth.HEALTHY:
+            supervisor.stop()
+            self.error = f"Stockfish did not start: {metrics.last_error}"
+            self.state = ProvisioningState.FAILED
+            return
+
+        with self._lock:
+            self._supervisor = supervisor
+        self.state = ProvisioningState.READY
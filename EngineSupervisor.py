@@ -0,0 +1,251 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from enum import Enum, auto
+from typing import Callable, Optional
+
+import chess
+import chess.engine
+
+from Diagnostics import get_logger
+
+log = get_logger("engine")
+
+
+class EngineHealth(Enum):
+    STARTING = auto()
+    HEALTHY = auto()
+    RESTARTING = auto()
+    FAILED = auto()  # Still retried in the background, but requests fail fast
+    STOPPED = auto()
+
+
+@dataclass
+class EngineMetrics:
+    """Health and latency figures for a supervised engine"""
+    health: EngineHealth = EngineHealth.STARTING
+    restarts: int = 0
+    consecutive_failures: int = 0
+    last_ping_ms: Optional[float] = None
+    avg_ping_ms: Optional[float] = None
+    last_move_ms: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class EngineSupervisor:
+    """Owns a UCI engine process, keeps it alive and serves move requests off the game loop.
+
+    A monitor thread spawns the engine, pings it with isready while it is idle
+    and restarts it with exponential backoff when it dies. Move requests run on
+    a worker thread and return a Future; a request interrupted by a crash is
+    replayed on the restarted engine from the same position.
+    """
+
+    def __init__(self, engine_path: str, configure: Optional[Callable[[chess.engine.SimpleEngine], None]] = None,
+                 ping_interval: float = 2.0, initial_backoff: float = 0.5, max_backoff: float = 30.0,
+                 failed_after: int = 5, request_attempts: int = 3, request_wait: float = 15.0):
+        self.engine_path = engine_path
+        self.configure = configure
+        self.ping_interval = ping_interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.failed_after = failed_after
+        self.request_attempts = request_attempts
+        self.request_wait = request_wait
+
+        self._lock = threading.Lock()
+        self._engine: Optional[chess.engine.SimpleEngine] = None
+        self._metrics = EngineMetrics()
+        # python-chess does not interleave commands from different threads safely,
+        # so pings and move requests take turns on the engine
+        self._command_lock = threading.Lock()
+        self._ready = threading.Event()  # Set while a healthy engine is available
+        self._wake = threading.Event()  # Wakes the monitor early (crash or shutdown)
+        self._stopping = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EngineRequest")
+
+    def start(self) -> None:
+        """Start the monitor thread, which spawns the engine in the background"""
+        if self._monitor_thread:
+            return
+        self._monitor_thread = threading.Thread(target=self._monitor, name="EngineSupervisor", daemon=True)
+        self._monitor_thread.start()
+
+    def stop(self) -> None:
+        """Stop monitoring and shut the engine down"""
+        self._stopping.set()
+        self._wake.set()
+        self._ready.set()  # Release any request waiting for an engine
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._monitor_thread:
+            self._monitor_thread.join(timeout=2.0)
+            self._monitor_thread = None
+        with self._lock:
+            engine, self._engine = self._engine, None
+            self._metrics.health = EngineHealth.STOPPED
+        if engine:
+            self._close_engine(engine)
+
+    def metrics(self) -> EngineMetrics:
+        """A copy of the current health and latency metrics"""
+        with self._lock:
+            return replace(self._metrics)
+
+    def is_healthy(self) -> bool:
+        """Whether an engine is currently up and answering"""
+        return self.metrics().health == EngineHealth.HEALTHY
+
+    def reconfigure(self, configure: Callable[[chess.engine.SimpleEngine], None]) -> None:
+        """Replace the configure hook and apply it to the running engine before the next request"""
+        self.configure = configure
+        self._executor.submit(self._apply_configure, configure)
+
+    def _apply_configure(self, configure: Callable[[chess.engine.SimpleEngine], None]) -> None:
+        with self._lock:
+            engine = self._engine
+        if engine is None:
+            return  # The monitor applies self.configure when it (re)spawns the engine
+        try:
+            with self._command_lock:
+                configure(engine)
+        except (chess.engine.EngineError, chess.engine.EngineTerminatedError, TimeoutError) as e:
+            self._mark_dead(engine, e)
+
+    def request_move(self, board: chess.Board, limit: chess.engine.Limit) -> "Future[Optional[chess.Move]]":
+        """Ask the engine for a move without blocking; the Future resolves to None on failure"""
+        return self._executor.submit(self._play, board.copy(), limit)
+
+    def _play(self, board: chess.Board, limit: chess.engine.Limit) -> Optional[chess.Move]:
+        for attempt in range(self.request_attempts):
+            engine = self._wait_for_engine()
+            if engine is None:
+                return None
+
+            start = time.perf_counter()
+            try:
+                with self._command_lock:
+                    result = engine.play(board, limit)
+                with self._lock:
+                    self._metrics.last_move_ms = (time.perf_counter() - start) * 1000
+                return result.move
+            except (chess.engine.EngineError, chess.engine.EngineTerminatedError, TimeoutError) as e:
+                log.warning("Engine failed during move request (attempt %d/%d): %s", attempt + 1,
+                            self.request_attempts, e)
+                self._mark_dead(engine, e)
+        return None
+
+    def _wait_for_engine(self) -> Optional[chess.engine.SimpleEngine]:
+        """Wait (on the request thread) until the monitor has a healthy engine"""
+        deadline = time.monotonic() + self.request_wait
+        while not self._stopping.is_set():
+            with self._lock:
+                if self._engine is not None and self._metrics.health == EngineHealth.HEALTHY:
+                    return self._engine
+                if self._metrics.health == EngineHealth.FAILED:
+                    return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._ready.wait(min(remaining, 0.25))
+        return None
+
+    def _mark_dead(self, engine: chess.engine.SimpleEngine, error: Exception) -> None:
+        """Drop a dead engine and wake the monitor to restart it"""
+        with self._lock:
+            if self._engine is not engine:
+                return
+            self._engine = None
+            self._metrics.health = EngineHealth.RESTARTING
+            self._metrics.last_error = str(error)
+            self._ready.clear()
+        self._close_engine(engine)
+        self._wake.set()
+
+    def _monitor(self) -> None:
+        backoff = self.initial_backoff
+        while not self._stopping.is_set():
+            with self._lock:
+                engine = self._engine
+
+            if engine is None:
+                if self._spawn():
+                    backoff = self.initial_backoff
+                else:
+                    self._wake.wait(backoff)
+                    self._wake.clear()
+                    backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            self._ping(engine)
+            self._wake.wait(self.ping_interval)
+            self._wake.clear()
+
+    def _spawn(self) -> bool:
+        """Start and configure a fresh engine process"""
+        engine = None
+        try:
+            engine = chess.engine.SimpleEngine.popen_uci(self.engine_path, timeout=5.0)
+            if self.configure:
+                self.configure(engine)
+        except Exception as e:
+            log.error("Error starting engine: %s", e)
+            if engine is not None:
+                # Started but could not be configured; each retry would otherwise leak a process
+                self._close_engine(engine)
+            with self._lock:
+                self._metrics.consecutive_failures += 1
+                self._metrics.last_error = str(e)
+                if self._metrics.consecutive_failures >= self.failed_after:
+                    self._metrics.health = EngineHealth.FAILED
+                    self._ready.set()  # Let waiting requests fail fast
+                else:
+                    self._metrics.health = EngineHealth.RESTARTING
+            return False
+
+        with self._lock:
+            stopping = self._stopping.is_set()
+            if not stopping:
+                if self._metrics.health != EngineHealth.STARTING:
+                    self._metrics.restarts += 1
+                self._engine = engine
+                self._metrics.health = EngineHealth.HEALTHY
+                self._metrics.consecutive_failures = 0
+                self._ready.set()
+        if stopping:
+            self._close_engine(engine)
+        return not stopping
+
+    def _ping(self, engine: chess.engine.SimpleEngine) -> None:
+        """Round-trip an isready and record its latency (skipped while the engine is searching)"""
+        if not self._command_lock.acquire(blocking=False):
+            return
+        start = time.perf_counter()
+        try:
+            engine.ping()
+        except Exception as e:
+            error = e
+        else:
+            error = None
+        finally:
+            self._command_lock.release()
+        if error:
+            self._mark_dead(engine, error)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._metrics.last_ping_ms = elapsed
+            previous = self._metrics.avg_ping_ms
+            # Exponential moving average keeps the figure stable between pings
+            self._metrics.avg_ping_ms = elapsed if previous is None else previous * 0.8 + elapsed * 0.2
+
+    @staticmethod
+    def _close_engine(engine: chess.engine.SimpleEngine) -> None:
+        try:
+            engine.quit()
+        except Exception:
+            try:
+                engine.close()
+            except Exception:
+                pass
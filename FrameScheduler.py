@@ -0,0 +1,58 @@
+from typing import List, Optional
+
+import pygame
+
+# Posted from background threads (e.g. when an engine move is ready) to wake an idle loop
+WAKEUP_EVENT = pygame.USEREVENT + 1
+
+
+def post_wakeup() -> None:
+    """Wake the game loop from any thread"""
+    try:
+        pygame.event.post(pygame.event.Event(WAKEUP_EVENT))
+    except pygame.error:
+        pass  # The display was already shut down
+
+
+class FrameScheduler:
+    """Paces a game loop by what is actually changing on screen.
+
+    While something animates, or for a short while after input, frames run at
+    the full rate. Otherwise the loop sleeps in pygame.event.wait until input
+    arrives, a background thread posts WAKEUP_EVENT, or the caller's next
+    deadline (such as a clock display ticking over) is reached.
+    """
+
+    def __init__(self, fps: int = 60, active_ms: int = 250, max_idle_ms: int = 1000):
+        self.fps = fps
+        self.active_ms = active_ms  # Full frame rate for this long after input
+        self.max_idle_ms = max_idle_ms  # Upper bound on any idle sleep
+        self.clock = pygame.time.Clock()
+        self.active_until = 0
+
+    def keep_active(self, duration_ms: Optional[int] = None) -> None:
+        """Run at the full frame rate for a while (e.g. during an animation)"""
+        until = pygame.time.get_ticks() + (self.active_ms if duration_ms is None else duration_ms)
+        self.active_until = max(self.active_until, until)
+
+    def wait(self, next_deadline_ms: Optional[int] = None) -> List[pygame.event.Event]:
+        """Wait for the next frame and return the events that arrived.
+
+        next_deadline_ms is how long until the caller next has something to
+        draw; 0 means it is animating, None means only events matter.
+        """
+        now = pygame.time.get_ticks()
+        if next_deadline_ms == 0 or now < self.active_until:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        else:
+            timeout = self.max_idle_ms if next_deadline_ms is None else min(next_deadline_ms, self.max_idle_ms)
+            # A frame has already been shown; never wake sooner than the frame rate allows
+            first = pygame.event.wait(max(timeout, 1000 // self.fps))
+            events = [first] if first.type != pygame.NOEVENT else []
+            events.extend(pygame.event.get())
+            self.clock.tick()  # Restart frame timing from the wakeup
+
+        if any(event.type not in (WAKEUP_EVENT, pygame.NOEVENT) for event in events):
+            self.keep_active()
+        return events
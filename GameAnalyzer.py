@@ -0,0 +1,265 @@
+import os
+import sys
+import gzip
+import multiprocessing
+import multiprocessing.pool
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Iterable, Callable, Any
+
+from StockfishDownloader import get_stockfish_path
+from GameArchive import ARCHIVE_EXTENSION, iter_archive
+
+# Scores are reported in centipawns from White's point of view; forced mates
+# are clamped to +/- MATE_SCORE so the output stays a single integer column.
+MATE_SCORE = 10000
+DEFAULT_BLUNDER_THRESHOLD = 200  # Centipawns lost by the side to move
+DEFAULT_DEPTH = 12
+
+
+@dataclass
+class SavedGame:
+    """A finished game read back from the games directory"""
+    name: str
+    winner: str
+    moves: List[str] = field(default_factory=list)  # UCI notation
+    start_fen: Optional[str] = None  # None for the standard starting position
+
+
+@dataclass
+class MoveAnalysis:
+    """Engine verdict for a single ply"""
+    ply: int
+    move: str
+    score: int  # Evaluation after the move, White's point of view
+    best_move: str  # Engine's preferred move in the position before the move
+    blunder: bool
+
+
+@dataclass
+class GameAnalysis:
+    """Engine verdict for a whole game"""
+    name: str
+    winner: str
+    moves: List[MoveAnalysis] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def parse_saved_game(path: str) -> Optional[SavedGame]:
+    """Parse a text game file written by older versions of ChessBoard._save_game_history"""
+    winner = ""
+    moves = None
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("Winner:"):
+                winner = line.split(":", 1)[1].strip()
+            elif line.startswith("UCI Moves:"):
+                moves = line.split(":", 1)[1].split()
+
+    # Games saved before UCI moves were recorded cannot be replayed
+    if moves is None:
+        return None
+    return SavedGame(name=os.path.basename(path), winner=winner, moves=moves)
+
+
+def iter_archived_games(path: str) -> Iterator[SavedGame]:
+    """Stream the games in a binary game archive"""
+    name = os.path.basename(path)
+    winners = {"1-0": "White", "0-1": "Black", "1/2-1/2": "Draw"}
+    for index, game in enumerate(iter_archive(path)):
+        yield SavedGame(
+            name=f"{name}#{index}",
+            winner=winners.get(game.result, ""),
+            moves=game.moves,
+            start_fen=game.start_fen
+        )
+
+
+def iter_saved_games(directory: str) -> Iterator[SavedGame]:
+    """Stream every replayable game in a directory (archives and legacy text files),
+    or in a single archive file, one game at a time"""
+    if os.path.isfile(directory):
+        yield from iter_archived_games(directory)
+        return
+
+    entries = sorted(
+        (entry for entry in os.scandir(directory)
+         if entry.is_file() and entry.name.endswith((".txt", ARCHIVE_EXTENSION))),
+        key=lambda entry: entry.name
+    )
+    for entry in entries:
+        if entry.name.endswith(ARCHIVE_EXTENSION):
+            try:
+                yield from iter_archived_games(entry.path)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable archive {entry.name}: {e}")
+            continue
+        try:
+            game = parse_saved_game(entry.path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Skipping unreadable game {entry.name}: {e}")
+            continue
+        if game is None:
+            print(f"Skipping {entry.name}: no UCI move list")
+            continue
+        yield game
+
+
+# Each worker process owns exactly one engine for its whole lifetime
+_worker_engine = None
+_worker_limit = None
+_worker_blunder_threshold = DEFAULT_BLUNDER_THRESHOLD
+
+
+def _init_worker(engine_path: str, depth: int, hash_mb: int, blunder_threshold: int) -> None:
+    """Pool initializer: spawn this process's engine"""
+    global _worker_engine, _worker_limit, _worker_blunder_threshold
+    import chess.engine
+    from multiprocessing.util import Finalize
+
+    _worker_engine = chess.engine.SimpleEngine.popen_uci(engine_path, timeout=10.0)
+    # One search thread per engine; parallelism comes from the process pool
+    options = {"Threads": 1, "Hash": hash_mb}
+    _worker_engine.configure({name: value for name, value in options.items() if name in _worker_engine.options})
+    _worker_limit = chess.engine.Limit(depth=depth)
+    _worker_blunder_threshold = blunder_threshold
+    # Runs when the pool shuts its workers down cleanly
+    Finalize(_worker_engine, _worker_engine.quit, exitpriority=10)
+
+
+def _white_score(info: dict) -> int:
+    """Convert an engine info dict to a clamped centipawn score for White"""
+    return info["score"].white().score(mate_score=MATE_SCORE)
+
+
+def analyze_game(game: SavedGame) -> GameAnalysis:
+    """Replay a game in the worker's engine and evaluate every position"""
+    import chess
+
+    result = GameAnalysis(name=game.name, winner=game.winner)
+    board = chess.Board(game.start_fen) if game.start_fen else chess.Board()
+    try:
+        # Every position is searched once: its score grades the move that led
+        # to it and its principal variation gives the best move from it.
+        info = _worker_engine.analyse(board, _worker_limit)
+        for ply, uci in enumerate(game.moves):
+            move = chess.Move.from_uci(uci)
+            if not board.is_legal(move):
+                result.error = f"illegal move {uci} at ply {ply}"
+                break
+
+            score_before = _white_score(info)
+            best_move = info["pv"][0].uci() if info.get("pv") else ""
+            mover_is_white = board.turn == chess.WHITE
+
+            board.push(move)
+            if board.is_game_over():
+                outcome = board.outcome()
+                if outcome.winner is None:
+                    score_after = 0
+                else:
+                    score_after = MATE_SCORE if outcome.winner == chess.WHITE else -MATE_SCORE
+            else:
+                info = _worker_engine.analyse(board, _worker_limit)
+                score_after = _white_score(info)
+
+            loss = score_before - score_after if mover_is_white else score_after - score_before
+            result.moves.append(MoveAnalysis(
+                ply=ply,
+                move=uci,
+                score=score_after,
+                best_move=best_move,
+                blunder=loss >= _worker_blunder_threshold and uci != best_move
+            ))
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def bounded_imap(pool: multiprocessing.pool.Pool, func: Callable[[Any], Any], items: Iterable[Any], max_pending: int) -> Iterator[Any]:
+    """Like Pool.imap, but never holds more than max_pending tasks in flight.
+
+    Pool.imap drains its input eagerly, which would read every saved game into
+    memory before the first result comes back.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _open_output(path: str):
+    """Open the analysis output, gzip-compressed if the name ends in .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def analyze_directory(directory: str, output_path: str, engine_path: Optional[str] = None,
+                      depth: int = DEFAULT_DEPTH, workers: Optional[int] = None, hash_mb: int = 16,
+                      blunder_threshold: int = DEFAULT_BLUNDER_THRESHOLD) -> int:
+    """Analyze every saved game in a directory with a pool of engine processes.
+
+    Output is tab separated, one row per ply:
+    game, ply, move, score (centipawns, White's view), best move, blunder flag (0/1).
+    Returns the number of games analyzed.
+    """
+    engine_path = engine_path or get_stockfish_path()
+    if not os.path.exists(engine_path):
+        raise FileNotFoundError(f"Engine not found at: {engine_path}")
+
+    workers = workers or os.cpu_count() or 1
+    analyzed = 0
+    with multiprocessing.Pool(
+        processes=workers,
+        initializer=_init_worker,
+        initargs=(engine_path, depth, hash_mb, blunder_threshold)
+    ) as pool, _open_output(output_path) as out:
+        out.write("game\tply\tmove\tscore\tbest\tblunder\n")
+        for analysis in bounded_imap(pool, analyze_game, iter_saved_games(directory), workers * 2):
+            if analysis.error:
+                print(f"Error analyzing {analysis.name}: {analysis.error}")
+            for move in analysis.moves:
+                out.write(f"{analysis.name}\t{move.ply}\t{move.move}\t{move.score}\t"
+                          f"{move.best_move}\t{int(move.blunder)}\n")
+            analyzed += 1
+            if analyzed % 100 == 0:
+                print(f"Analyzed {analyzed} games")
+        pool.close()
+        pool.join()
+    return analyzed
+
+
+def build_parser(parser) -> None:
+    """Add the analyze command's arguments to an argparse parser"""
+    parser.add_argument("directory", help="Directory of saved games (e.g. games/) or a game archive file")
+    parser.add_argument("-o", "--output", default="analysis.tsv",
+                        help="Output file; a .gz suffix enables compression")
+    parser.add_argument("--engine", default=None, help="Path to a UCI engine (defaults to the downloaded Stockfish)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="Search depth per position")
+    parser.add_argument("--workers", type=int, default=None, help="Engine processes (defaults to one per core)")
+    parser.add_argument("--hash", type=int, default=16, help="Hash size in MB per engine")
+    parser.add_argument("--blunder-threshold", type=int, default=DEFAULT_BLUNDER_THRESHOLD,
+                        help="Centipawn loss that marks a move as a blunder")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai analyze`"""
+    try:
+        count = analyze_directory(
+            args.directory,
+            args.output,
+            engine_path=args.engine,
+            depth=args.depth,
+            workers=args.workers,
+            hash_mb=args.hash,
+            blunder_threshold=args.blunder_threshold
+        )
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Analyzed {count} games -> {args.output}")
+    return 0
@@ -0,0 +1,449 @@
+import io
+import os
+import sys
+import struct
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple
+
+import chess
+
+# Archive layout (all integers little-endian):
+#
+#   file header   MAGIC, VERSION, 3 reserved bytes
+#   game record   u32 length of the rest of the record
+#                 u8 result, i64 played_at (unix seconds), u32 ply count,
+#                 white, black, start FEN (each u8 length + UTF-8; empty FEN = standard start)
+#                 one u16 per move: from (6 bits) | to (6 bits) << 6 | promotion piece type << 12
+#   ...
+#   index         u64 offset of every game record
+#   trailer       u64 index offset, u32 game count, INDEX_MAGIC
+#
+# Appending truncates the index, writes the new records and writes a fresh
+# index; if that is interrupted the records are still intact and the index
+# is rebuilt by scanning the next time the archive is opened for writing.
+MAGIC = b"CHAI"
+VERSION = 1
+INDEX_MAGIC = b"CHIX"
+ARCHIVE_EXTENSION = ".chai"
+DEFAULT_ARCHIVE_NAME = "games" + ARCHIVE_EXTENSION  # Inside the games/ directory
+
+_FILE_HEADER = struct.Struct("<4sB3x")
+_RECORD_LENGTH = struct.Struct("<I")
+_GAME_HEADER = struct.Struct("<BqI")
+_TRAILER = struct.Struct("<QI4s")
+
+RESULTS = ["*", "1-0", "0-1", "1/2-1/2"]
+_PROMOTION_SYMBOLS = ["", "", "n", "b", "r", "q"]  # Indexed by chess piece type
+_SQUARE_INDEX = {name: square for square, name in enumerate(chess.SQUARE_NAMES)}
+_PROMOTION_INDEX = {symbol: piece_type for piece_type, symbol in enumerate(_PROMOTION_SYMBOLS) if symbol}
+
+
+@dataclass
+class ArchivedGame:
+    """One game as stored in an archive"""
+    white: str = "?"
+    black: str = "?"
+    result: str = "*"  # PGN result: 1-0, 0-1, 1/2-1/2 or *
+    played_at: int = 0  # Unix time in seconds
+    moves: List[str] = field(default_factory=list)  # UCI notation
+    start_fen: Optional[str] = None  # None for the standard starting position
+
+
+def encode_move(uci: str) -> int:
+    """Pack a UCI move into 16 bits"""
+    try:
+        code = _SQUARE_INDEX[uci[0:2]] | (_SQUARE_INDEX[uci[2:4]] << 6)
+        if len(uci) == 5:
+            code |= _PROMOTION_INDEX[uci[4]] << 12
+        elif len(uci) != 4:
+            raise KeyError(uci)
+    except KeyError:
+        raise ValueError(f"Invalid UCI move: {uci}") from None
+    return code
+
+
+def decode_move(code: int) -> str:
+    """Unpack a 16-bit move back into UCI notation"""
+    return (chess.SQUARE_NAMES[code & 0x3F] + chess.SQUARE_NAMES[(code >> 6) & 0x3F]
+            + _PROMOTION_SYMBOLS[code >> 12])
+
+
+def pack_moves(moves: List[str]) -> bytes:
+    """Pack UCI moves at 2 bytes each"""
+    codes = array("H", (encode_move(uci) for uci in moves))
+    if sys.byteorder == "big":
+        codes.byteswap()
+    return codes.tobytes()
+
+
+def unpack_moves(data: bytes) -> List[str]:
+    """Unpack moves packed by pack_moves"""
+    codes = array("H")
+    codes.frombytes(data)
+    if sys.byteorder == "big":
+        codes.byteswap()
+    return [decode_move(code) for code in codes]
+
+
+def _pack_string(value: str) -> bytes:
+    data = value.encode("utf-8")[:255]
+    return bytes([len(data)]) + data
+
+
+def encode_game(game: ArchivedGame) -> bytes:
+    """Serialize a game to a record, including its length prefix"""
+    body = b"".join((
+        _GAME_HEADER.pack(RESULTS.index(game.result) if game.result in RESULTS else 0, game.played_at, len(game.moves)),
+        _pack_string(game.white),
+        _pack_string(game.black),
+        _pack_string(game.start_fen or ""),
+        pack_moves(game.moves)
+    ))
+    return _RECORD_LENGTH.pack(len(body)) + body
+
+
+def decode_game(body: bytes) -> ArchivedGame:
+    """Deserialize a record body (without its length prefix)"""
+    result, played_at, ply_count = _GAME_HEADER.unpack_from(body)
+    offset = _GAME_HEADER.size
+    strings = []
+    for _ in range(3):
+        length = body[offset]
+        strings.append(body[offset + 1:offset + 1 + length].decode("utf-8", errors="replace"))
+        offset += 1 + length
+    return ArchivedGame(
+        white=strings[0],
+        black=strings[1],
+        result=RESULTS[result] if result < len(RESULTS) else "*",
+        played_at=played_at,
+        moves=unpack_moves(body[offset:offset + 2 * ply_count]),
+        start_fen=strings[2] or None
+    )
+
+
+def _read_record(f: BinaryIO) -> Optional[bytes]:
+    """Read the next record body, or None at the end of the records (or a torn write)"""
+    prefix = f.read(_RECORD_LENGTH.size)
+    if len(prefix) < _RECORD_LENGTH.size:
+        return None
+    (length,) = _RECORD_LENGTH.unpack(prefix)
+    body = f.read(length)
+    return body if len(body) == length else None
+
+
+def _read_trailer(f: BinaryIO) -> Optional[tuple]:
+    """(index offset, game count) from a complete archive, or None if the index is missing"""
+    f.seek(0, io.SEEK_END)
+    size = f.tell()
+    if size < _FILE_HEADER.size + _TRAILER.size:
+        return None
+    f.seek(size - _TRAILER.size)
+    index_offset, count, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+    if magic != INDEX_MAGIC or index_offset + 8 * count + _TRAILER.size != size:
+        return None
+    return index_offset, count
+
+
+def _check_header(f: BinaryIO, path: str) -> None:
+    f.seek(0)
+    header = f.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size:
+        raise ValueError(f"{path} is not a game archive")
+    magic, version = _FILE_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a game archive")
+    if version > VERSION:
+        raise ValueError(f"{path} uses archive version {version}, newer than this program supports")
+
+
+def _read_index(f: BinaryIO, index_offset: int, count: int) -> array:
+    offsets = array("Q")
+    f.seek(index_offset)
+    offsets.frombytes(f.read(8 * count))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets
+
+
+def _is_valid_body(body: bytes) -> bool:
+    """Whether a record body is self-consistent (guards index rebuilds against torn writes)"""
+    if len(body) < _GAME_HEADER.size + 3:
+        return False
+    result, _, ply_count = _GAME_HEADER.unpack_from(body)
+    offset = _GAME_HEADER.size
+    for _ in range(3):
+        if offset >= len(body):
+            return False
+        offset += 1 + body[offset]
+    return result < len(RESULTS) and offset + 2 * ply_count == len(body)
+
+
+def _scan_offsets(f: BinaryIO) -> Tuple[array, int]:
+    """Offsets of every complete record, found by walking the records from the start,
+    and where the last of them ends"""
+    offsets = array("Q")
+    end = _FILE_HEADER.size
+    f.seek(end)
+    while True:
+        body = _read_record(f)
+        if body is None or not _is_valid_body(body):
+            break
+        offsets.append(end)
+        end = f.tell()
+    return offsets, end
+
+
+class ArchiveWriter:
+    """Appends games to an archive, creating it if needed.
+
+    Use as a context manager; the index is written when the writer closes, so
+    appending many games costs one index rewrite.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            _check_header(self._file, path)
+            trailer = _read_trailer(self._file)
+            if trailer:
+                end = trailer[0]
+                self._offsets = _read_index(self._file, *trailer)
+            else:
+                # Interrupted append: keep every complete record, drop the rest
+                self._offsets, end = _scan_offsets(self._file)
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+            self._offsets = array("Q")
+
+    def append(self, game: ArchivedGame) -> int:
+        """Append one game; returns its index in the archive (ValueError if a move cannot be stored)"""
+        return self.append_record(encode_game(game))
+
+    def append_record(self, record: bytes) -> int:
+        """Append a record already serialized by encode_game (e.g. in an import worker)"""
+        self._offsets.append(self._file.tell())
+        self._file.write(record)
+        return len(self._offsets) - 1
+
+    def extend(self, games: Iterable[ArchivedGame]) -> int:
+        """Append many games; returns how many were written"""
+        count = 0
+        for game in games:
+            self.append(game)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        """Write the index and trailer and close the file"""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        offsets = array("Q", self._offsets)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        self._file.write(offsets.tobytes())
+        self._file.write(_TRAILER.pack(index_offset, len(self._offsets), INDEX_MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ArchiveReader:
+    """Random access to the games in an archive through its index"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        _check_header(self._file, path)
+        trailer = _read_trailer(self._file)
+        if trailer:
+            self._offsets = _read_index(self._file, *trailer)
+        else:
+            self._offsets, _ = _scan_offsets(self._file)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> ArchivedGame:
+        self._file.seek(self._offsets[index])
+        body = _read_record(self._file)
+        if body is None:
+            raise ValueError(f"Truncated game record {index} in {self.path}")
+        return decode_game(body)
+
+    def __iter__(self) -> Iterator[ArchivedGame]:
+        return iter_archive(self.path)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_archive(path: str) -> Iterator[ArchivedGame]:
+    """Stream every game in an archive in order, without loading the index"""
+    with open(path, "rb", buffering=1024 * 1024) as f:
+        _check_header(f, path)
+        trailer = _read_trailer(f)
+        end = trailer[0] if trailer else None
+        f.seek(_FILE_HEADER.size)
+        while end is None or f.tell() < end:
+            body = _read_record(f)
+            if body is None or (end is None and not _is_valid_body(body)):
+                break
+            yield decode_game(body)
+
+
+def append_game(path: str, game: ArchivedGame) -> int:
+    """Append a single game to an archive; returns its index"""
+    with ArchiveWriter(path) as writer:
+        return writer.append(game)
+
+
+def game_to_pgn(game: ArchivedGame) -> str:
+    """Format an archived game as PGN"""
+    import chess.pgn
+
+    board = chess.Board(game.start_fen) if game.start_fen else chess.Board()
+    pgn_game = chess.pgn.Game.from_board(board)
+    pgn_game.headers["White"] = game.white
+    pgn_game.headers["Black"] = game.black
+    pgn_game.headers["Result"] = game.result
+    if game.played_at:
+        played_at = datetime.fromtimestamp(game.played_at, timezone.utc)
+        pgn_game.headers["Date"] = played_at.strftime("%Y.%m.%d")
+        pgn_game.headers["UTCDate"] = played_at.strftime("%Y.%m.%d")
+        pgn_game.headers["UTCTime"] = played_at.strftime("%H:%M:%S")
+    node = pgn_game
+    for uci in game.moves:
+        node = node.add_variation(chess.Move.from_uci(uci))
+    return str(pgn_game)
+
+
+def game_from_pgn(pgn_game) -> ArchivedGame:
+    """Convert a chess.pgn.Game into an archived game (main line only)"""
+    return game_from_headers(pgn_game.headers, [move.uci() for move in pgn_game.mainline_moves()])
+
+
+def game_from_headers(headers: Mapping[str, str], moves: List[str]) -> ArchivedGame:
+    """Build an archived game from PGN tag pairs and its main line in UCI notation"""
+    played_at = 0
+    for date_format, value in (
+        ("%Y.%m.%d %H:%M:%S", f"{headers.get('UTCDate', '')} {headers.get('UTCTime', '')}"),
+        ("%Y.%m.%d", headers.get("Date", ""))
+    ):
+        try:
+            date = datetime.strptime(value, date_format)
+        except ValueError:
+            continue  # Missing or partial dates such as "2020.??.??"
+        played_at = int(date.replace(tzinfo=timezone.utc).timestamp())
+        break
+    return ArchivedGame(
+        white=headers.get("White", "?"),
+        black=headers.get("Black", "?"),
+        result=headers.get("Result", "*"),
+        played_at=played_at,
+        moves=moves,
+        start_fen=headers.get("FEN")
+    )
+
+
+def iter_pgn_games(pgn_file: TextIO) -> Iterator[ArchivedGame]:
+    """Stream the games in a PGN file, skipping (and reporting) unreadable ones"""
+    import chess.pgn
+
+    number = 0  # Position of the game in the PGN, for error messages
+    while True:
+        pgn_game = chess.pgn.read_game(pgn_file)
+        if pgn_game is None:
+            return
+        number += 1
+        if pgn_game.errors:
+            print(f"Skipping game {number}: {pgn_game.errors[0]}")
+            continue
+        yield game_from_pgn(pgn_game)
+
+
+def import_pgn(pgn_file: TextIO, archive_path: str) -> int:
+    """Append every game in a PGN stream to an archive; returns the number imported"""
+    with ArchiveWriter(archive_path) as writer:
+        count = 0
+        for game in iter_pgn_games(pgn_file):
+            try:
+                writer.append(game)
+            except ValueError as e:  # e.g. null moves, which the archive cannot store
+                print(f"Skipping {game.white} - {game.black}: {e}")
+                continue
+            count += 1
+        return count
+
+
+def export_pgn(archive_path: str, pgn_file: TextIO) -> int:
+    """Write every game in an archive as PGN; returns the number exported"""
+    count = 0
+    for game in iter_archive(archive_path):
+        pgn_file.write(game_to_pgn(game))
+        pgn_file.write("\n\n")
+        count += 1
+    return count
+
+
+def build_parser(parser) -> None:
+    """Add the archive command's arguments to an argparse parser"""
+    parser.add_argument("action", choices=["import", "export", "info"],
+                        help="import PGN into the archive, export it as PGN, or summarize it")
+    parser.add_argument("archive", help=f"Archive file (e.g. games/{DEFAULT_ARCHIVE_NAME})")
+    parser.add_argument("pgn", nargs="?", default=None, help="PGN file to import or export (defaults to stdin/stdout)")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai archive`"""
+    if args.action == "import":
+        if args.pgn:
+            with open(args.pgn, "r", encoding="utf-8", errors="replace") as f:
+                count = import_pgn(f, args.archive)
+        else:
+            count = import_pgn(sys.stdin, args.archive)
+        print(f"Imported {count} games -> {args.archive}")
+        return 0
+
+    if not os.path.exists(args.archive):
+        print(f"Archive not found: {args.archive}", file=sys.stderr)
+        return 1
+
+    if args.action == "export":
+        if args.pgn:
+            with open(args.pgn, "w", encoding="utf-8") as f:
+                count = export_pgn(args.archive, f)
+            print(f"Exported {count} games -> {args.pgn}")
+        else:
+            export_pgn(args.archive, sys.stdout)
+        return 0
+
+    with ArchiveReader(args.archive) as reader:
+        games = len(reader)
+    plies = 0
+    results = {result: 0 for result in RESULTS}
+    for game in iter_archive(args.archive):
+        plies += len(game.moves)
+        results[game.result] = results.get(game.result, 0) + 1
+    size = os.path.getsize(args.archive)
+    print(f"{args.archive}: {games} games, {plies} moves, {size} bytes")
+    print("  " + "  ".join(f"{result}: {count}" for result, count in results.items()))
+    return 0
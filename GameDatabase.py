@@ -0,0 +1,313 @@
+import sys
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import chess
+import chess.polyglot
+
+from GameArchive import ArchivedGame, RESULTS, pack_moves, unpack_moves, iter_archive, iter_pgn_games
+
+DEFAULT_DATABASE_NAME = "games.sqlite"  # Inside the games/ directory
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    white TEXT NOT NULL,
+    black TEXT NOT NULL,
+    result TEXT NOT NULL,
+    played_at INTEGER NOT NULL,
+    start_fen TEXT,
+    moves BLOB NOT NULL  -- GameArchive move encoding, 2 bytes per move
+);
+
+-- Every position of every game, keyed by its polyglot Zobrist hash
+CREATE TABLE IF NOT EXISTS positions (
+    key INTEGER NOT NULL,
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    ply INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS positions_key ON positions(key);
+
+-- How often each move was played from a position, and how those games ended
+CREATE TABLE IF NOT EXISTS move_stats (
+    key INTEGER NOT NULL,
+    move TEXT NOT NULL,  -- UCI
+    games INTEGER NOT NULL,
+    white_wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    black_wins INTEGER NOT NULL,
+    PRIMARY KEY (key, move)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_MOVE_STATS = """
+INSERT INTO move_stats (key, move, games, white_wins, draws, black_wins) VALUES (?, ?, 1, ?, ?, ?)
+ON CONFLICT (key, move) DO UPDATE SET
+    games = games + 1,
+    white_wins = white_wins + excluded.white_wins,
+    draws = draws + excluded.draws,
+    black_wins = black_wins + excluded.black_wins
+"""
+
+_HASHER = chess.polyglot.ZobristHasher(chess.polyglot.POLYGLOT_RANDOM_ARRAY)
+
+
+@dataclass
+class ResultCounts:
+    """How the games through a position (or move) ended"""
+    games: int = 0
+    white_wins: int = 0
+    draws: int = 0
+    black_wins: int = 0
+
+
+@dataclass
+class MoveStats(ResultCounts):
+    """A move played from a position, with the results of the games that played it"""
+    move: str = ""  # UCI
+    san: str = ""
+
+
+def to_signed64(key: int) -> int:
+    """Map an unsigned 64-bit Zobrist key onto SQLite's signed INTEGER range"""
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+def position_key(board: chess.Board) -> int:
+    """Database key of a position (signed polyglot Zobrist hash)"""
+    return to_signed64(chess.polyglot.zobrist_hash(board))
+
+
+def _piece_key(piece: Optional[chess.Piece], square: int) -> int:
+    if piece is None:
+        return 0
+    return chess.polyglot.POLYGLOT_RANDOM_ARRAY[64 * ((piece.piece_type - 1) * 2 + int(piece.color)) + square]
+
+
+def _touched_squares(board: chess.Board, move: chess.Move) -> Tuple[int, ...]:
+    """Squares whose contents a move changes"""
+    if board.is_castling(move):
+        rank = chess.square_rank(move.from_square)
+        if chess.square_file(move.to_square) > chess.square_file(move.from_square):
+            rook_from, rook_to = chess.square(7, rank), chess.square(5, rank)
+        else:
+            rook_from, rook_to = chess.square(0, rank), chess.square(3, rank)
+        return move.from_square, move.to_square, rook_from, rook_to
+    if board.is_en_passant(move):
+        captured = chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square))
+        return move.from_square, move.to_square, captured
+    return move.from_square, move.to_square
+
+
+class PositionHasher:
+    """Keys of successive positions along a line of play, updated incrementally.
+
+    Only the squares a move touches are rehashed, instead of all 64 squares
+    of every position. Call before_move and after_move around each push.
+    """
+
+    def __init__(self, board: chess.Board):
+        self.pieces_hash = _HASHER.hash_board(board)
+        self._squares: Tuple[int, ...] = ()
+
+    def key(self, board: chess.Board) -> int:
+        """Database key of the current position (equals position_key(board))"""
+        return to_signed64(self.pieces_hash ^ _HASHER.hash_castling(board)
+                           ^ _HASHER.hash_ep_square(board) ^ _HASHER.hash_turn(board))
+
+    def before_move(self, board: chess.Board, move: chess.Move) -> None:
+        self._squares = _touched_squares(board, move)
+        for square in self._squares:
+            self.pieces_hash ^= _piece_key(board.piece_at(square), square)
+
+    def after_move(self, board: chess.Board) -> None:
+        for square in self._squares:
+            self.pieces_hash ^= _piece_key(board.piece_at(square), square)
+        self._squares = ()
+
+
+def iter_position_keys(moves: List[str], start_fen: Optional[str] = None) -> Iterator[Tuple[int, int, Optional[str]]]:
+    """(ply, position key, UCI move played from it) for every position of a game.
+
+    The last position is yielded with a move of None.
+    """
+    board = chess.Board(start_fen) if start_fen else chess.Board()
+    hasher = PositionHasher(board)
+    for ply, uci in enumerate(moves):
+        yield ply, hasher.key(board), uci
+
+        move = chess.Move.from_uci(uci)
+        if not board.is_legal(move):
+            raise ValueError(f"Illegal move {uci} at ply {ply}")
+        hasher.before_move(board, move)
+        board.push(move)
+        hasher.after_move(board)
+
+    yield len(moves), hasher.key(board), None
+
+
+def _result_columns(result: str) -> Tuple[int, int, int]:
+    return int(result == "1-0"), int(result == "1/2-1/2"), int(result == "0-1")
+
+
+def _board_from(position: Union[chess.Board, str]) -> chess.Board:
+    return position if isinstance(position, chess.Board) else chess.Board(position)
+
+
+class GameDatabase:
+    """SQLite store of games with every position indexed by Zobrist key.
+
+    Position queries (games reaching a position, replies played from it and
+    how those games ended) are index lookups; no game is ever replayed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "GameDatabase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _insert(self, game: ArchivedGame, positions: List[Tuple[int, int, Optional[str]]]) -> int:
+        cursor = self.connection.execute(
+            "INSERT INTO games (white, black, result, played_at, start_fen, moves) VALUES (?, ?, ?, ?, ?, ?)",
+            (game.white, game.black, game.result if game.result in RESULTS else "*", game.played_at,
+             game.start_fen, pack_moves(game.moves))
+        )
+        game_id = cursor.lastrowid
+        self.connection.executemany(
+            "INSERT INTO positions (key, game_id, ply) VALUES (?, ?, ?)",
+            ((key, game_id, ply) for ply, key, _ in positions)
+        )
+        white_wins, draws, black_wins = _result_columns(game.result)
+        self.connection.executemany(
+            _UPSERT_MOVE_STATS,
+            ((key, uci, white_wins, draws, black_wins) for _, key, uci in positions if uci is not None)
+        )
+        return game_id
+
+    def add_game(self, game: ArchivedGame) -> int:
+        """Store a game and index its positions; returns its id (ValueError if a move is illegal)"""
+        positions = list(iter_position_keys(game.moves, game.start_fen))
+        with self.connection:
+            return self._insert(game, positions)
+
+    def add_indexed_games(self, games: Iterable[Tuple[ArchivedGame, List[Tuple[int, int, Optional[str]]]]]) -> int:
+        """Store games whose position keys were already computed (e.g. by import workers),
+        all in one transaction; returns how many were stored"""
+        count = 0
+        with self.connection:
+            for game, positions in games:
+                self._insert(game, positions)
+                count += 1
+        return count
+
+    def add_games(self, games: Iterable[ArchivedGame], batch_size: int = 1000) -> int:
+        """Store many games, committing once per batch; illegal games are skipped"""
+        count = 0
+        batch = []
+        for game in games:
+            try:
+                batch.append((game, list(iter_position_keys(game.moves, game.start_fen))))
+            except ValueError as e:
+                print(f"Skipping game {game.white} - {game.black}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                count += self.add_indexed_games(batch)
+                batch = []
+        return count + self.add_indexed_games(batch)
+
+    def game_count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def get_game(self, game_id: int) -> Optional[ArchivedGame]:
+        row = self.connection.execute(
+            "SELECT white, black, result, played_at, start_fen, moves FROM games WHERE id = ?", (game_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        white, black, result, played_at, start_fen, moves = row
+        return ArchivedGame(white=white, black=black, result=result, played_at=played_at,
+                            moves=unpack_moves(moves), start_fen=start_fen)
+
+    def games_with_position(self, position: Union[chess.Board, str], limit: int = 100) -> List[Tuple[int, int]]:
+        """(game id, first ply the position occurred) of games that reached a position"""
+        return self.connection.execute(
+            "SELECT game_id, MIN(ply) FROM positions WHERE key = ? GROUP BY game_id ORDER BY game_id LIMIT ?",
+            (position_key(_board_from(position)), limit)
+        ).fetchall()
+
+    def common_replies(self, position: Union[chess.Board, str], limit: int = 10) -> List[MoveStats]:
+        """The moves played most often from a position, with their results"""
+        board = _board_from(position)
+        rows = self.connection.execute(
+            "SELECT move, games, white_wins, draws, black_wins FROM move_stats WHERE key = ? "
+            "ORDER BY games DESC LIMIT ?",
+            (position_key(board), limit)
+        ).fetchall()
+        replies = []
+        for move, games, white_wins, draws, black_wins in rows:
+            chess_move = chess.Move.from_uci(move)
+            san = board.san(chess_move) if board.is_legal(chess_move) else move
+            replies.append(MoveStats(games=games, white_wins=white_wins, draws=draws, black_wins=black_wins,
+                                     move=move, san=san))
+        return replies
+
+    def results_from(self, position: Union[chess.Board, str]) -> ResultCounts:
+        """How the games that reached a position ended"""
+        row = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(g.result = '1-0'), 0), COALESCE(SUM(g.result = '1/2-1/2'), 0), "
+            "COALESCE(SUM(g.result = '0-1'), 0) FROM games g "
+            "WHERE g.id IN (SELECT game_id FROM positions WHERE key = ?)",
+            (position_key(_board_from(position)),)
+        ).fetchone()
+        return ResultCounts(*row)
+
+
+def build_parser(parser) -> None:
+    """Add the db command's arguments to an argparse parser"""
+    parser.add_argument("action", choices=["add", "query"],
+                        help="add games from PGN or archive files, or query a position")
+    parser.add_argument("database", help=f"Database file (e.g. games/{DEFAULT_DATABASE_NAME})")
+    parser.add_argument("inputs", nargs="*",
+                        help="add: .pgn or game archive files; query: a FEN (defaults to the starting position)")
+    parser.add_argument("--limit", type=int, default=10, help="Replies and games to show per query")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai db`"""
+    with GameDatabase(args.database) as database:
+        if args.action == "add":
+            for path in args.inputs:
+                if path.endswith(".pgn"):
+                    with open(path, "r", encoding="utf-8", errors="replace") as f:
+                        count = database.add_games(iter_pgn_games(f))
+                else:
+                    count = database.add_games(iter_archive(path))
+                print(f"Added {count} games from {path}")
+            print(f"{database.game_count()} games in {args.database}")
+            return 0
+
+        try:
+            board = chess.Board(" ".join(args.inputs)) if args.inputs else chess.Board()
+        except ValueError as e:
+            print(f"Invalid FEN: {e}", file=sys.stderr)
+            return 1
+        results = database.results_from(board)
+        print(f"{results.games} games: +{results.white_wins} ={results.draws} -{results.black_wins} (White's view)")
+        for reply in database.common_replies(board, args.limit):
+            print(f"  {reply.san:<8} {reply.games:>8} games  +{reply.white_wins} ={reply.draws} -{reply.black_wins}")
+        game_ids = [game_id for game_id, _ in database.games_with_position(board, args.limit)]
+        if game_ids:
+            print(f"  Games: {', '.join(map(str, game_ids))}")
+    return 0
@@ -3,6 +3,9 @@ from datetime import datetime, timedelta
 from enum import Enum
 from typing import List, Tuple, Optional, Dict, Callable, Final
 from DataClasses.Pieces import PieceType, PieceImage, pieces, PieceColor
+from EngineAnalysis import format_score, white_win_fraction
+from Assets import get_piece_sprites, get_font, render_text
+from Metrics import metrics
 
 class MenuColor(Enum):
     """Colors used in the game info menu"""
@@ -14,6 +17,9 @@ class MenuColor(Enum):
     CHECKMATE = (231, 76, 60)  # Red color for checkmate
 
 class GameInfo:
+    PIECE_SIZE: Final[int] = 40  # Promotion choice sprites
+    METRICS_REFRESH_MS: Final[int] = 500  # How often the metrics overlay is re-rendered
+
     def __init__(self, screen: pygame.Surface, x: int, y: int, width: int, height: int):
         """Initialize the game info menu"""
         self.screen: pygame.Surface = screen
@@ -31,8 +37,8 @@ class GameInfo:
         self.CHECKMATE_COLOR: Final[Tuple[int, int, int]] = MenuColor.CHECKMATE.value
         
         # Font
-        self.font_large: pygame.font.Font = pygame.font.SysFont('Arial', 28, bold=True)
-        self.font_small: pygame.font.Font = pygame.font.SysFont('Arial', 20)
+        self.font_large: pygame.font.Font = get_font('Arial', 28, bold=True)
+        self.font_small: pygame.font.Font = get_font('Arial', 20)
         
         # Initialize game state
         self.current_turn: str = "White"
@@ -44,6 +50,11 @@ class GameInfo:
         # Game state
         self.is_checkmate: bool = False
         self.winner: Optional[str] = None
+        self.engine_status: Optional[str] = None  # Set by the game when playing against an engine
+        self.puzzle_lines: List[str] = []  # Set by the game in puzzle mode
+        self.drawn_key: Optional[tuple] = None  # Everything shown by the last draw()
+        self.show_metrics: bool = False  # Hot-path timings overlay (M key)
+        self.font_metrics: pygame.font.Font = get_font('Arial', 14)
         
         # Time history for undo
         self.white_time_history: List[float] = []
@@ -59,14 +70,8 @@ class GameInfo:
         self._load_piece_images()
 
     def _load_piece_images(self) -> None:
-        """Load and cache piece images"""
-        for piece_name, piece in pieces.items():
-            try:
-                image = pygame.image.load(piece.Image).convert_alpha()
-                image = pygame.transform.scale(image, (40, 40))  # Scale for the promotion UI
-                self.piece_images[piece_name] = image
-            except pygame.error as e:
-                print(f"Error loading piece image {piece.Image}: {e}")
+        """Use the shared piece sprites, pre-scaled for the promotion UI"""
+        self.piece_images = get_piece_sprites(self.PIECE_SIZE)
 
     def _init_promotion_buttons(self) -> None:
         """Initialize the promotion piece selection buttons"""
@@ -121,6 +126,13 @@ class GameInfo:
             
         self.last_update = current_time
 
+    def reset_clocks(self) -> None:
+        """Start both clocks from zero, e.g. for the next puzzle"""
+        self.white_time = 0.0
+        self.black_time = 0.0
+        self.start_ticks = pygame.time.get_ticks()
+        self.last_update = self.start_ticks / 1000.0
+
     def save_time_state(self) -> None:
         """Save the current time state for undo"""
         self.white_time_history.append(self.white_time)
@@ -137,32 +149,92 @@ class GameInfo:
         self.is_checkmate = True
         self.winner = winner
 
+    @property
+    def rect(self) -> pygame.Rect:
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def _display_key(self) -> tuple:
+        """Everything the panel shows; the panel only needs repainting when this changes"""
+        hovered = None
+        if self.showing_promotion:
+            mouse_pos = pygame.mouse.get_pos()
+            hovered = tuple(button["rect"].collidepoint(mouse_pos) for button in self.promotion_buttons)
+        metrics_tick = pygame.time.get_ticks() // self.METRICS_REFRESH_MS if self.show_metrics else None
+        return (
+            self.current_turn, int(self.white_time), int(self.black_time), self.engine_status,
+            tuple(self.puzzle_lines), self.is_checkmate, self.winner, self.showing_promotion, self.promotion_color, hovered, metrics_tick
+        )
+
+    def needs_redraw(self) -> bool:
+        """Whether the panel's contents changed since it was last drawn"""
+        return self._display_key() != self.drawn_key
+
     def draw(self) -> None:
         """Draw the game info menu"""
+        self.drawn_key = self._display_key()
         # Draw background
         pygame.draw.rect(self.screen, self.BG_COLOR, (self.x, self.y, self.width, self.height))
         pygame.draw.rect(self.screen, self.BORDER_COLOR, (self.x, self.y, self.width, self.height), 2)
 
         # Draw turn indicator
-        turn_text = self.font_large.render(f"Turn: {self.current_turn}", True, self.TEXT_COLOR)
+        turn_text = render_text(self.font_large, f"Turn: {self.current_turn}", self.TEXT_COLOR)
         self.screen.blit(turn_text, (self.x + 10, self.y + 10))
 
         # Draw times
-        white_time_text = self.font_small.render(f"White Time: {int(self.white_time)}s", True, self.TEXT_COLOR)
-        black_time_text = self.font_small.render(f"Black Time: {int(self.black_time)}s", True, self.TEXT_COLOR)
+        white_time_text = render_text(self.font_small, f"White Time: {int(self.white_time)}s", self.TEXT_COLOR)
+        black_time_text = render_text(self.font_small, f"Black Time: {int(self.black_time)}s", self.TEXT_COLOR)
         self.screen.blit(white_time_text, (self.x + 10, self.y + 50))
         self.screen.blit(black_time_text, (self.x + 10, self.y + 80))
 
+        # Draw engine health
+        if self.engine_status:
+            engine_text = render_text(self.font_small, self.engine_status, self.TEXT_COLOR)
+            self.screen.blit(engine_text, (self.x + 10, self.y + 110))
+
+        # Draw the puzzle being solved (there is no engine opponent in puzzle mode)
+        for i, line in enumerate(self.puzzle_lines[:3]):
+            if line:
+                puzzle_text = render_text(self.font_small, line, self.TEXT_COLOR)
+                self.screen.blit(puzzle_text, (self.x + 10, self.y + 110 + 24 * i))
+
         # Draw checkmate message if game is over
         if self.is_checkmate:
-            checkmate_text = self.font_large.render(f"Checkmate! {self.winner} wins!", True, self.CHECKMATE_COLOR)
+            checkmate_text = render_text(self.font_large, f"Checkmate! {self.winner} wins!", self.CHECKMATE_COLOR)
             text_rect = checkmate_text.get_rect(center=(self.x + self.width//2, self.y + 150))
             self.screen.blit(checkmate_text, text_rect)
 
+        if self.show_metrics:
+            self._draw_metrics()
+
         # Draw promotion UI if active
         if self.showing_promotion:
             self._draw_promotion_ui()
 
+    def _draw_metrics(self) -> None:
+        """Draw the rolling hot-path timings and counters"""
+        rows = [("Timings (ms)", "p50", "p95", "max", "n")]
+        for name, stats in sorted(metrics.timings().items()):
+            rows.append((name, f"{stats.p50:.2f}", f"{stats.p95:.2f}", f"{stats.max:.2f}", str(stats.count)))
+        counters = metrics.counters()
+        if counters:
+            rows.append(("Counters", "", "", "", ""))
+            rows.extend((name, "", "", "", str(value)) for name, value in sorted(counters.items()))
+
+        # Numbers are right-aligned in fixed columns, whatever the font
+        column_right_edges = (self.x + 160, self.x + 205, self.x + 250, self.x + self.width - 10)
+        line_height = self.font_metrics.get_linesize()
+        y = self.y + 180
+        for name, *values in rows:
+            if y + line_height > self.y + self.height - 10:
+                break
+            # Changes every refresh, so bypass the text cache
+            self.screen.blit(self.font_metrics.render(name, True, self.TEXT_COLOR), (self.x + 10, y))
+            for value, right in zip(values, column_right_edges):
+                if value:
+                    surface = self.font_metrics.render(value, True, self.TEXT_COLOR)
+                    self.screen.blit(surface, surface.get_rect(topright=(right, y)))
+            y += line_height
+
     def _draw_promotion_ui(self) -> None:
         """Draw the pawn promotion UI"""
         # Draw semi-transparent overlay
@@ -172,7 +244,7 @@ class GameInfo:
         self.screen.blit(overlay, (self.x, self.y))
 
         # Draw promotion text
-        text = self.font_large.render("Choose promotion piece:", True, self.TEXT_COLOR)
+        text = render_text(self.font_large, "Choose promotion piece:", self.TEXT_COLOR)
         text_rect = text.get_rect(center=(self.x + self.width//2, self.y + self.height//2 - 50))
         self.screen.blit(text, text_rect)
 
@@ -204,6 +276,12 @@ class GameInfo:
         else:
             self.black_time += elapsed
 
+    def ms_until_next_tick(self) -> int:
+        """Milliseconds until the running player's clock shows the next second"""
+        running_time = self.white_time if self.current_turn == "White" else self.black_time
+        running_time += pygame.time.get_ticks() / 1000.0 - self.last_update
+        return int((1.0 - running_time % 1.0) * 1000) + 1
+
     def update_button_hover(self, pos: Tuple[int, int]) -> None:
         """Update button hover states"""
         for button in self.promotion_buttons:
@@ -211,7 +289,7 @@ class GameInfo:
 
     def _render_text(self, text: str, font: pygame.font.Font, y_pos: int) -> None:
         """Render text centered at given y position"""
-        text_surface = font.render(text, True, self.TEXT_COLOR)
+        text_surface = render_text(font, text, self.TEXT_COLOR)
         text_rect = text_surface.get_rect(center=(self.x + self.width // 2, self.y + y_pos))
         self.screen.blit(text_surface, text_rect)
     
@@ -229,12 +307,12 @@ class GameInfo:
         # If checkmate, show winner message in time area
         if self.is_checkmate and self.winner:
             # Draw checkmate message in red
-            checkmate_surface = self.font_large.render("CHECKMATE!", True, self.CHECKMATE_COLOR)
+            checkmate_surface = render_text(self.font_large, "CHECKMATE!", self.CHECKMATE_COLOR)
             checkmate_rect = checkmate_surface.get_rect(center=(self.x + self.width // 2, self.y + 100))
             self.screen.blit(checkmate_surface, checkmate_rect)
             
             # Draw winner message
-            winner_surface = self.font_large.render(f"{self.winner} wins!", True, self.TEXT_COLOR)
+            winner_surface = render_text(self.font_large, f"{self.winner} wins!", self.TEXT_COLOR)
             winner_rect = winner_surface.get_rect(center=(self.x + self.width // 2, self.y + 130))
             self.screen.blit(winner_surface, winner_rect)
             
@@ -248,3 +326,83 @@ class GameInfo:
             b_minutes = int(self.black_time // 60)
             b_seconds = int(self.black_time % 60)
             self._render_text(f"Black Time: {b_minutes:02d}:{b_seconds:02d}", self.font_small, 130)
+
+class AnalysisPanel:
+    """Evaluation bar and engine lines drawn alongside the game info menu.
+
+    The text is only re-rendered a few times per second, however fast the
+    engine reports, so drawing the panel costs a couple of blits per frame.
+    """
+
+    def __init__(self, screen: pygame.Surface, bar_rect: pygame.Rect, lines_rect: pygame.Rect,
+                 max_updates_per_second: int = 8):
+        self.screen: pygame.Surface = screen
+        self.bar_rect: pygame.Rect = bar_rect
+        self.lines_rect: pygame.Rect = lines_rect
+        self.refresh_interval_ms: int = 1000 // max_updates_per_second
+
+        self.font: pygame.font.Font = get_font('Arial', 16)
+        self.font_bold: pygame.font.Font = get_font('Arial', 18, bold=True)
+
+        self.last_refresh: int = -self.refresh_interval_ms
+        self.shown_version: int = -1
+        self.white_fraction: float = 0.5
+        self.lines_surface: pygame.Surface = pygame.Surface(self.lines_rect.size)
+        self._render_lines(None, "Starting engine...")
+
+    @property
+    def rects(self) -> List[pygame.Rect]:
+        return [self.bar_rect, self.lines_rect]
+
+    def draw(self, analysis, force: bool = False) -> bool:
+        """Draw the panel if its contents changed (or if forced); returns whether it drew"""
+        changed = force
+        now = pygame.time.get_ticks()
+        if now - self.last_refresh >= self.refresh_interval_ms:
+            self.last_refresh = now
+            snapshot = analysis.snapshot()
+            if analysis.error:
+                if self.shown_version != -2:
+                    self.shown_version = -2
+                    self._render_lines(None, analysis.error)
+                    changed = True
+            elif snapshot and snapshot.version != self.shown_version:
+                self.shown_version = snapshot.version
+                self.white_fraction = white_win_fraction(snapshot.lines[0] if snapshot.lines else None)
+                self._render_lines(snapshot, "Analysing...")
+                changed = True
+        if not changed:
+            return False
+
+        # Evaluation bar: white fills from the bottom
+        pygame.draw.rect(self.screen, (40, 40, 40), self.bar_rect)
+        white_height = int(self.bar_rect.height * self.white_fraction)
+        pygame.draw.rect(self.screen, (240, 240, 240), (
+            self.bar_rect.x, self.bar_rect.bottom - white_height, self.bar_rect.width, white_height
+        ))
+        self.screen.blit(self.lines_surface, self.lines_rect)
+        return True
+
+    def _render_lines(self, snapshot, status: str) -> None:
+        """Render the score, depth and principal variations to the cached surface"""
+        self.lines_surface.fill(MenuColor.BG.value)
+        pygame.draw.rect(self.lines_surface, MenuColor.BORDER.value, self.lines_surface.get_rect(), 2)
+
+        if not snapshot or not snapshot.lines:
+            text = render_text(self.font, status, MenuColor.TEXT.value)
+            self.lines_surface.blit(text, (10, 10))
+            return
+
+        # Scores and variations rarely repeat, so they bypass the text cache
+        header = self.font_bold.render(
+            f"Eval: {format_score(snapshot.lines[0])}   Depth: {snapshot.depth}", True, MenuColor.TEXT.value
+        )
+        self.lines_surface.blit(header, (10, 10))
+
+        y = 40
+        for index, line in enumerate(snapshot.lines):
+            text = self.font.render(
+                f"{index + 1}. {format_score(line)}  {' '.join(line.pv)}", True, MenuColor.TEXT.value
+            )
+            self.lines_surface.blit(text, (10, y))
+            y += 24
@@ -0,0 +1,161 @@
+import os
+import time
+import zlib
+import struct
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import List, Optional
+
+from GameArchive import encode_move, decode_move
+
+# Journal layout (little-endian), one file for the game in progress:
+#
+#   header   MAGIC, VERSION, flags (bit 0: against the engine), engine difficulty,
+#            2 reserved bytes, i64 started_at (unix seconds)
+#   record   u16 move (GameArchive encoding), u32 milliseconds since the game started,
+#            u16 check (low bits of a CRC of the record and its ply)
+#   ...
+#
+# Records are only ever appended, so a crash can at worst leave one torn
+# record at the end, which the check rejects when the journal is read.
+MAGIC = b"CHJL"
+VERSION = 1
+JOURNAL_NAME = "unfinished.journal"  # Inside the games/ directory
+
+_HEADER = struct.Struct("<4sBBB2xq")
+_RECORD = struct.Struct("<HIH")
+_FLAG_ENGINE = 1
+
+
+class SyncPolicy(Enum):
+    """When journal writes are forced to disk with fsync"""
+    NEVER = auto()     # Leave it to the OS: survives the game crashing, not the machine
+    INTERVAL = auto()  # At most once per sync_interval seconds, on the next move
+    ALWAYS = auto()    # After every move
+
+
+@dataclass
+class JournalState:
+    """An unfinished game read back from a journal"""
+    use_stockfish: bool = False
+    difficulty: int = 0  # StockfishDifficulty value
+    started_at: int = 0  # Unix time in seconds
+    moves: List[str] = field(default_factory=list)  # UCI notation
+    elapsed_ms: List[int] = field(default_factory=list)  # When each move was played, since the start
+
+    @property
+    def length(self) -> int:
+        """Size in bytes of the valid part of the journal"""
+        return _HEADER.size + _RECORD.size * len(self.moves)
+
+
+def _check(ply: int, code: int, elapsed_ms: int) -> int:
+    return zlib.crc32(struct.pack("<IHI", ply, code, elapsed_ms)) & 0xFFFF
+
+
+def read_journal(path: str) -> Optional[JournalState]:
+    """Read an unfinished game, or None if there is no usable journal"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, flags, difficulty, started_at = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+
+    state = JournalState(use_stockfish=bool(flags & _FLAG_ENGINE), difficulty=difficulty, started_at=started_at)
+    for ply, offset in enumerate(range(_HEADER.size, len(data) - _RECORD.size + 1, _RECORD.size)):
+        code, elapsed_ms, check = _RECORD.unpack_from(data, offset)
+        if check != _check(ply, code, elapsed_ms):
+            break  # Torn or garbage tail
+        state.moves.append(decode_move(code))
+        state.elapsed_ms.append(elapsed_ms)
+    return state
+
+
+class GameJournal:
+    """Append-only log of the game in progress, one 8-byte record per move.
+
+    Each move goes straight to the file descriptor (no user-space buffer), so
+    it reaches the OS immediately and a crash of the game loses nothing;
+    fsync, the expensive part, follows the sync policy. Open with start_journal or resume_journal.
+    """
+
+    def __init__(self, path: str, fd: int, moves: int, sync_policy: SyncPolicy, sync_interval: float):
+        self.path = path
+        self.moves = moves
+        self.sync_policy = sync_policy
+        self.sync_interval = sync_interval
+        self._fd: Optional[int] = fd
+        self._last_sync = time.monotonic()
+
+    def append(self, uci: str, elapsed_ms: int) -> None:
+        """Record a move (ValueError if it is not valid UCI)"""
+        self._write(self.moves, uci, elapsed_ms)
+        self.moves += 1
+
+    def rewrite_last(self, uci: str, elapsed_ms: int) -> None:
+        """Replace the last move, e.g. once the promotion piece has been chosen"""
+        if self.moves:
+            self._write(self.moves - 1, uci, elapsed_ms)
+
+    def _write(self, ply: int, uci: str, elapsed_ms: int) -> None:
+        code = encode_move(uci)
+        elapsed_ms = min(max(elapsed_ms, 0), 0xFFFFFFFF)
+        record = _RECORD.pack(code, elapsed_ms, _check(ply, code, elapsed_ms))
+        os.lseek(self._fd, _HEADER.size + ply * _RECORD.size, os.SEEK_SET)  # No os.pwrite on Windows
+        os.write(self._fd, record)
+        if self.sync_policy == SyncPolicy.ALWAYS:
+            self.sync()
+        elif self.sync_policy == SyncPolicy.INTERVAL and time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Force everything written so far to disk"""
+        if self._fd is not None:
+            os.fsync(self._fd)
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sync and close, keeping the journal so the game can be resumed"""
+        if self._fd is None:
+            return
+        self.sync()
+        os.close(self._fd)
+        self._fd = None
+
+    def discard(self) -> None:
+        """Close and delete the journal (the game finished and was archived)"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _open(path: str, flags: int) -> int:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return os.open(path, flags | getattr(os, "O_BINARY", 0), 0o644)
+
+
+def start_journal(path: str, use_stockfish: bool, difficulty: int, started_at: int,
+                  sync_policy: SyncPolicy = SyncPolicy.INTERVAL, sync_interval: float = 2.0) -> GameJournal:
+    """Begin a journal for a new game, replacing any previous one"""
+    fd = _open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+    os.write(fd, _HEADER.pack(MAGIC, VERSION, _FLAG_ENGINE if use_stockfish else 0, difficulty, started_at))
+    journal = GameJournal(path, fd, 0, sync_policy, sync_interval)
+    journal.sync()
+    return journal
+
+
+def resume_journal(path: str, state: JournalState,
+                   sync_policy: SyncPolicy = SyncPolicy.INTERVAL, sync_interval: float = 2.0) -> GameJournal:
+    """Keep appending to the journal a game was resumed from, dropping any torn tail"""
+    fd = _open(path, os.O_RDWR)
+    os.ftruncate(fd, state.length)
+    return GameJournal(path, fd, len(state.moves), sync_policy, sync_interval)
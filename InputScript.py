@@ -0,0 +1,121 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import pygame
+
+from Diagnostics import get_logger
+
+log = get_logger("game")
+
+# Input that drives a game; window and system events are left out of scripts
+SCRIPTED_EVENTS = {
+    pygame.MOUSEBUTTONDOWN: ("pos", "button"),
+    pygame.MOUSEBUTTONUP: ("pos", "button"),
+    pygame.MOUSEMOTION: ("pos", "rel", "buttons"),
+    pygame.KEYDOWN: ("key", "mod", "unicode"),
+    pygame.KEYUP: ("key", "mod"),
+}
+
+
+# Clicks are ignored while the board is locked, so they are neither recorded nor replayed then
+LOCKED_EVENTS = {pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP}
+
+
+class ScriptClock:
+    """Milliseconds since the script started, not counting time the board was locked.
+
+    Scripts are timed on this clock rather than the wall clock, so waiting on an
+    engine that replies faster or slower than it did in the recording does not
+    shift the player's input relative to the game.
+    """
+
+    def __init__(self):
+        self.start: Optional[int] = None
+        self.paused_at: Optional[int] = None
+
+    def now(self) -> int:
+        ticks = pygame.time.get_ticks()
+        if self.start is None:
+            self.start = ticks
+        return (ticks if self.paused_at is None else self.paused_at) - self.start
+
+    @property
+    def paused(self) -> bool:
+        return self.paused_at is not None
+
+    def set_paused(self, paused: bool) -> None:
+        ticks = pygame.time.get_ticks()
+        if self.start is None:
+            self.start = ticks
+        if paused and self.paused_at is None:
+            self.paused_at = ticks
+        elif not paused and self.paused_at is not None:
+            self.start += ticks - self.paused_at
+            self.paused_at = None
+
+
+class InputRecorder:
+    """Records a game session's input with timestamps (--record script.json)"""
+
+    def __init__(self, path: str, game_settings: Dict[str, Any]):
+        self.path = path
+        self.game_settings = game_settings
+        self.clock = ScriptClock()
+        self.clock.now()
+        self.events: List[Dict[str, Any]] = []
+
+    def record(self, events: List[pygame.event.Event], locked: bool = False) -> None:
+        self.clock.set_paused(locked)
+        now = self.clock.now()
+        for event in events:
+            attributes = SCRIPTED_EVENTS.get(event.type)
+            if attributes is not None and not (locked and event.type in LOCKED_EVENTS):
+                entry = {"t": now, "type": pygame.event.event_name(event.type)}
+                entry.update((name, getattr(event, name)) for name in attributes if hasattr(event, name))
+                self.events.append(entry)
+
+    def save(self) -> None:
+        with open(self.path, "w") as f:
+            json.dump({"settings": self.game_settings, "events": self.events}, f, indent=1)
+        log.info("Recorded %d input events to %s", len(self.events), self.path)
+
+
+class InputPlayer:
+    """Replays a recorded script in real time, so a session can be repeated (--replay script.json)"""
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            script = json.load(f)
+        self.game_settings: Dict[str, Any] = script.get("settings", {})
+        self.events: List[Dict[str, Any]] = script["events"]
+        self.clock = ScriptClock()
+        self.position = 0
+        self._types = {pygame.event.event_name(event_type): event_type for event_type in SCRIPTED_EVENTS}
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.events)
+
+    def ms_until_next(self) -> Optional[int]:
+        """How long until the next scripted event is due (None once the script is done or held)"""
+        if self.finished or self.clock.paused:
+            return None
+        return max(0, self.events[self.position]["t"] - self.clock.now())
+
+    def due_events(self, locked: bool = False) -> List[pygame.event.Event]:
+        """The scripted events whose time has come; none while the board is locked"""
+        self.clock.set_paused(locked)
+        if locked:
+            return []
+        now = self.clock.now()
+        events = []
+        while not self.finished and self.events[self.position]["t"] <= now:
+            entry = dict(self.events[self.position])
+            self.position += 1
+            del entry["t"]
+            event_type = self._types[entry.pop("type")]
+            for name in ("pos", "rel", "buttons"):
+                if name in entry:
+                    entry[name] = tuple(entry[name])
+            events.append(pygame.event.Event(event_type, entry))
+        return events
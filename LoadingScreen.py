@@ -1,10 +1,15 @@
 import pygame
 import sys
+from Assets import get_font, render_text
 
 class LoadingScreen:
-    def __init__(self, screen_size):
-        self.screen = pygame.display.set_mode(screen_size)
-        pygame.display.set_caption("Chess - Loading...")
+    def __init__(self, screen_size, message="Downloading Stockfish...", screen=None):
+        # Pass a Surface to render off-screen
+        self.headless = screen is not None
+        if screen is None:
+            screen = pygame.display.set_mode(screen_size)
+            pygame.display.set_caption("Chess - Loading...")
+        self.screen = screen
         
         # Colors
         self.bg_color = (40, 40, 40)
@@ -20,10 +25,10 @@ class LoadingScreen:
         
         # Initialize font
         pygame.font.init()
-        self.font = pygame.font.Font(None, 36)
+        self.font = get_font(None, 36)
         
         # Loading text
-        self.loading_text = self.font.render("Downloading Stockfish...", True, self.text_color)
+        self.loading_text = render_text(self.font, message, self.text_color)
         self.text_rect = self.loading_text.get_rect(center=(screen_size[0] // 2, self.bar_y - 50))
         
         # Percentage text
@@ -31,7 +36,7 @@ class LoadingScreen:
         self.update_percentage_text()
     
     def update_percentage_text(self):
-        self.percentage_text = self.font.render(f"{self.percentage}%", True, self.text_color)
+        self.percentage_text = render_text(self.font, f"{self.percentage}%", self.text_color)
         self.percentage_rect = self.percentage_text.get_rect(center=(self.screen.get_width() // 2, self.bar_y + 50))
     
     def update(self, progress):
@@ -40,10 +45,11 @@ class LoadingScreen:
         self.update_percentage_text()
         
         # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        if not self.headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
         
         # Draw background
         self.screen.fill(self.bg_color)
@@ -65,4 +71,5 @@ class LoadingScreen:
         self.screen.blit(self.percentage_text, self.percentage_rect)
         
         # Update display
-        pygame.display.flip()
+        if not self.headless:
+            pygame.display.flip()
@@ -7,6 +7,7 @@ from typing import Dict, Optional, Tuple, List, Callable
 from dataclasses import dataclass
 import settings
 from StockfishDifficulty import StockfishDifficulty
+from Assets import get_font, render_text
 
 class MenuState(Enum):
     MAIN = auto()
@@ -25,6 +26,8 @@ class GameSettings:
     screen_size: Tuple[int, int] = (640, 640)
     board_size: Tuple[int, int] = (8, 8)
     slot_size: int = 80
+    resume: bool = False  # Continue the unfinished game from the autosave journal
+    puzzles: bool = False  # Solve puzzles from the puzzle store instead of playing a game
 
 class MenuColors:
     BG = (28, 40, 51)  # Dark blue background
@@ -37,13 +40,59 @@ class MenuColors:
     TITLE_GRADIENT_START = (52, 152, 219)  # Light blue
     TITLE_GRADIENT_END = (46, 204, 113)  # Green
 
+# The title gradient is sin(phase + x * frequency), so it repeats every period pixels
+TITLE_GRADIENT_FREQUENCY = 0.05
+TITLE_GRADIENT_PERIOD = 2 * math.pi / TITLE_GRADIENT_FREQUENCY
+
+_background_gradients: Dict[Tuple[int, int], pygame.Surface] = {}
+_title_gradient_strips: Dict[Tuple[int, int], pygame.Surface] = {}
+
+
+def _lerp_color(start: Tuple[int, int, int], end: Tuple[int, int, int], progress: float) -> Tuple[int, int, int]:
+    return tuple(int(start[i] + (end[i] - start[i]) * progress) for i in range(3))
+
+
+def get_background_gradient(size: Tuple[int, int]) -> pygame.Surface:
+    """The menu's vertical background gradient, built once per screen size"""
+    if size not in _background_gradients:
+        width, height = size
+        # One pixel column holds every row's color; widening it with a plain
+        # (unfiltered) scale repeats that column across the screen
+        column = pygame.Surface((1, height))
+        for y in range(height):
+            column.set_at((0, y), _lerp_color(MenuColors.BG, MenuColors.BG_ACCENT, y / height))
+        surface = pygame.transform.scale(column, (width, height))
+        _background_gradients[size] = surface.convert() if pygame.display.get_surface() else surface
+    return _background_gradients[size]
+
+
+def get_title_gradient_strip(width: int, height: int) -> pygame.Surface:
+    """Title gradient at phase zero, one period wider than the title so any phase is a window into it"""
+    key = (width, height)
+    if key not in _title_gradient_strips:
+        strip_width = width + int(math.ceil(TITLE_GRADIENT_PERIOD)) + 1
+        row = pygame.Surface((strip_width, 1), pygame.SRCALPHA)
+        for x in range(strip_width):
+            progress = (math.sin(x * TITLE_GRADIENT_FREQUENCY) + 1) / 2
+            color = _lerp_color(MenuColors.TITLE_GRADIENT_START, MenuColors.TITLE_GRADIENT_END, progress)
+            row.set_at((x, 0), (*color, 255))
+        _title_gradient_strips[key] = pygame.transform.scale(row, (strip_width, height))
+    return _title_gradient_strips[key]
+
+
+def _piece_silhouette(size: int) -> pygame.Surface:
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill((*MenuColors.TEXT, 30))  # Semi-transparent
+    return surface
+
+
 class Button:
     def __init__(self, rect: pygame.Rect, text: str, callback: Callable[[], None]):
         self.rect = rect
         self.text = text
         self.callback = callback
         self.state = ButtonState.NORMAL
-        self.font = pygame.font.SysFont('Arial', 24)
+        self.font = get_font('Arial', 24)
         self.hover_scale = 1.0
         self.target_scale = 1.0
         self.original_rect = pygame.Rect(rect)
@@ -75,11 +124,11 @@ class Button:
 
         # Draw text with shadow
         shadow_offset = 2
-        text_surface = self.font.render(self.text, True, (0, 0, 0))
+        text_surface = render_text(self.font, self.text, (0, 0, 0))
         text_rect = text_surface.get_rect(center=(self.rect.center[0] + shadow_offset, self.rect.center[1] + shadow_offset))
         screen.blit(text_surface, text_rect)
         
-        text_surface = self.font.render(self.text, True, MenuColors.TEXT)
+        text_surface = render_text(self.font, self.text, MenuColors.TEXT)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
 
@@ -180,19 +229,22 @@ class DifficultyButton(Button):
         return super().handle_event(event)
 
 class MainMenu:
-    def __init__(self, screen: pygame.Surface):
+    def __init__(self, screen: pygame.Surface, can_resume: bool = False):
         self.screen = screen
         self.state = MenuState.MAIN
         self.game_settings = GameSettings()
+        self.can_resume = can_resume
         self.buttons: Dict[MenuState, List[Button]] = self._create_buttons()
-        self.title_font = pygame.font.SysFont('Arial', 64, bold=True)
-        self.subtitle_font = pygame.font.SysFont('Arial', 32)
+        self.title_font = get_font('Arial', 64, bold=True)
+        self.subtitle_font = get_font('Arial', 32)
         self.time = 0
+        self.title_layer: Optional[pygame.Surface] = None
         self.background_pieces: List[Dict] = self._create_background_pieces()
 
     def _create_background_pieces(self) -> List[Dict]:
         pieces = []
         for _ in range(10):  # Create 10 floating pieces
+            size = random.randint(30, 60)
             pieces.append({
                 'pos': [
                     random.randint(0, self.screen.get_width()),
@@ -201,7 +253,8 @@ class MainMenu:
                 'speed': [random.randint(-30, 30), random.randint(-30, 30)],
                 'rotation': random.randint(0, 360),
                 'rot_speed': random.randint(-90, 90),
-                'size': random.randint(30, 60)
+                'size': size,
+                'surface': _piece_silhouette(size)
             })
         return pieces
 
@@ -217,8 +270,17 @@ class MainMenu:
         button_height = 60
         spacing = 30
 
+        # Resume button, above the others, only when there is an unfinished game
+        y = self.screen.get_height() // 2 - (button_height + spacing) // 2
+        if self.can_resume:
+            resume_button = Button(
+                pygame.Rect(center_x - button_width//2, y - button_height - spacing, button_width, button_height),
+                "Resume Game",
+                self._resume
+            )
+            buttons[MenuState.MAIN].append(resume_button)
+
         # Play button
-        y = self.screen.get_height() // 2
         play_button = Button(
             pygame.Rect(center_x - button_width//2, y, button_width, button_height),
             "Play",
@@ -226,6 +288,15 @@ class MainMenu:
         )
         buttons[MenuState.MAIN].append(play_button)
 
+        # Puzzles button
+        y += button_height + spacing
+        puzzles_button = Button(
+            pygame.Rect(center_x - button_width//2, y, button_width, button_height),
+            "Puzzles",
+            self._puzzles
+        )
+        buttons[MenuState.MAIN].append(puzzles_button)
+
         # Settings button
         y += button_height + spacing
         settings_button = Button(
@@ -273,27 +344,23 @@ class MainMenu:
 
         return buttons
 
+    def _resume(self) -> None:
+        self.game_settings.resume = True
+        self.state = MenuState.PLAYING
+
+    def _puzzles(self) -> None:
+        self.game_settings.puzzles = True
+        self.state = MenuState.PLAYING
+
     def _draw_background(self) -> None:
-        # Draw dark gradient background
-        for y in range(self.screen.get_height()):
-            progress = y / self.screen.get_height()
-            color = [
-                MenuColors.BG[i] + (MenuColors.BG_ACCENT[i] - MenuColors.BG[i]) * progress
-                for i in range(3)
-            ]
-            pygame.draw.line(self.screen, color, (0, y), (self.screen.get_width(), y))
+        # Static gradient, rendered once per screen size
+        self.screen.blit(get_background_gradient(self.screen.get_size()), (0, 0))
 
         # Draw floating chess pieces
         for piece in self.background_pieces:
-            # Draw piece silhouette
-            size = piece['size']
+            # Rotate piece silhouette
+            rotated_surface = pygame.transform.rotate(piece['surface'], piece['rotation'])
             pos = piece['pos']
-            alpha = 30  # Semi-transparent
-            piece_surface = pygame.Surface((size, size), pygame.SRCALPHA)
-            pygame.draw.rect(piece_surface, (*MenuColors.TEXT, alpha), (0, 0, size, size))
-            
-            # Rotate piece
-            rotated_surface = pygame.transform.rotate(piece_surface, piece['rotation'])
             self.screen.blit(rotated_surface, (
                 pos[0] - rotated_surface.get_width()//2,
                 pos[1] - rotated_surface.get_height()//2
@@ -319,33 +386,29 @@ class MainMenu:
         shadow_offset = 3
         
         # Draw shadow
-        shadow_surface = self.title_font.render(title_text, True, (0, 0, 0))
+        shadow_surface = render_text(self.title_font, title_text, (0, 0, 0))
         shadow_rect = shadow_surface.get_rect(center=(self.screen.get_width()//2 + shadow_offset, 100 + shadow_offset))
         self.screen.blit(shadow_surface, shadow_rect)
         
         # Draw gradient title
-        title_surface = self.title_font.render(title_text, True, MenuColors.TEXT)
+        title_surface = render_text(self.title_font, title_text, MenuColors.TEXT)
         title_rect = title_surface.get_rect(center=(self.screen.get_width()//2, 100))
         
-        # Create gradient overlay
-        gradient = pygame.Surface(title_surface.get_size(), pygame.SRCALPHA)
-        for x in range(gradient.get_width()):
-            progress = (math.sin(self.time * 2 + x * 0.05) + 1) / 2
-            color = [
-                MenuColors.TITLE_GRADIENT_START[i] + 
-                (MenuColors.TITLE_GRADIENT_END[i] - MenuColors.TITLE_GRADIENT_START[i]) * progress
-                for i in range(3)
-            ]
-            pygame.draw.line(gradient, (*color, 255), (x, 0), (x, gradient.get_height()))
-        
+        # Slide the precomputed gradient strip under the title instead of redrawing it
+        strip = get_title_gradient_strip(title_surface.get_width(), title_surface.get_height())
+        offset = int((self.time * 2 / TITLE_GRADIENT_FREQUENCY) % TITLE_GRADIENT_PERIOD)
+        if self.title_layer is None or self.title_layer.get_size() != title_surface.get_size():
+            self.title_layer = pygame.Surface(title_surface.get_size(), pygame.SRCALPHA)
+        self.title_layer.blit(strip, (0, 0), pygame.Rect(offset, 0, *title_surface.get_size()))
+
         # Apply gradient
-        gradient.blit(title_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        self.screen.blit(gradient, title_rect)
+        self.title_layer.blit(title_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        self.screen.blit(self.title_layer, title_rect)
 
         # Draw subtitle
         if self.state in [MenuState.MAIN, MenuState.SETTINGS]:
             subtitle_text = "Main Menu" if self.state == MenuState.MAIN else "Settings"
-            subtitle_surface = self.subtitle_font.render(subtitle_text, True, MenuColors.TEXT)
+            subtitle_surface = render_text(self.subtitle_font, subtitle_text, MenuColors.TEXT)
             subtitle_rect = subtitle_surface.get_rect(center=(self.screen.get_width()//2, 160))
             self.screen.blit(subtitle_surface, subtitle_rect)
 
@@ -0,0 +1,449 @@
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import chess
+import chess.polyglot
+
+from GameAnalyzer import bounded_imap
+from GameArchive import ArchivedGame, ArchiveWriter
+
+# Engine-vs-engine matches without pygame: games are spread over a process
+# pool, each opening is played twice with colours swapped, and every finished
+# game is appended to a game archive as soon as it comes back.
+DEFAULT_ARCHIVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games", "matches.chai")
+DEFAULT_GAMES = 100
+DEFAULT_MAX_PLIES = 400  # Adjudicated as a draw beyond this
+DEFAULT_BOOK_PLIES = 8
+DEFAULT_RANDOM_PLIES = 4  # Without a book
+FAKE_ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fake_uci_engine.py")
+
+
+@dataclass(frozen=True)
+class PlayerSpec:
+    """A match participant, parsed from "builtin:3", "stockfish:normal", "fake" or "fake:random\""""
+    kind: str
+    option: str
+
+    @property
+    def name(self) -> str:
+        if self.kind == "builtin":
+            return f"builtin-d{self.option}"
+        return f"{self.kind}-{self.option}" if self.option else self.kind
+
+
+def parse_player(spec: str) -> PlayerSpec:
+    """Parse a player spec (ValueError if it is not one of the supported kinds)"""
+    from StockfishDifficulty import StockfishDifficulty
+
+    kind, _, option = spec.strip().lower().partition(":")
+    if kind == "builtin":
+        option = option or "3"
+        if not option.isdigit() or not 1 <= int(option) <= 8:
+            raise ValueError(f"Built-in depth must be 1-8: {spec}")
+    elif kind == "stockfish":
+        option = option or "normal"
+        if option.upper() not in StockfishDifficulty.__members__:
+            raise ValueError(f"Unknown Stockfish difficulty: {spec}")
+    elif kind == "fake":
+        if option not in ("", "random"):
+            raise ValueError(f"Unknown fake engine mode: {spec}")
+    else:
+        raise ValueError(f"Unknown player {spec!r} (builtin:DEPTH, stockfish:DIFFICULTY, fake, fake:random)")
+    return PlayerSpec(kind, option)
+
+
+@dataclass
+class MatchGame:
+    """One game to play: who has which colour, from which opening"""
+    index: int
+    white: PlayerSpec
+    black: PlayerSpec
+    opening: List[str]  # UCI moves from the starting position
+    max_plies: int = DEFAULT_MAX_PLIES
+
+
+@dataclass
+class GameOutcome:
+    index: int
+    white: str
+    black: str
+    result: str  # 1-0, 0-1 or 1/2-1/2
+    termination: str
+    moves: List[str] = field(default_factory=list)  # UCI, including the opening
+    think_seconds: Dict[str, float] = field(default_factory=dict)  # Per colour, "white"/"black"
+    searched_moves: Dict[str, int] = field(default_factory=dict)
+    nodes: Dict[str, int] = field(default_factory=dict)
+
+
+class _BuiltinPlayer:
+    def __init__(self, depth: int):
+        from BuiltinEngine import BuiltinEngine
+        self.engine = BuiltinEngine(depth)
+
+    def play(self, board: chess.Board, game_id: int) -> Tuple[Optional[chess.Move], int]:
+        result = self.engine.play(board)
+        return result.move, result.nodes
+
+    def close(self) -> None:
+        pass
+
+
+class _UciPlayer:
+    def __init__(self, command, limit, configure=None, seeded: bool = False):
+        import chess.engine
+        self.engine = chess.engine.SimpleEngine.popen_uci(command, timeout=10.0)
+        if configure:
+            configure(self.engine)
+        self.limit = limit
+        self.seeded = seeded  # Reseed the engine's Seed option from the match seed each game
+        self.seeded_game: Optional[int] = None
+
+    def play(self, board: chess.Board, game_id: int) -> Tuple[Optional[chess.Move], int]:
+        import chess.engine
+        if self.seeded and self.seeded_game != game_id:
+            # Games land on workers in no fixed order, so the seed follows the game, not the process
+            self.engine.configure({"Seed": (_worker_seed + game_id) % (2 ** 31)})
+            self.seeded_game = game_id
+        # A new game id makes python-chess send ucinewgame first
+        result = self.engine.play(board, self.limit, game=game_id, info=chess.engine.INFO_BASIC)
+        return result.move, result.info.get("nodes", 0)
+
+    def close(self) -> None:
+        self.engine.quit()
+
+
+# Each worker process keeps its players (and their engine processes) across games
+_worker_players: Dict[PlayerSpec, object] = {}
+_worker_seed = 0
+
+
+def _init_worker(seed: int) -> None:
+    global _worker_seed
+    from multiprocessing.util import Finalize
+    _worker_seed = seed
+    # Runs when the pool shuts its workers down cleanly
+    Finalize(None, _close_players, exitpriority=10)
+
+
+def _close_players() -> None:
+    for player in _worker_players.values():
+        try:
+            player.close()
+        except Exception:
+            pass
+    _worker_players.clear()
+
+
+def _player(spec: PlayerSpec):
+    player = _worker_players.get(spec)
+    if player is None:
+        if spec.kind == "builtin":
+            player = _BuiltinPlayer(int(spec.option))
+        elif spec.kind == "stockfish":
+            from EngineCalibration import configure_engine, engine_limit, load_calibration
+            from StockfishDifficulty import StockfishDifficulty
+            from StockfishDownloader import get_stockfish_path
+            difficulty = StockfishDifficulty[spec.option.upper()]
+            player = _UciPlayer(get_stockfish_path(), engine_limit(difficulty, load_calibration()),
+                                lambda engine: configure_engine(engine, difficulty))
+        else:
+            import chess.engine
+            command = [sys.executable, FAKE_ENGINE]
+            if spec.option == "random":
+                command.append("--random")
+            player = _UciPlayer(command, chess.engine.Limit(nodes=1), seeded=spec.option == "random")
+        _worker_players[spec] = player
+    return player
+
+
+def play_game(game: MatchGame) -> GameOutcome:
+    """Play one game in a worker process"""
+    board = chess.Board()
+    for uci in game.opening:
+        board.push_uci(uci)
+    outcome = GameOutcome(index=game.index, white=game.white.name, black=game.black.name, result="1/2-1/2",
+                          termination="", moves=list(game.opening))
+    players = {chess.WHITE: game.white, chess.BLACK: game.black}
+    for side in ("white", "black"):
+        outcome.think_seconds[side] = 0.0
+        outcome.searched_moves[side] = 0
+        outcome.nodes[side] = 0
+
+    while True:
+        result = board.outcome(claim_draw=True)
+        if result is not None:
+            outcome.result = result.result()
+            outcome.termination = result.termination.name.lower()
+            return outcome
+        if len(board.move_stack) >= game.max_plies:
+            outcome.termination = "max plies"
+            return outcome
+
+        side = "white" if board.turn == chess.WHITE else "black"
+        start = time.perf_counter()
+        try:
+            move, nodes = _player(players[board.turn]).play(board, game.index)
+        except Exception as e:  # A crashed or misbehaving engine forfeits
+            failed = _worker_players.pop(players[board.turn], None)
+            if failed:
+                try:
+                    failed.close()
+                except Exception:
+                    pass
+            move, nodes = None, 0
+            outcome.termination = f"engine error: {e}"
+        outcome.think_seconds[side] += time.perf_counter() - start
+        outcome.searched_moves[side] += 1
+        outcome.nodes[side] += nodes or 0
+
+        if move is None or move not in board.legal_moves:
+            outcome.result = "0-1" if board.turn == chess.WHITE else "1-0"
+            outcome.termination = outcome.termination or f"illegal move {move}"
+            return outcome
+        board.push(move)
+        outcome.moves.append(move.uci())
+
+
+def make_opening(rng: random.Random, book: Optional[chess.polyglot.MemoryMappedReader], book_plies: int,
+                 random_plies: int) -> List[str]:
+    """Opening moves from a polyglot book, followed by random legal plies"""
+    for _ in range(100):
+        board = chess.Board()
+        if book:
+            for _ in range(book_plies):
+                try:
+                    board.push(book.weighted_choice(board, random=rng).move)
+                except IndexError:  # Out of book
+                    break
+        for _ in range(random_plies):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        if not board.is_game_over():
+            return [move.uci() for move in board.move_stack]
+    return []
+
+
+# Match statistics; scores are from the first player's point of view
+
+def elo_difference(score: float) -> float:
+    """Logistic Elo difference for an expected score strictly between 0 and 1"""
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def _score_and_variance(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    return score, variance
+
+
+def elo_interval(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """Elo difference and its 95% margin (inf when one side scored everything)"""
+    games = wins + draws + losses
+    if not games:
+        return 0.0, math.inf
+    score, variance = _score_and_variance(wins, draws, losses)
+    if score <= 0.0 or score >= 1.0:
+        return math.copysign(math.inf, score - 0.5), math.inf
+    deviation = 1.96 * math.sqrt(variance / games)
+    low, high = max(score - deviation, 1e-6), min(score + deviation, 1 - 1e-6)
+    return elo_difference(score), (elo_difference(high) - elo_difference(low)) / 2
+
+
+def likelihood_of_superiority(wins: int, losses: int) -> float:
+    """Probability that the first player is the stronger one (draws carry no information)"""
+    if wins + losses == 0:
+        return 0.5
+    return 0.5 * (1 + math.erf((wins - losses) / math.sqrt(2 * (wins + losses))))
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """Log-likelihood ratio of H1 (elo1) against H0 (elo0), in the normal approximation"""
+    games = wins + draws + losses
+    if not games:
+        return 0.0
+    score, variance = _score_and_variance(wins, draws, losses)
+    if variance == 0:
+        # A sweep or an all-draw run has no spread; a pseudo win and loss keep the LLR moving toward a bound
+        games += 2
+        score, variance = _score_and_variance(wins + 1, draws, losses + 1)
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def sprt_bounds(alpha: float, beta: float) -> Tuple[float, float]:
+    """LLR at which H0 (lower) or H1 (upper) is accepted"""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+@dataclass
+class MatchScore:
+    player: str
+    opponent: str
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    think_seconds: Dict[str, float] = field(default_factory=dict)  # Per player name
+    searched_moves: Dict[str, int] = field(default_factory=dict)
+    nodes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def add(self, outcome: GameOutcome) -> None:
+        if outcome.result == "1/2-1/2":
+            self.draws += 1
+        elif (outcome.result == "1-0") == (outcome.white == self.player):
+            self.wins += 1
+        else:
+            self.losses += 1
+        for side, name in (("white", outcome.white), ("black", outcome.black)):
+            self.think_seconds[name] = self.think_seconds.get(name, 0.0) + outcome.think_seconds[side]
+            self.searched_moves[name] = self.searched_moves.get(name, 0) + outcome.searched_moves[side]
+            self.nodes[name] = self.nodes.get(name, 0) + outcome.nodes[side]
+
+    def summary(self) -> str:
+        elo, margin = elo_interval(self.wins, self.draws, self.losses)
+        score = (self.wins + self.draws / 2) / self.games if self.games else 0.0
+        lines = [
+            f"Score of {self.player} vs {self.opponent}: {self.wins} - {self.losses} - {self.draws} "
+            f"[{score:.3f}] {self.games} games",
+            f"Elo difference: {elo:+.1f} +/- {margin:.1f}, "
+            f"LOS: {likelihood_of_superiority(self.wins, self.losses):.1%}"
+        ]
+        for name in (self.player, self.opponent):
+            moves = self.searched_moves.get(name, 0)
+            if moves:
+                seconds = self.think_seconds[name]
+                speed = f", {self.nodes[name] / seconds:,.0f} nodes/s" if self.nodes[name] and seconds else ""
+                lines.append(f"{name}: {seconds / moves * 1000:.1f} ms/move over {moves} moves{speed}")
+        return "\n".join(lines)
+
+
+def _schedule(player_a: PlayerSpec, player_b: PlayerSpec, games: int, seed: int, book_path: Optional[str],
+              book_plies: int, random_plies: int, max_plies: int):
+    """Game pairs: the same opening with each player as White once"""
+    rng = random.Random(seed)
+    book = chess.polyglot.open_reader(book_path) if book_path else None
+    try:
+        for pair in range((games + 1) // 2):
+            opening = make_opening(rng, book, book_plies, random_plies)
+            yield MatchGame(2 * pair, player_a, player_b, opening, max_plies)
+            if 2 * pair + 1 < games:
+                yield MatchGame(2 * pair + 1, player_b, player_a, opening, max_plies)
+    finally:
+        if book:
+            book.close()
+
+
+def run_match(player_a: PlayerSpec, player_b: PlayerSpec, games: int = DEFAULT_GAMES, workers: Optional[int] = None,
+              seed: int = 1, book_path: Optional[str] = None, book_plies: int = DEFAULT_BOOK_PLIES,
+              random_plies: Optional[int] = None, max_plies: int = DEFAULT_MAX_PLIES,
+              archive_path: Optional[str] = DEFAULT_ARCHIVE, sprt: Optional[Tuple[float, float]] = None,
+              alpha: float = 0.05, beta: float = 0.05, report_every: int = 10) -> MatchScore:
+    """Play a match and return the first player's score; stops early once an SPRT is decided"""
+    if random_plies is None:
+        random_plies = 0 if book_path else DEFAULT_RANDOM_PLIES
+    workers = workers or os.cpu_count() or 1
+    score = MatchScore(player_a.name, player_b.name)
+    lower, upper = sprt_bounds(alpha, beta)
+    writer = None
+    if archive_path:
+        os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+        writer = ArchiveWriter(archive_path)
+
+    schedule = _schedule(player_a, player_b, games, seed, book_path, book_plies, random_plies, max_plies)
+    started = time.perf_counter()
+    try:
+        with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(seed,)) as pool:
+            for outcome in bounded_imap(pool, play_game, schedule, workers * 2):
+                score.add(outcome)
+                if writer:
+                    writer.append(ArchivedGame(white=outcome.white, black=outcome.black, result=outcome.result,
+                                               played_at=int(time.time()), moves=outcome.moves))
+                if outcome.termination.startswith(("engine error", "illegal move")):
+                    print(f"Game {outcome.index + 1}: {outcome.termination}")
+
+                llr = sprt_llr(score.wins, score.draws, score.losses, *sprt) if sprt else 0.0
+                if score.games % report_every == 0 or score.games == games:
+                    elo, margin = elo_interval(score.wins, score.draws, score.losses)
+                    line = (f"Games {score.games}/{games}: +{score.wins} ={score.draws} -{score.losses}, "
+                            f"Elo {elo:+.1f} +/- {margin:.1f}, {score.games / (time.perf_counter() - started):.2f} games/s")
+                    if sprt:
+                        line += f", LLR {llr:.2f} ({lower:.2f}, {upper:.2f})"
+                    print(line)
+                if sprt and not lower < llr < upper:
+                    print(f"SPRT: H{'1' if llr >= upper else '0'} accepted after {score.games} games "
+                          f"(elo0 {sprt[0]:g}, elo1 {sprt[1]:g}, alpha {alpha:g}, beta {beta:g})")
+                    pool.terminate()  # Abandon the games still being played
+                    break
+            else:
+                pool.close()
+                pool.join()
+    except KeyboardInterrupt:
+        print("Interrupted, the finished games are kept")
+    finally:
+        if writer:
+            writer.close()
+    return score
+
+
+def build_parser(parser) -> None:
+    """Add the match command's arguments to an argparse parser"""
+    parser.add_argument("player", nargs=2, help="Players: builtin:DEPTH, stockfish:easy|normal|hard, fake, fake:random")
+    parser.add_argument("-n", "--games", type=int, default=DEFAULT_GAMES, help="Games to play")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to one per core)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the openings")
+    parser.add_argument("--book", default=None, help="Polyglot opening book (.bin)")
+    parser.add_argument("--book-plies", type=int, default=DEFAULT_BOOK_PLIES, help="Plies taken from the book")
+    parser.add_argument("--random-plies", type=int, default=None,
+                        help=f"Random plies after the book (default {DEFAULT_RANDOM_PLIES} without a book, 0 with)")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES, help="Adjudicate a draw after this many plies")
+    parser.add_argument("-o", "--archive", default=DEFAULT_ARCHIVE, help="Game archive the games are appended to")
+    parser.add_argument("--no-archive", action="store_true", help="Do not save the games")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"), default=None,
+                        help="Stop once an SPRT of elo0 against elo1 (logistic Elo) is decided")
+    parser.add_argument("--alpha", type=float, default=0.05, help="SPRT false positive rate")
+    parser.add_argument("--beta", type=float, default=0.05, help="SPRT false negative rate")
+    parser.add_argument("--report-every", type=int, default=10, help="Print the running score every N games")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai match`"""
+    try:
+        player_a, player_b = (parse_player(spec) for spec in args.player)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if player_a == player_b:
+        print("Both players are the same; the games would only measure colour and opening bias", file=sys.stderr)
+    if "stockfish" in (player_a.kind, player_b.kind):
+        from StockfishDownloader import get_stockfish_path
+        if not os.path.exists(get_stockfish_path()):
+            print(f"Engine not found at: {get_stockfish_path()}", file=sys.stderr)
+            return 1
+    if args.book and not os.path.exists(args.book):
+        print(f"Opening book not found: {args.book}", file=sys.stderr)
+        return 1
+
+    archive = None if args.no_archive else args.archive
+    score = run_match(player_a, player_b, games=args.games, workers=args.workers, seed=args.seed,
+                      book_path=args.book, book_plies=args.book_plies, random_plies=args.random_plies,
+                      max_plies=args.max_plies, archive_path=archive,
+                      sprt=tuple(args.sprt) if args.sprt else None, alpha=args.alpha, beta=args.beta,
+                      report_every=max(1, args.report_every))
+    if score.games:
+        print(score.summary())
+    if archive:
+        print(f"Games appended to {archive}")
+    return 0
@@ -0,0 +1,364 @@
+import os
+import sys
+import time
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import chess
+
+from DataClasses.Board import Board
+from DataClasses.Pieces import pieces
+from MovementManger import get_piece_moves, is_king_in_check, is_checkmate
+
+# Forced-mate search with depth-first proof-number search (df-pn) on the
+# game's own board and move generator.
+#
+# Every node stores a pair (phi, delta) from the point of view of the side to
+# move: phi is the proof number of "the side to move wins" and delta the proof
+# number of "the side to move loses". At the attacker's nodes only checking
+# moves are tried, so the tree stays narrow however many moves the position
+# has; at the defender's nodes every evasion is. A node is searched until its
+# numbers reach the thresholds handed down by its parent, so memory stays
+# proportional to the depth plus the transposition table, which is keyed by
+# position and remaining attacker moves. Searching for mate in 1, 2, ... N in
+# turn makes the first mate found the shortest.
+INFINITY = 1 << 30
+DEFAULT_MAX_MOVES = 3
+DEFAULT_MAX_NODES = 200_000  # Expanded nodes per search before giving up
+TABLE_LIMIT = 1_000_000  # Transposition table entries; the table is cleared when it grows past this
+MINED_RATINGS = {1: 900, 2: 1400, 3: 1800}  # Rating guesses by mate length for mined puzzles
+
+_PROMOTIONS = ("Q", "N", "R", "B")
+
+# A move on the game board: from x, from y, to x, to y, promotion piece letter or ""
+Move = Tuple[int, int, int, int, str]
+
+
+class _Exhausted(Exception):
+    """The node budget ran out"""
+
+
+@dataclass
+class MateResult:
+    """Outcome of a mate search"""
+    mate_in: Optional[int]  # Attacker moves to mate; None if there is none within the limit
+    moves: List[str] = field(default_factory=list)  # Mating line in UCI, against the longest defence
+    nodes: int = 0  # Nodes expanded
+    complete: bool = True  # False if the node budget ran out before the search was decided
+
+
+def move_to_uci(move: Move) -> str:
+    from_x, from_y, to_x, to_y, promotion = move
+    return (chess.SQUARE_NAMES[chess.square(from_x, 7 - from_y)] + chess.SQUARE_NAMES[chess.square(to_x, 7 - to_y)]
+            + promotion.lower())
+
+
+def legal_moves(board: Board, color: str) -> List[Move]:
+    """Every legal move for color, from MovementManger, with each promotion piece"""
+    moves = []
+    for y, row in enumerate(board.board):
+        for x, name in enumerate(row):
+            if name[0] != color[0]:
+                continue
+            for to_x, to_y in get_piece_moves(board, x, y):
+                if name[1] == "P" and to_y in (0, 7):
+                    moves.extend((x, y, to_x, to_y, promotion) for promotion in _PROMOTIONS)
+                else:
+                    moves.append((x, y, to_x, to_y, ""))
+    return moves
+
+
+def make_move(board: Board, move: Move) -> Board:
+    """The position after move, as a new board (castling, en passant and promotion included)"""
+    from_x, from_y, to_x, to_y, promotion = move
+    name = board.board[from_y][from_x]
+    after = board.copy()
+    after.en_passant_target = None  # Set again by setPiece for a double pawn step
+    if name[1] == "P" and from_x != to_x and board.board[to_y][to_x] == "-":
+        after.removePiece(to_x, from_y)  # En passant
+    after.setPiece(to_x, to_y, pieces[name[0] + promotion] if promotion else pieces[name], (from_x, from_y))
+    after.removePiece(from_x, from_y)
+    if name[1] == "K" and abs(to_x - from_x) == 2:
+        rook_from_x, rook_to_x = (7, 5) if to_x > from_x else (0, 3)
+        after.setPiece(rook_to_x, to_y, after.getPiece(rook_from_x, to_y), (rook_from_x, to_y))
+        after.removePiece(rook_from_x, to_y)
+    after.LastMove = ((from_x, from_y), (to_x, to_y))
+    return after
+
+
+def _position_key(board: Board, turn: str) -> tuple:
+    return ("".join("".join(row) for row in board.board), turn[0], board.en_passant_target,
+            tuple(board.moved_pieces.values()))
+
+
+class MateSearch:
+    """Finds the shortest forced mate for the side to move, or proves there is none within a limit"""
+
+    def __init__(self, max_nodes: int = DEFAULT_MAX_NODES):
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.table: Dict[tuple, Tuple[int, int]] = {}  # (position key, attacker moves left) -> (phi, delta)
+
+    def search(self, board: Board, attacker: str, max_moves: int = DEFAULT_MAX_MOVES) -> MateResult:
+        """Look for a mate by attacker, who is to move, in at most max_moves moves"""
+        self.nodes = 0
+        self.table.clear()  # Entries depend on who is attacking
+        try:
+            for moves in range(1, max_moves + 1):
+                if self._prove(board, attacker, moves):
+                    return MateResult(moves, self._line(board, attacker, moves), self.nodes)
+        except _Exhausted:
+            return MateResult(None, [], self.nodes, complete=False)
+        return MateResult(None, [], self.nodes)
+
+    def mating_moves(self, board: Board, attacker: str, moves: int) -> List[str]:
+        """Every first move that forces mate within moves (a puzzle wants exactly one)"""
+        defender = "Black" if attacker == "White" else "White"
+        found = []
+        for move, after, _ in self._expand(board, attacker, attacker):
+            if self._prove(after, attacker, moves - 1, to_move=defender):
+                found.append(move_to_uci(move))
+        return found
+
+    def _prove(self, board: Board, attacker: str, moves: int, to_move: Optional[str] = None) -> bool:
+        """Whether attacker mates within moves; to_move defaults to the attacker"""
+        to_move = to_move or attacker
+        phi, delta = self._mid(board, to_move, attacker, moves, INFINITY, INFINITY)
+        attacker_wins = phi if to_move == attacker else delta
+        return attacker_wins == 0
+
+    def _lookup(self, key: tuple, moves: int) -> Tuple[int, int]:
+        return self.table.get((key, moves), (1, 1))
+
+    def _store(self, key: tuple, moves: int, phi: int, delta: int) -> None:
+        if len(self.table) >= TABLE_LIMIT:
+            self.table.clear()
+        self.table[key, moves] = (phi, delta)
+
+    def _expand(self, board: Board, turn: str, attacker: str) -> List[Tuple[Move, Board, tuple]]:
+        """Children worth searching: the attacker's checking moves, or all of the defender's moves"""
+        opponent = "Black" if turn == "White" else "White"
+        children = []
+        for move in legal_moves(board, turn):
+            after = make_move(board, move)
+            if turn == attacker and not is_king_in_check(after, opponent):
+                continue
+            children.append((move, after, _position_key(after, opponent)))
+        return children
+
+    def _terminal(self, board: Board, turn: str, attacker: str, moves: int) -> Optional[Tuple[int, int]]:
+        """(phi, delta) of a node that is decided without searching it, else None"""
+        if turn == attacker:
+            return (INFINITY, 0) if moves == 0 else None
+        if moves == 0:
+            # The attacker has no moves left: only mate right now counts
+            return (INFINITY, 0) if is_checkmate(board, turn) else (0, INFINITY)
+        return None
+
+    def _mid(self, board: Board, turn: str, attacker: str, moves: int, phi_limit: int,
+             delta_limit: int) -> Tuple[int, int]:
+        """Search a node until its proof numbers reach the limits; returns its (phi, delta)"""
+        key = _position_key(board, turn)
+        terminal = self._terminal(board, turn, attacker, moves)
+        if terminal:
+            self._store(key, moves, *terminal)
+            return terminal
+
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _Exhausted()
+        child_moves = moves - 1 if turn == attacker else moves
+        children = self._expand(board, turn, attacker)
+        if not children:
+            # No check to give, checkmated, or stalemated (which the defender welcomes)
+            if turn == attacker or is_king_in_check(board, turn):
+                result = (INFINITY, 0)
+            else:
+                result = (0, INFINITY)
+            self._store(key, moves, *result)
+            return result
+
+        while True:
+            # phi is the best (smallest) child delta, delta the sum of the child phis
+            best = None
+            phi = second_delta = INFINITY
+            delta = 0
+            for index, (_, _, child_key) in enumerate(children):
+                child_phi, child_delta = self._lookup(child_key, child_moves)
+                delta = min(INFINITY, delta + child_phi)
+                if child_delta < phi:
+                    second_delta, phi, best = phi, child_delta, index
+                elif child_delta < second_delta:
+                    second_delta = child_delta
+            if phi >= phi_limit or delta >= delta_limit:
+                self._store(key, moves, phi, delta)
+                return phi, delta
+
+            _, child_board, child_key = children[best]
+            child_phi, child_delta = self._lookup(child_key, child_moves)
+            opponent = "Black" if turn == "White" else "White"
+            self._mid(child_board, opponent, attacker, child_moves,
+                      min(INFINITY, delta_limit - delta + child_phi),
+                      min(phi_limit, second_delta + 1))
+
+    def _shortest(self, board: Board, attacker: str, limit: int) -> int:
+        """Fewest attacker moves that mate, knowing that limit are enough"""
+        for moves in range(1, limit):
+            if self._prove(board, attacker, moves):
+                return moves
+        return limit
+
+    def _line(self, board: Board, attacker: str, moves: int) -> List[str]:
+        """A mating line: the attacker's quickest mate against the defence that lasts longest"""
+        defender = "Black" if attacker == "White" else "White"
+        line = []
+        while moves > 0:
+            for move, after, _ in self._expand(board, attacker, attacker):
+                if self._prove(after, attacker, moves - 1, to_move=defender):
+                    break
+            else:
+                break  # Lost the proof to a table reset; return the line so far
+            line.append(move_to_uci(move))
+            board, moves = after, moves - 1
+            if moves == 0:
+                break
+
+            longest = None
+            for reply, reply_board, _ in self._expand(board, defender, attacker):
+                length = self._shortest(reply_board, attacker, moves)
+                if longest is None or length > longest[0]:
+                    longest = (length, reply, reply_board)
+            if longest is None:
+                break  # Mated
+            moves, reply, board = longest
+            line.append(move_to_uci(reply))
+        return line
+
+
+def find_mate(fen: str, max_moves: int = DEFAULT_MAX_MOVES, max_nodes: int = DEFAULT_MAX_NODES) -> MateResult:
+    """Shortest forced mate for the side to move in a FEN position, within max_moves"""
+    board = Board()
+    attacker = board.loadFen(fen)
+    return MateSearch(max_nodes).search(board, attacker, max_moves)
+
+
+@dataclass
+class MinedPuzzle:
+    """A mate found in a saved game, as a Lichess-format puzzle row"""
+    id: str
+    fen: str  # Before the opponent's move that sets the puzzle up
+    moves: List[str]
+    mate_in: int
+
+    def csv_row(self) -> str:
+        rating = MINED_RATINGS.get(self.mate_in, 2000)
+        length = "oneMove" if self.mate_in == 1 else "short" if self.mate_in == 2 else "long"
+        return f"{self.id},{self.fen},{' '.join(self.moves)},{rating},0,0,0,mate mateIn{self.mate_in} {length},,"
+
+
+_worker_max_moves = DEFAULT_MAX_MOVES
+_worker_max_nodes = DEFAULT_MAX_NODES
+
+
+def _init_worker(max_moves: int, max_nodes: int) -> None:
+    """Pool initializer: the search limits for this process"""
+    global _worker_max_moves, _worker_max_nodes
+    _worker_max_moves = max_moves
+    _worker_max_nodes = max_nodes
+
+
+def mine_game(game) -> List[MinedPuzzle]:
+    """Puzzles from one saved game: positions where a check was played and a unique forced mate exists"""
+    puzzles = []
+    board = chess.Board(game.start_fen) if game.start_fen else chess.Board()
+    previous_fen = None
+    for ply, uci in enumerate(game.moves):
+        try:
+            move = chess.Move.from_uci(uci)
+        except ValueError:
+            break
+        if move not in board.legal_moves:
+            break
+        # Cheap filter: only positions where the player went for the king are searched
+        if previous_fen and board.gives_check(move):
+            position = Board()
+            attacker = position.loadFen(board.fen())
+            search = MateSearch(_worker_max_nodes)
+            result = search.search(position, attacker, _worker_max_moves)
+            if result.mate_in and (result.mate_in == 1
+                                   or len(search.mating_moves(position, attacker, result.mate_in)) == 1):
+                puzzles.append(MinedPuzzle(f"{game.name}#{ply}", previous_fen, [game.moves[ply - 1]] + result.moves,
+                                           result.mate_in))
+        previous_fen = board.fen()
+        board.push(move)
+    return puzzles
+
+
+def mine_games(source: str, output, max_moves: int = DEFAULT_MAX_MOVES, max_nodes: int = DEFAULT_MAX_NODES,
+               workers: Optional[int] = None) -> Tuple[int, int]:
+    """Write a Lichess-format puzzle CSV of the forced mates in saved games; returns (games, puzzles)"""
+    from GameAnalyzer import bounded_imap, iter_saved_games
+    from PuzzleStore import LICHESS_COLUMNS
+
+    workers = workers or os.cpu_count() or 1
+    games = found = 0
+    output.write(",".join(LICHESS_COLUMNS) + "\n")
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker,
+                              initargs=(max_moves, max_nodes)) as pool:
+        for puzzles in bounded_imap(pool, mine_game, iter_saved_games(source), workers * 2):
+            for puzzle in puzzles:
+                output.write(puzzle.csv_row() + "\n")
+            games += 1
+            found += len(puzzles)
+        pool.close()
+        pool.join()
+    return games, found
+
+
+def build_parser(parser) -> None:
+    """Add the mate command's arguments to an argparse parser"""
+    parser.add_argument("fen", nargs="?", default=None, help="Position to solve (side to move attacks)")
+    parser.add_argument("-n", "--moves", type=int, default=DEFAULT_MAX_MOVES, help="Longest mate to look for, in moves")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_MAX_NODES, help="Node budget per search")
+    parser.add_argument("--mine", metavar="GAMES", default=None,
+                        help="Mine mate puzzles from saved games (games/ or an archive) instead")
+    parser.add_argument("-o", "--output", default=None, help="Puzzle CSV for --mine (defaults to stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="Search processes for --mine (defaults to one per core)")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai mate`"""
+    if args.mine:
+        if not os.path.exists(args.mine):
+            print(f"Games not found: {args.mine}", file=sys.stderr)
+            return 1
+        started = time.perf_counter()
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            games, found = mine_games(args.mine, output, args.moves, args.nodes, args.workers)
+        finally:
+            if args.output:
+                output.close()
+        print(f"Mined {found} puzzles from {games} games in {time.perf_counter() - started:.1f}s"
+              + (f" -> {args.output}" if args.output else ""), file=sys.stderr)
+        return 0
+
+    if not args.fen:
+        print("Give a FEN to solve, or --mine GAMES", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    try:
+        result = find_mate(args.fen, args.moves, args.nodes)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    if result.mate_in:
+        print(f"Mate in {result.mate_in}: {' '.join(result.moves)}")
+    elif result.complete:
+        print(f"No mate in {args.moves} or fewer")
+    else:
+        print(f"Undecided after {result.nodes} nodes")
+    print(f"{result.nodes} nodes in {elapsed:.2f}s")
+    return 0
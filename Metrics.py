@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from functools import wraps
+from typing import Callable, Deque, Dict, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+WINDOW = 256  # Timings kept per name for the rolling percentiles
+
+
+@dataclass
+class TimingStats:
+    """Rolling figures for one timed operation, in milliseconds"""
+    count: int  # All calls since metrics were enabled, not just the window
+    p50: float
+    p95: float
+    max: float
+    last: float
+
+
+class Metrics:
+    """Hot-path timings and counters (toggled with the M key in a game).
+
+    Timings keep a rolling window per name for p50/p95 and a running max.
+    While disabled, timed() wrappers cost one attribute check per call.
+    Engine replies are recorded from worker threads, hence the lock.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Deque[float]] = {}
+        self._calls: Dict[str, int] = {}
+        self._max: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._calls.clear()
+            self._max.clear()
+            self._counters.clear()
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        """Add one timing"""
+        if not self.enabled:
+            return
+        with self._lock:
+            window = self._timings.get(name)
+            if window is None:
+                window = self._timings[name] = deque(maxlen=WINDOW)
+            window.append(elapsed_ms)
+            self._calls[name] = self._calls.get(name, 0) + 1
+            if elapsed_ms > self._max.get(name, 0.0):
+                self._max[name] = elapsed_ms
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Bump a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def timings(self) -> Dict[str, TimingStats]:
+        """Current figures for every timed name"""
+        with self._lock:
+            windows = {name: sorted(window) for name, window in self._timings.items()}
+            calls = dict(self._calls)
+            maxima = dict(self._max)
+            lasts = {name: window[-1] for name, window in self._timings.items()}
+        return {
+            name: TimingStats(
+                count=calls[name],
+                p50=values[len(values) // 2],
+                p95=values[min(len(values) - 1, int(len(values) * 0.95))],
+                max=maxima[name],
+                last=lasts[name]
+            )
+            for name, values in windows.items()
+        }
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def dump_json(self, path: str) -> None:
+        """Write the current timings and counters to a JSON file"""
+        report = {
+            "written_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "window": WINDOW,
+            "timings_ms": {name: asdict(stats) for name, stats in sorted(self.timings().items())},
+            "counters": dict(sorted(self.counters().items()))
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+# Shared by the game loop, the move generator and the engine code
+metrics = Metrics()
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator recording a function's run time under name while metrics are enabled"""
+    def decorate(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorate
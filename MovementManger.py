@@ -3,6 +3,10 @@ from dataclasses import dataclass
 from enum import Enum
 from DataClasses.Board import Board
 from DataClasses.Pieces import PieceType, PieceImage
+from Metrics import timed
+from Diagnostics import get_logger
+
+log = get_logger("movegen")
 
 @dataclass
 class MoveContext:
@@ -321,13 +325,15 @@ def is_king_in_check(board: Board, color: str, check_king_moves=True) -> bool:
     
     return False
 
+@timed("GetMovements")
 def GetMovements(board: Board, x: int, y: int) -> List[Tuple[int, int]]:
     """Legacy function for compatibility - returns a list of valid moves for a piece"""
     moves = get_piece_moves(board, x, y)
-    print(f"Calculating moves for piece at ({x}, {y})")  # Debug print
-    print(f"Found {len(moves)} possible moves: {moves}")  # Debug print
+    if log.debug_enabled:
+        log.debug("Found %d possible moves for the piece at (%d, %d): %s", len(moves), x, y, sorted(moves))
     return list(moves)  # Convert set to list for compatibility
 
+@timed("IsCheckMate")
 def IsCheckMate(board: Board, current_player_color: str) -> bool:
     """Check if the current player is in checkmate"""
     # We check if the current player is in checkmate
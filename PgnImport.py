@@ -0,0 +1,270 @@
+import io
+import os
+import sys
+import bz2
+import gzip
+import lzma
+import time
+import multiprocessing
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import chess
+import chess.pgn
+
+from GameAnalyzer import bounded_imap
+from GameArchive import ARCHIVE_EXTENSION, ArchivedGame, ArchiveWriter, encode_game, game_from_headers
+from GameDatabase import GameDatabase, PositionHasher
+
+DEFAULT_CHUNK_GAMES = 500  # Games per task sent to a worker
+STANDARD_VARIANTS = {"standard", "chess", "from position"}
+
+_DECOMPRESSORS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def open_pgn(path: str) -> Tuple[TextIO, BinaryIO]:
+    """Open a PGN file for streaming, decompressing .gz/.bz2/.xz on the fly.
+
+    Returns the text stream and the underlying raw file, whose position tracks
+    how much of the input (compressed bytes) has been consumed. "-" reads stdin.
+    """
+    raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+    decompressor = _DECOMPRESSORS.get(os.path.splitext(path)[1].lower())
+    binary = decompressor(raw, "rb") if decompressor else raw
+    return io.TextIOWrapper(binary, encoding="utf-8", errors="replace"), raw
+
+
+@contextmanager
+def closing_pgn(pgn_file: TextIO, raw: BinaryIO) -> Iterator[TextIO]:
+    """Close what open_pgn opened on exit, including the raw file under a decompressor (stdin stays open)"""
+    try:
+        yield pgn_file
+    finally:
+        if raw is not sys.stdin.buffer:
+            pgn_file.close()
+            raw.close()
+
+
+def _ends_in_comment(line: str, in_comment: bool) -> bool:
+    """Whether a {comment} is still open after this movetext line.
+
+    Brace comments do not nest, and a ; comment runs to the end of the line,
+    so braces inside either are ignored.
+    """
+    if ";" not in line:
+        # Without nesting, only the last brace on the line matters
+        return line.rfind("{") > line.rfind("}") if "{" in line or "}" in line else in_comment
+    pos = 0
+    while True:
+        if in_comment:
+            end = line.find("}", pos)
+            if end < 0:
+                return True
+            in_comment = False
+            pos = end + 1
+        else:
+            start = line.find("{", pos)
+            semicolon = line.find(";", pos)
+            if start < 0 or 0 <= semicolon < start:
+                return False
+            in_comment = True
+            pos = start + 1
+
+
+def iter_pgn_chunks(pgn_file: TextIO, games_per_chunk: int = DEFAULT_CHUNK_GAMES) -> Iterator[str]:
+    """Split a PGN stream into pieces of about games_per_chunk complete games.
+
+    Only looks at line starts (a tag line after movetext begins a new game), so
+    splitting is much cheaper than parsing and memory stays at one chunk.
+    """
+    lines: List[str] = []
+    games = 0
+    in_movetext = False
+    in_comment = False  # A "[" inside a multi-line {comment} is not a tag
+    after_blank = False
+    for line in pgn_file:
+        if in_comment and after_blank and line.startswith("[Event "):
+            # An unterminated comment must not swallow the rest of the file
+            in_comment = False
+        if line.startswith("[") and not in_comment:
+            if in_movetext:
+                in_movetext = False
+                games += 1
+                if games >= games_per_chunk:
+                    yield "".join(lines)
+                    lines = []
+                    games = 0
+        elif line.strip():
+            in_movetext = True
+            # % lines are escapes, ignored by PGN readers
+            if not line.startswith("%"):
+                in_comment = _ends_in_comment(line, in_comment)
+        after_blank = not line.strip()
+        lines.append(line)
+    if lines:
+        yield "".join(lines)
+
+class _MainLineVisitor(chess.pgn.BaseVisitor):
+    """Collects the tags and main line of a game without building a game tree.
+
+    With index_positions, position keys are hashed while the parser plays
+    the moves, so games bound for the database are not replayed a second time.
+    """
+
+    def __init__(self, index_positions: bool = False):
+        self.index_positions = index_positions
+
+    def begin_game(self) -> None:
+        self.headers: Dict[str, str] = {}
+        self.moves: List[str] = []
+        self.keys: List[int] = []
+        self.hasher: Optional[PositionHasher] = None
+        self.error: Optional[Exception] = None
+
+    def visit_header(self, tagname: str, tagvalue: str) -> None:
+        self.headers[tagname] = tagvalue
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def visit_move(self, board: chess.Board, move: chess.Move) -> None:
+        if not move:
+            self.handle_error(ValueError("null moves cannot be stored"))
+        self.moves.append(move.uci())
+        if self.hasher:
+            self.hasher.before_move(board, move)
+
+    def visit_board(self, board: chess.Board) -> None:
+        if not self.index_positions:
+            return
+        if self.hasher is None:
+            self.hasher = PositionHasher(board)  # Starting position
+        elif len(self.keys) > len(self.moves):
+            return  # Called again without a move (after a SAN error); the game is skipped anyway
+        else:
+            self.hasher.after_move(board)
+        self.keys.append(self.hasher.key(board))
+
+    def handle_error(self, error: Exception) -> None:
+        if self.error is None:
+            self.error = error
+
+    def result(self) -> "_MainLineVisitor":
+        return self
+
+
+@dataclass
+class ImportBatch:
+    """What a worker made of one chunk, ready for the output"""
+    records: List[bytes] = field(default_factory=list)  # Archive output: encoded games
+    games: List[Tuple[ArchivedGame, list]] = field(default_factory=list)  # Database output: games with position keys
+    imported: int = 0
+    skipped: int = 0
+    first_error: Optional[str] = None
+
+
+_index_positions = False
+
+
+def _init_worker(index_positions: bool) -> None:
+    global _index_positions
+    _index_positions = index_positions
+
+
+def parse_chunk(chunk: str) -> ImportBatch:
+    """Parse and validate every game in a chunk of PGN text"""
+    batch = ImportBatch()
+    pgn_file = io.StringIO(chunk)
+    while True:
+        visitor = chess.pgn.read_game(pgn_file, Visitor=lambda: _MainLineVisitor(_index_positions))
+        if visitor is None:
+            return batch
+        headers = visitor.headers
+        error = visitor.error
+        if headers.get("Variant", "Standard").lower() not in STANDARD_VARIANTS:
+            error = f"unsupported variant {headers['Variant']}"
+        if error is None:
+            game = game_from_headers(headers, visitor.moves)
+            try:
+                if _index_positions:
+                    positions = list(zip(range(len(visitor.keys)), visitor.keys, visitor.moves + [None]))
+                    batch.games.append((game, positions))
+                else:
+                    batch.records.append(encode_game(game))
+            except ValueError as e:
+                error = e
+        if error is None:
+            batch.imported += 1
+        else:
+            batch.skipped += 1
+            if batch.first_error is None:
+                batch.first_error = f"{headers.get('White', '?')} - {headers.get('Black', '?')}: {error}"
+
+
+def import_pgn_files(paths: List[str], output: str, workers: Optional[int] = None,
+                     games_per_chunk: int = DEFAULT_CHUNK_GAMES, progress: bool = True) -> Tuple[int, int]:
+    """Stream PGN files into a game archive (.chai) or game database (anything else).
+
+    The main process only splits the input into chunks and writes results;
+    parsing, validation and position hashing run in a process pool. At most a
+    few chunks per worker are in flight, so memory does not grow with the input.
+    Returns (games imported, games skipped).
+    """
+    from tqdm import tqdm
+
+    index_positions = not output.endswith(ARCHIVE_EXTENSION)
+    sink = GameDatabase(output) if index_positions else ArchiveWriter(output)
+    workers = workers or os.cpu_count() or 1
+    imported = skipped = 0
+    started = time.perf_counter()
+    try:
+        with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(index_positions,)) as pool:
+            for path in paths:
+                pgn_file, raw = open_pgn(path)
+                total = os.path.getsize(path) if path != "-" else None
+                with closing_pgn(pgn_file, raw), tqdm(total=total, unit="B", unit_scale=True, desc=os.path.basename(path),
+                                    disable=not progress) as bar:
+                    chunks = iter_pgn_chunks(pgn_file, games_per_chunk)
+                    for batch in bounded_imap(pool, parse_chunk, chunks, workers * 2):
+                        if index_positions:
+                            sink.add_indexed_games(batch.games)
+                        else:
+                            for record in batch.records:
+                                sink.append_record(record)
+                        imported += batch.imported
+                        skipped += batch.skipped
+                        if batch.first_error:
+                            bar.write(f"Skipping {batch.first_error}")
+                        if total is not None:
+                            bar.update(raw.tell() - bar.n)
+                        bar.set_postfix(games=imported, skipped=skipped,
+                                        rate=f"{imported / (time.perf_counter() - started):.0f}/s")
+            pool.close()
+            pool.join()
+    finally:
+        sink.close()
+    return imported, skipped
+
+
+def build_parser(parser) -> None:
+    """Add the import command's arguments to an argparse parser"""
+    parser.add_argument("pgn", nargs="+", help="PGN files, optionally .gz/.bz2/.xz compressed ('-' for stdin)")
+    parser.add_argument("output", help=f"Game archive (*{ARCHIVE_EXTENSION}) or game database (e.g. *.sqlite)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (defaults to one per core)")
+    parser.add_argument("--chunk-games", type=int, default=DEFAULT_CHUNK_GAMES, help="Games per worker task")
+    parser.add_argument("--quiet", action="store_true", help="Do not show a progress bar")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai import`"""
+    missing = [path for path in args.pgn if path != "-" and not os.path.exists(path)]
+    if missing:
+        print(f"PGN not found: {', '.join(missing)}", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    imported, skipped = import_pgn_files(args.pgn, args.output, args.workers, args.chunk_games, not args.quiet)
+    elapsed = time.perf_counter() - started
+    print(f"Imported {imported} games ({skipped} skipped) -> {args.output} "
+          f"in {elapsed:.1f}s ({imported / max(elapsed, 1e-9):.0f} games/s)")
+    return 0
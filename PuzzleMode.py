@@ -0,0 +1,76 @@
+from typing import List, Optional
+
+import chess
+
+from PuzzleStore import Puzzle
+
+
+class PuzzleAttempt:
+    """The player's progress through one puzzle's solution.
+
+    moves[0] is the opponent's move that sets the puzzle up; after it the
+    player and the opponent alternate through the rest of the line. As on
+    Lichess, any move that gives checkmate solves the puzzle, even one that
+    differs from the stored solution.
+    """
+
+    def __init__(self, puzzle: Puzzle):
+        board = chess.Board(puzzle.fen)
+        for uci in puzzle.moves:
+            move = chess.Move.from_uci(uci)
+            if move not in board.legal_moves:
+                raise ValueError(f"Puzzle {puzzle.id}: {uci} is illegal in {board.fen()}")
+            board.push(move)
+        if len(puzzle.moves) < 2:
+            raise ValueError(f"Puzzle {puzzle.id} has no solution")
+
+        self.puzzle = puzzle
+        self.ply = 1  # Index of the next move in puzzle.moves
+        self.mistakes = 0
+        self.player = "White" if chess.Board(puzzle.fen).turn == chess.BLACK else "Black"
+        self.message = f"Find the best move for {self.player}"
+
+    @property
+    def setup_move(self) -> str:
+        return self.puzzle.moves[0]
+
+    @property
+    def solved(self) -> bool:
+        return self.ply >= len(self.puzzle.moves)
+
+    @property
+    def expected(self) -> Optional[str]:
+        """The solution's next move, None once solved"""
+        return None if self.solved else self.puzzle.moves[self.ply]
+
+    def promotion_for(self, uci: str) -> str:
+        """Piece to promote to when the player moves a pawn to the last rank (the solution's, else a queen)"""
+        expected = self.expected or ""
+        return expected[4:] if expected[:4] == uci[:4] and len(expected) == 5 else "q"
+
+    def check(self, uci: str, gives_mate: bool) -> bool:
+        """Judge the player's move; on success the opponent's reply (if any) is next"""
+        if gives_mate:
+            self.ply = len(self.puzzle.moves)
+        elif uci == self.expected:
+            self.ply += 1
+        else:
+            self.mistakes += 1
+            self.message = "Not the move, try again"
+            return False
+        self.message = "Solved! N: next puzzle" if self.solved else "Correct, keep going"
+        return True
+
+    def reply(self) -> Optional[str]:
+        """Take the opponent's reply to the player's last correct move"""
+        if self.solved or self.ply % 2 == 1:
+            return None
+        uci = self.puzzle.moves[self.ply]
+        self.ply += 1
+        self.message = f"Find the best move for {self.player}"
+        return uci
+
+    def status_lines(self) -> List[str]:
+        """What the info panel shows about this puzzle"""
+        themes = ", ".join(self.puzzle.themes[:3])
+        return [f"Puzzle {self.puzzle.id} ({self.puzzle.rating})", themes, self.message]
@@ -0,0 +1,419 @@
+import os
+import csv
+import sys
+import mmap
+import random
+import struct
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from GameArchive import decode_move, encode_move
+
+# Puzzle store layout (all integers little-endian, every section 8-byte aligned):
+#
+#   header        MAGIC, VERSION, 3 reserved bytes, u32 puzzle count, u32 theme count,
+#                 u64 offsets, ratings, buckets and theme directory positions
+#   records       u16 rating, u8 id length, u8 FEN length, u8 theme count, u8 move count,
+#                 id and FEN (UTF-8), one u8 theme number per theme,
+#                 one u16 per move (GameArchive.encode_move), sorted by rating
+#   offsets       u64 offset of every record
+#   ratings       u16 rating of every record, ascending
+#   buckets       u32 index of the first record in each RATING_BUCKET-wide rating band, plus the count
+#   postings      per theme, the u32 indexes of its records, ascending
+#   directory     per theme: u64 postings position, u32 postings count, u8 name length, name
+#
+# The store is opened with mmap and nothing but the header and theme
+# directory is read up front, so opening is instant however many puzzles it
+# holds. A rating band maps to a contiguous index range through the bucket
+# table (one bisect inside a bucket at each end) and a theme narrows that to
+# a slice of its postings list, so drawing a random puzzle touches one record.
+MAGIC = b"CHPZ"
+VERSION = 1
+STORE_EXTENSION = ".chpz"
+DEFAULT_STORE_NAME = "puzzles" + STORE_EXTENSION  # Inside the games/ directory
+RATING_BUCKET = 50
+MAX_RATING = 3999  # Higher ratings share the last bucket
+MAX_THEMES = 255
+
+_HEADER = struct.Struct("<4sB3xIIQQQQ")
+_RECORD = struct.Struct("<HBBBB")
+_THEME = struct.Struct("<QIB")
+_BUCKETS = MAX_RATING // RATING_BUCKET + 1
+
+# Columns of the Lichess puzzle database (lichess_db_puzzle.csv)
+LICHESS_COLUMNS = ["PuzzleId", "FEN", "Moves", "Rating", "RatingDeviation", "Popularity", "NbPlays", "Themes",
+                   "GameUrl", "OpeningTags"]
+
+
+@dataclass
+class Puzzle:
+    """One puzzle; as in the Lichess database, moves[0] is the opponent's move leading into it"""
+    id: str
+    fen: str
+    moves: List[str]  # UCI notation
+    rating: int
+    themes: List[str] = field(default_factory=list)
+
+
+def _bucket(rating: int) -> int:
+    return min(max(rating, 0) // RATING_BUCKET, _BUCKETS - 1)
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _align(f: BinaryIO) -> int:
+    """Pad f to an 8-byte boundary and return the position"""
+    position = f.tell()
+    if position % 8:
+        f.write(bytes(8 - position % 8))
+    return f.tell()
+
+
+def encode_puzzle(puzzle: Puzzle, theme_numbers: Dict[str, int]) -> bytes:
+    """Serialize a puzzle to a record, numbering new themes in theme_numbers"""
+    puzzle_id = puzzle.id.encode("utf-8")[:255]
+    fen = puzzle.fen.encode("ascii")
+    if len(fen) > 255 or not 0 < len(puzzle.moves) <= 255:
+        raise ValueError(f"Puzzle {puzzle.id} cannot be stored")
+    themes = []
+    for theme in dict.fromkeys(puzzle.themes):
+        if theme not in theme_numbers:
+            if len(theme_numbers) == MAX_THEMES:
+                raise ValueError(f"More than {MAX_THEMES} themes")
+            theme_numbers[theme] = len(theme_numbers)
+        themes.append(theme_numbers[theme])
+    moves = array("H", (encode_move(uci) for uci in puzzle.moves))
+    rating = min(max(puzzle.rating, 0), 0xFFFF)
+    return b"".join((
+        _RECORD.pack(rating, len(puzzle_id), len(fen), len(themes), len(moves)),
+        puzzle_id,
+        fen,
+        bytes(themes),
+        _little_endian(moves)
+    ))
+
+
+def _record_themes(record: bytes) -> bytes:
+    _, id_length, fen_length, theme_count, _ = _RECORD.unpack_from(record)
+    start = _RECORD.size + id_length + fen_length
+    return record[start:start + theme_count]
+
+
+def write_store(path: str, puzzles: Iterable[Puzzle]) -> Tuple[int, int]:
+    """Build a store from puzzles in any order; returns (stored, skipped).
+
+    Records are spooled to a temporary file and then copied in rating order,
+    so memory use is a few bytes per puzzle rather than the whole set. The
+    store replaces path only once it is complete.
+    """
+    spool_path = path + ".spool"
+    part_path = path + ".part"
+    theme_numbers: Dict[str, int] = {}
+    ratings = array("H")
+    offsets = array("Q")
+    lengths = array("I")
+    skipped = 0
+    try:
+        with open(spool_path, "w+b") as spool:
+            for puzzle in puzzles:
+                try:
+                    record = encode_puzzle(puzzle, theme_numbers)
+                except (ValueError, UnicodeEncodeError):
+                    skipped += 1
+                    continue
+                offsets.append(spool.tell())
+                lengths.append(len(record))
+                ratings.append(min(max(puzzle.rating, 0), 0xFFFF))
+                spool.write(record)
+            spool.flush()
+
+            order = sorted(range(len(ratings)), key=ratings.__getitem__)
+            spooled = mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) if spool.tell() else b""
+            try:
+                _write_sorted(part_path, spooled, order, offsets, lengths, ratings, theme_numbers)
+            finally:
+                if isinstance(spooled, mmap.mmap):
+                    spooled.close()
+        os.replace(part_path, path)
+    finally:
+        for leftover in (spool_path, part_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return len(order), skipped
+
+
+def _write_sorted(path: str, spooled, order: List[int], offsets: array, lengths: array, ratings: array,
+                  theme_numbers: Dict[str, int]) -> None:
+    postings = [array("I") for _ in theme_numbers]
+    sorted_offsets = array("Q")
+    sorted_ratings = array("H")
+    with open(path, "wb") as f:
+        f.write(bytes(_HEADER.size))
+        for index, old in enumerate(order):
+            record = spooled[offsets[old]:offsets[old] + lengths[old]]
+            sorted_offsets.append(f.tell())
+            sorted_ratings.append(ratings[old])
+            for theme in _record_themes(record):
+                postings[theme].append(index)
+            f.write(record)
+
+        offsets_position = _align(f)
+        f.write(_little_endian(sorted_offsets))
+        ratings_position = _align(f)
+        f.write(_little_endian(sorted_ratings))
+
+        buckets = array("I", [0] * (_BUCKETS + 1))
+        for rating in sorted_ratings:
+            buckets[_bucket(rating) + 1] += 1
+        for bucket in range(1, _BUCKETS + 1):
+            buckets[bucket] += buckets[bucket - 1]
+        buckets_position = _align(f)
+        f.write(_little_endian(buckets))
+
+        postings_positions = []
+        for theme_postings in postings:
+            postings_positions.append(_align(f))
+            f.write(_little_endian(theme_postings))
+
+        directory_position = _align(f)
+        for (theme, number), position in zip(theme_numbers.items(), postings_positions):
+            name = theme.encode("utf-8")[:255]
+            f.write(_THEME.pack(position, len(postings[number]), len(name)))
+            f.write(name)
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(order), len(theme_numbers), offsets_position, ratings_position,
+                             buckets_position, directory_position))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class PuzzleStore:
+    """Random access to a puzzle store through a read-only memory map"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._views: List[memoryview] = []
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{path} is not a puzzle store")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, theme_count, offsets, ratings, buckets, directory = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a puzzle store")
+        if version > VERSION:
+            self._map.close()
+            raise ValueError(f"{path} uses puzzle store version {version}, newer than this program supports")
+
+        self._count = count
+        self._offsets = self._array(offsets, count, "Q")
+        self._ratings = self._array(ratings, count, "H")
+        self._buckets = self._array(buckets, _BUCKETS + 1, "I")
+        self._postings: Dict[str, object] = {}
+        self._themes: List[str] = []
+        position = directory
+        for _ in range(theme_count):
+            postings_position, postings_count, name_length = _THEME.unpack_from(self._map, position)
+            position += _THEME.size
+            name = self._map[position:position + name_length].decode("utf-8", errors="replace")
+            position += name_length
+            self._themes.append(name)
+            self._postings[name] = self._array(postings_position, postings_count, "I")
+
+    def _array(self, position: int, count: int, typecode: str):
+        """A typed view of a section; a byteswapped copy on big-endian hosts"""
+        size = array(typecode).itemsize * count
+        if sys.byteorder == "big":
+            values = array(typecode, self._map[position:position + size])
+            values.byteswap()
+            return values
+        view = memoryview(self._map)[position:position + size]
+        self._views.append(view)
+        typed = view.cast(typecode)
+        self._views.append(typed)
+        return typed
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def themes(self) -> List[str]:
+        """Theme names in the order they were first seen"""
+        return list(self._themes)
+
+    def get(self, index: int) -> Puzzle:
+        """The puzzle at index; indexes run in ascending rating order"""
+        if not 0 <= index < self._count:
+            raise IndexError(f"Puzzle index {index} out of range")
+        offset = self._offsets[index]
+        rating, id_length, fen_length, theme_count, move_count = _RECORD.unpack_from(self._map, offset)
+        offset += _RECORD.size
+        puzzle_id = self._map[offset:offset + id_length].decode("utf-8", errors="replace")
+        offset += id_length
+        fen = self._map[offset:offset + fen_length].decode("ascii")
+        offset += fen_length
+        themes = [self._themes[number] for number in self._map[offset:offset + theme_count]]
+        offset += theme_count
+        moves = array("H", self._map[offset:offset + 2 * move_count])
+        if sys.byteorder == "big":
+            moves.byteswap()
+        return Puzzle(id=puzzle_id, fen=fen, moves=[decode_move(code) for code in moves], rating=rating,
+                      themes=themes)
+
+    def _first_rated(self, rating: int) -> int:
+        """Index of the first puzzle rated at least rating"""
+        if rating <= 0:
+            return 0
+        bucket = _bucket(rating)
+        return bisect_left(self._ratings, rating, self._buckets[bucket], self._buckets[bucket + 1])
+
+    def _band(self, min_rating: Optional[int], max_rating: Optional[int],
+              theme: Optional[str]) -> Tuple[Optional[object], int, int]:
+        """The postings list (None for every puzzle) and the slice of it inside the rating band"""
+        start = 0 if min_rating is None else self._first_rated(min_rating)
+        end = self._count if max_rating is None else self._first_rated(max_rating + 1)
+        if theme is None:
+            return None, start, max(start, end)
+        postings = self._postings.get(theme)
+        if postings is None:
+            return None, 0, 0
+        first = bisect_left(postings, start)
+        return postings, first, max(first, bisect_left(postings, end))
+
+    def count(self, min_rating: Optional[int] = None, max_rating: Optional[int] = None,
+              theme: Optional[str] = None) -> int:
+        """How many puzzles are rated within [min_rating, max_rating] and have theme"""
+        _, start, end = self._band(min_rating, max_rating, theme)
+        return end - start
+
+    def random(self, min_rating: Optional[int] = None, max_rating: Optional[int] = None,
+               theme: Optional[str] = None, rng: Optional[random.Random] = None) -> Optional[Puzzle]:
+        """A random puzzle rated within [min_rating, max_rating] with theme, or None if there is none"""
+        postings, start, end = self._band(min_rating, max_rating, theme)
+        if start == end:
+            return None
+        pick = (rng or random).randrange(start, end)
+        return self.get(pick if postings is None else postings[pick])
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._map.close()
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_lichess_csv(csv_file: TextIO) -> Iterator[Puzzle]:
+    """Puzzles from the Lichess puzzle database CSV, with or without its header row"""
+    reader = csv.reader(csv_file)
+    columns = {name: index for index, name in enumerate(LICHESS_COLUMNS)}
+    for row in reader:
+        if not row or row[0].startswith("#"):
+            continue
+        if row[0] == "PuzzleId":
+            columns = {name: index for index, name in enumerate(row)}
+            continue
+        try:
+            yield Puzzle(
+                id=row[columns["PuzzleId"]],
+                fen=row[columns["FEN"]],
+                moves=row[columns["Moves"]].split(),
+                rating=int(row[columns["Rating"]]),
+                themes=row[columns["Themes"]].split() if columns["Themes"] < len(row) else []
+            )
+        except (IndexError, ValueError):
+            continue  # Malformed row
+
+
+def build_from_csv(csv_paths: List[str], store_path: str) -> Tuple[int, int]:
+    """Build a store from Lichess-format CSV files (optionally .gz/.bz2/.xz); returns (stored, skipped)"""
+    from PgnImport import open_pgn, closing_pgn
+
+    def puzzles() -> Iterator[Puzzle]:
+        for path in csv_paths:
+            with closing_pgn(*open_pgn(path)) as text:
+                yield from iter_lichess_csv(text)
+
+    return write_store(store_path, puzzles())
+
+
+def _parse_band(value: str) -> Tuple[Optional[int], Optional[int]]:
+    """ "1200-1600", "1200-" or "-1600" -> (min, max)"""
+    low, _, high = value.partition("-")
+    try:
+        return (int(low) if low else None), (int(high) if high else None)
+    except ValueError:
+        raise ValueError(f"Invalid rating band: {value}") from None
+
+
+def build_parser(parser) -> None:
+    """Add the puzzles command's arguments to an argparse parser"""
+    parser.add_argument("action", choices=["build", "info", "random"],
+                        help="build a store from Lichess puzzle CSV, summarize it, or draw random puzzles")
+    parser.add_argument("store", help=f"Puzzle store (e.g. games/{DEFAULT_STORE_NAME})")
+    parser.add_argument("csv", nargs="*", help="Lichess puzzle CSV files for build, optionally compressed "
+                                               "('-' for stdin)")
+    parser.add_argument("--rating", default=None, help="Rating band for random, e.g. 1200-1600")
+    parser.add_argument("--theme", default=None, help="Theme for random, e.g. fork or mateIn2")
+    parser.add_argument("-n", "--count", type=int, default=1, help="Puzzles to draw for random")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai puzzles`"""
+    if args.action == "build":
+        if not args.csv:
+            print("build needs at least one CSV file", file=sys.stderr)
+            return 1
+        missing = [path for path in args.csv if path != "-" and not os.path.exists(path)]
+        if missing:
+            print(f"CSV not found: {', '.join(missing)}", file=sys.stderr)
+            return 1
+        stored, skipped = build_from_csv(args.csv, args.store)
+        print(f"Stored {stored} puzzles ({skipped} skipped) -> {args.store}")
+        return 0
+
+    if not os.path.exists(args.store):
+        print(f"Puzzle store not found: {args.store}", file=sys.stderr)
+        return 1
+    try:
+        store = PuzzleStore(args.store)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    with store:
+        if args.action == "info":
+            size = os.path.getsize(args.store)
+            print(f"{args.store}: {len(store)} puzzles, {len(store.themes)} themes, {size} bytes")
+            if len(store):
+                print(f"  ratings {store.get(0).rating}-{store.get(len(store) - 1).rating}")
+            themes = sorted(store.themes, key=lambda theme: -store.count(theme=theme))
+            for theme in themes:
+                print(f"  {theme:<20}{store.count(theme=theme)}")
+            return 0
+
+        try:
+            min_rating, max_rating = _parse_band(args.rating) if args.rating else (None, None)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        for _ in range(args.count):
+            puzzle = store.random(min_rating, max_rating, args.theme)
+            if puzzle is None:
+                print("No puzzle matches", file=sys.stderr)
+                return 1
+            print(f"{puzzle.id}  {puzzle.rating}  {puzzle.fen}  {' '.join(puzzle.moves)}  {' '.join(puzzle.themes)}")
+    return 0
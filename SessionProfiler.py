@@ -0,0 +1,112 @@
+import cProfile
+import os
+import pstats
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from Diagnostics import get_logger
+
+log = get_logger("game")
+
+PROFILES_DIR = "profiles"
+
+# (subsystem, filename fragments, function name fragments); the first match wins
+_SUBSYSTEMS: List[Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = [
+    ("idle", (), ("pygame.event.wait", "'tick' of 'pygame.time.Clock'", "pygame.time.wait")),
+    ("console", (os.path.join("logging", ""), "Diagnostics.py"), ("builtins.print", "'write' of '_io.", "printBoard")),
+    ("sync", (), ("_sync_chess_board",)),
+    ("movegen", ("MovementManger.py", os.path.join("DataClasses", "Board.py"), os.path.join("DataClasses", "Pieces.py")),
+     ()),
+    ("engine I/O", ("EngineSupervisor.py", "EngineAnalysis.py", os.path.join("chess", "engine.py"), "asyncio",
+                    "concurrent", "threading.py", "subprocess.py", "selectors.py"), ()),
+    ("sync", (os.path.join("chess", "__init__.py"), "MoveHistory.py"), ()),
+    ("render", ("GameInfoMenu.py", "Assets.py", "MainMenu.py", "pygame"), ("draw", "pygame", "render", "blit")),
+]
+
+
+def subsystem(function: Tuple[str, int, str]) -> str:
+    """Which part of the game a profiled function belongs to"""
+    filename, _, name = function
+    for group, files, names in _SUBSYSTEMS:
+        if any(fragment in filename for fragment in files) or any(fragment in name for fragment in names):
+            return group
+    return "other"
+
+
+def _attribute(function: Tuple[str, int, str], stats: Dict) -> str:
+    """Subsystem of a function; library code (deepcopy, enum, ...) counts towards its heaviest caller's"""
+    stack, seen = [function], {function}
+    while stack:
+        current = stack.pop()
+        group = subsystem(current)
+        if group != "other":
+            return group
+        callers = stats[current][4] if current in stats else {}
+        # Pushed lightest first, so the heaviest caller's chain is followed first
+        for caller in sorted(callers, key=lambda caller: callers[caller][3]):
+            if caller not in seen:
+                seen.add(caller)
+                stack.append(caller)
+    return "other"
+
+
+def summarize(stats: pstats.Stats, top: int = 8) -> str:
+    """Self time per subsystem, and the functions that account for most of it"""
+    totals: Dict[str, float] = {}
+    functions: Dict[str, List[Tuple[float, int, Tuple[str, int, str]]]] = {}
+    for function, (_, calls, self_time, _, _) in stats.stats.items():
+        group = _attribute(function, stats.stats)
+        totals[group] = totals.get(group, 0.0) + self_time
+        functions.setdefault(group, []).append((self_time, calls, function))
+
+    total = sum(totals.values()) or 1e-9
+    lines = [f"{'subsystem':<12}{'self time':>12}{'share':>8}"]
+    for group, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"{group:<12}{seconds:>10.3f} s{seconds / total:>8.1%}")
+    for group in sorted(totals, key=totals.get, reverse=True):
+        lines.append("")
+        lines.append(f"{group}:")
+        for self_time, calls, (filename, line, name) in sorted(functions[group], reverse=True)[:top]:
+            where = f"{os.path.basename(filename)}:{line}" if filename != "~" else ""
+            lines.append(f"  {self_time * 1000:>10.1f} ms {calls:>9} calls  {name} {where}".rstrip())
+    return "\n".join(lines)
+
+
+class SessionProfiler:
+    """cProfile over one game session (enabled with --profile).
+
+    Each session is written to profiles/ as a .prof file (for pstats,
+    snakeviz and the like) plus a text summary grouped by subsystem. Only
+    the game loop's thread is profiled; engine searches run on worker
+    threads and show up as 'engine reply' in the M timings instead.
+    """
+
+    def __init__(self, directory: str = PROFILES_DIR):
+        self.directory = directory
+        self.profile = cProfile.Profile()
+        self.started_at = datetime.now()
+        self._start = 0.0
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self) -> Optional[str]:
+        """Stop profiling and write the session; returns the summary's path"""
+        self.profile.disable()
+        elapsed = time.perf_counter() - self._start
+        base = os.path.join(self.directory, f"session_{self.started_at.strftime('%Y%m%d_%H%M%S')}")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.profile.dump_stats(base + ".prof")
+            stats = pstats.Stats(self.profile)
+            with open(base + ".txt", "w") as f:
+                f.write(f"Session profile: {elapsed:.1f} s wall time, {base}.prof\n\n")
+                f.write(summarize(stats))
+                f.write("\n")
+        except (OSError, TypeError) as e:  # TypeError: no calls were profiled
+            log.error("Error writing profile: %s", e)
+            return None
+        log.info("Profile written to %s.txt", base)
+        return base + ".txt"
@@ -1,25 +1,29 @@
 import pygame
 import sys
 import os
+from Assets import get_font, render_text
 
 class SplashScreen:
-    def __init__(self, screen_size):
-        """Initialize the splash screen"""
+    def __init__(self, screen_size, screen=None):
+        """Initialize the splash screen (pass a Surface to render off-screen)"""
         pygame.init()
-        self.screen = pygame.display.set_mode(screen_size)
-        pygame.display.set_caption("Chess AI - Loading...")
+        self.headless = screen is not None
+        if screen is None:
+            screen = pygame.display.set_mode(screen_size)
+            pygame.display.set_caption("Chess AI - Loading...")
+        self.screen = screen
         
         # Colors
         self.bg_color = (28, 40, 51)  # Dark blue background
         self.text_color = (236, 240, 241)  # Almost white
         
         # Initialize fonts
-        self.title_font = pygame.font.SysFont('Arial', 48, bold=True)
-        self.subtitle_font = pygame.font.SysFont('Arial', 24)
+        self.title_font = get_font('Arial', 48, bold=True)
+        self.subtitle_font = get_font('Arial', 24)
         
         # Create text surfaces
-        self.title_text = self.title_font.render("Chess AI", True, self.text_color)
-        self.subtitle_text = self.subtitle_font.render("Loading resources...", True, self.text_color)
+        self.title_text = render_text(self.title_font, "Chess AI", self.text_color)
+        self.subtitle_text = render_text(self.subtitle_font, "Loading resources...", self.text_color)
         
         # Position text
         self.title_rect = self.title_text.get_rect(center=(screen_size[0] // 2, screen_size[1] // 2 - 30))
@@ -33,16 +37,17 @@ class SplashScreen:
     def update(self):
         """Update the splash screen animation"""
         # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        if not self.headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
         
         # Update loading dots animation
         current_time = pygame.time.get_ticks()
         if current_time - self.dot_timer > self.dot_interval:
             self.dots = "." * ((len(self.dots) + 1) % 4)
-            self.subtitle_text = self.subtitle_font.render(f"Loading resources{self.dots}", True, self.text_color)
+            self.subtitle_text = render_text(self.subtitle_font, f"Loading resources{self.dots}", self.text_color)
             self.subtitle_rect = self.subtitle_text.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() // 2 + 30))
             self.dot_timer = current_time
         
@@ -50,4 +55,5 @@ class SplashScreen:
         self.screen.fill(self.bg_color)
         self.screen.blit(self.title_text, self.title_rect)
         self.screen.blit(self.subtitle_text, self.subtitle_rect)
-        pygame.display.flip()
+        if not self.headless:
+            pygame.display.flip()
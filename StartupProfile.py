@@ -0,0 +1,76 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+
+class StartupProfile:
+    """Times the imports and init phases of a launch (enabled with --startup-profile).
+
+    Imports are timed by wrapping __import__: each module first imported at
+    the top level of the main thread is reported with everything it pulled in.
+    Imports made by background threads are left out, since they do not delay
+    the first frame.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.start = time.perf_counter()
+        self.imports: List[Tuple[str, float]] = []
+        self.phases: List[Tuple[str, float]] = []
+        self._depth = 0
+        self._original_import = None
+
+    def enable(self) -> None:
+        """Start timing imports and phases from now on"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules or threading.current_thread() is not threading.main_thread():
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.imports.append((name, time.perf_counter() - start))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time an init phase (free when profiling is off)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> None:
+        """Print the collected timings and stop timing imports"""
+        if not self.enabled:
+            return
+        builtins.__import__ = self._original_import
+        self.enabled = False
+
+        print(f"Startup profile ({(time.perf_counter() - self.start) * 1000:.1f} ms to first frame)")
+        print("  Imports:")
+        for name, elapsed in sorted(self.imports, key=lambda item: item[1], reverse=True):
+            print(f"    {elapsed * 1000:8.1f} ms  {name}")
+        print(f"    {sum(elapsed for _, elapsed in self.imports) * 1000:8.1f} ms  total")
+        print("  Phases:")
+        for name, elapsed in self.phases:
+            print(f"    {elapsed * 1000:8.1f} ms  {name}")
+
+
+# Shared by main.py, which enables it before its own imports run
+startup_profile = StartupProfile()
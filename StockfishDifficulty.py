@@ -1,7 +1,27 @@
+from dataclasses import dataclass
 from enum import Enum, auto
+from typing import Dict, Optional
 
 class StockfishDifficulty(Enum):
     """Difficulty levels for the Stockfish chess engine"""
     EASY = auto()    # Lower depth, skill level, and time
     NORMAL = auto()  # Medium depth and skill level
     HARD = auto()    # Maximum depth and skill level
+
+@dataclass(frozen=True)
+class DifficultyProfile:
+    """How a difficulty level is played.
+
+    Strength comes from a fixed node budget (see EngineCalibration) rather than
+    a depth or time limit, so the same budget gives the same moves on any host.
+    """
+    target_latency: float  # Seconds per reply the node budget is calibrated for
+    elo: Optional[int]     # UCI_Elo when the engine supports UCI_LimitStrength, None for full strength
+    skill_level: int       # Fallback for engines without UCI_Elo
+    hash_mb: int
+
+DIFFICULTY_PROFILES: Dict[StockfishDifficulty, DifficultyProfile] = {
+    StockfishDifficulty.EASY: DifficultyProfile(target_latency=0.1, elo=1350, skill_level=5, hash_mb=32),
+    StockfishDifficulty.NORMAL: DifficultyProfile(target_latency=0.5, elo=1900, skill_level=10, hash_mb=64),
+    StockfishDifficulty.HARD: DifficultyProfile(target_latency=1.0, elo=None, skill_level=20, hash_mb=128),
+}
@@ -1,12 +1,32 @@
 import os
 import sys
-import requests
+import json
+import hashlib
 import platform
-import time
-from tqdm import tqdm
+import subprocess
+
+from Diagnostics import get_logger
+
+log = get_logger("download")
+
+# Bytes per read while downloading; large chunks keep per-chunk overhead negligible
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Pinned SHA-256 of each published binary; update the pin whenever the binary
+# in res/Stockfish is replaced. CHESS_AI_STOCKFISH_SHA256 overrides the pin. A
+# platform with neither falls back to trusting the first binary that completes
+# the UCI handshake: its hash is recorded and any later change to it is refused.
+STOCKFISH_SHA256 = {
+    "stockfish-windows.exe": None,
+    "stockfish-macos": None,
+    "stockfish-linux": None,
+}
 
 def get_stockfish_url():
     """Get the appropriate Stockfish URL based on the platform"""
+    # Allows pointing the downloader at a mirror or a local test server
+    if os.environ.get("CHESS_AI_STOCKFISH_URL"):
+        return os.environ["CHESS_AI_STOCKFISH_URL"]
     system = platform.system().lower()
     if system == "windows":
         return "https://github.com/Dashtiss/Chess-AI/raw/refs/heads/main/res/Stockfish/stockfish-windows.exe"
@@ -40,59 +60,169 @@ def get_stockfish_dir():
     os.makedirs(stockfish_dir, exist_ok=True)
     return stockfish_dir
 
+def get_stockfish_path():
+    """Get the full path of the Stockfish binary (which may not exist yet)"""
+    return os.path.join(get_stockfish_dir(), get_stockfish_filename())
+
+def get_pinned_sha256():
+    """Get the expected SHA-256 of this platform's Stockfish binary (None when there is no pin)"""
+    return os.environ.get("CHESS_AI_STOCKFISH_SHA256") or STOCKFISH_SHA256.get(get_stockfish_filename())
+
+def file_sha256(path):
+    """Hash a file in large chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def uci_handshake(path, timeout=10.0):
+    """Check that a binary starts and speaks UCI"""
+    try:
+        result = subprocess.run(
+            [path],
+            input="uci\nquit\n",
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        log.warning("Stockfish handshake failed: %s", e)
+        return False
+    return any(line.strip() == "uciok" for line in result.stdout.splitlines())
+
+def _marker_path(target_path):
+    return target_path + ".verified"
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def is_cached_binary_valid(target_path):
+    """Check a previously downloaded binary.
+
+    The full check (hash plus UCI handshake) runs once; its result is recorded
+    next to the binary together with the file's size and mtime, so later
+    launches only need a stat as long as the file is untouched.
+    """
+    if not os.path.exists(target_path):
+        return False
+
+    pinned = get_pinned_sha256()
+    signature = _file_signature(target_path)
+    try:
+        with open(_marker_path(target_path), 'r') as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        marker = {}
+    if (marker.get("size") == signature["size"] and marker.get("mtime_ns") == signature["mtime_ns"]
+            and (not pinned or marker.get("sha256") == pinned)):
+        return True
+
+    # Without a pin, the hash recorded when the binary was first trusted stands in for one
+    expected = pinned or marker.get("sha256")
+    sha256 = file_sha256(target_path)
+    if expected and sha256 != expected:
+        log.warning("Cached Stockfish does not match the expected SHA-256 (%s)", sha256)
+        return False
+    if not uci_handshake(target_path):
+        log.warning("Cached Stockfish did not complete the UCI handshake")
+        return False
+    if not expected:
+        log.warning("No pinned SHA-256 for %s; trusting it after the UCI handshake and recording %s",
+                    get_stockfish_filename(), sha256)
+
+    with open(_marker_path(target_path), 'w') as f:
+        json.dump(dict(signature, sha256=sha256), f)
+    return True
+
+def _fetch(url, part_path, callback=None):
+    """Download url into part_path, resuming from whatever part_path already holds"""
+    # Imported here so that games which never download anything do not pay for it
+    import requests
+
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with requests.get(url, stream=True, headers=headers, timeout=(10, 60)) as response:
+        if response.status_code == 416:
+            # Range starts at or past the end: the previous attempt got everything
+            return
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            mode = 'ab'
+        else:
+            # Server ignored the Range header and is sending the whole file
+            mode = 'wb'
+            offset = 0
+
+        total_size = int(response.headers.get('content-length', 0))
+        total_size = total_size + offset if total_size else 0
+        downloaded = offset
+
+        with open(part_path, mode) as f:
+            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(data)
+                downloaded += len(data)
+                if callback and total_size:
+                    callback(int((downloaded / total_size) * 100))
+            f.flush()
+            os.fsync(f.fileno())
+
 def download_stockfish(callback=None):
-    """Download Stockfish from GitHub with progress tracking"""
+    """Download Stockfish from GitHub with progress tracking.
+
+    The binary is streamed to a .part file (resumed with a Range request if an
+    earlier download was interrupted), checked against the pinned SHA-256 (if
+    there is one) and only then renamed into place, so a crash can never leave a truncated binary
+    where a valid one is expected. Returns the binary's path, or None on failure.
+    """
     url = get_stockfish_url()
-    filename = get_stockfish_filename()
-    stockfish_dir = get_stockfish_dir()
-    target_path = os.path.join(stockfish_dir, filename)
-    
-    # Skip download if file already exists and is valid
-    if os.path.exists(target_path):
-        # Verify file permissions
+    target_path = get_stockfish_path()
+    part_path = target_path + ".part"
+
+    if is_cached_binary_valid(target_path):
+        # Set executable permissions on Unix-like systems
         if platform.system() != "Windows":
             current_perms = os.stat(target_path).st_mode & 0o777
             if current_perms != 0o755:
                 os.chmod(target_path, 0o755)
-        
         if callback:
-            # Show quick progress for cached file
-            for progress in range(0, 101, 20):
-                callback(progress)
-                time.sleep(0.05)
+            callback(100)
         return target_path
-    
+
+    # Anything at the target path failed validation and has to be replaced
+    for stale_path in (target_path, _marker_path(target_path)):
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
     try:
-        # Send a GET request to the URL
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        # Get the total file size
-        total_size = int(response.headers.get('content-length', 0))
-        
-        # Download the file with progress tracking
-        with open(target_path, 'wb') as f:
-            if total_size == 0:
-                f.write(response.content)
-                if callback:
-                    callback(100)
-            else:
-                downloaded = 0
-                for data in response.iter_content(chunk_size=4096):
-                    downloaded += len(data)
-                    f.write(data)
-                    if callback:
-                        progress = int((downloaded / total_size) * 100)
-                        callback(progress)
-        
+        _fetch(url, part_path, callback)
+
+        pinned = get_pinned_sha256()
+        sha256 = file_sha256(part_path)
+        if pinned and sha256 != pinned:
+            # A corrupt partial file would poison every future resume
+            os.remove(part_path)
+            log.error("Downloaded Stockfish failed SHA-256 verification (%s)", sha256)
+            return None
+
         # Set executable permissions on Unix-like systems
         if platform.system() != "Windows":
-            os.chmod(target_path, 0o755)
-        
+            os.chmod(part_path, 0o755)
+
+        os.replace(part_path, target_path)
+
+        if not is_cached_binary_valid(target_path):
+            os.remove(target_path)
+            return None
+
+        if callback:
+            callback(100)
         return target_path
     
     except Exception as e:
-        print(f"Error downloading Stockfish: {e}")
-        if os.path.exists(target_path):
-            os.remove(target_path)
+        # The .part file is kept so the next attempt can resume
+        log.error("Error downloading Stockfish: %s", e)
         return None
@@ -0,0 +1,140 @@
+import os
+import sys
+import multiprocessing
+from typing import Iterator, Optional, Tuple
+
+# Thumbnails are rendered on plain Surfaces; no window is ever opened
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import chess
+import pygame
+
+from DataClasses.Board import Board
+from Assets import get_piece_sprites, get_board_surface
+from GameAnalyzer import iter_saved_games, bounded_imap
+from GameArchive import ARCHIVE_EXTENSION
+
+# Same square colors as the game board
+LIGHT_SQUARE = (240, 217, 181)
+DARK_SQUARE = (181, 136, 99)
+DEFAULT_SIZE = 256
+
+
+def render_position(board: Board, slot_size: int, surface: Optional[pygame.Surface] = None) -> pygame.Surface:
+    """Draw a board position onto a Surface (a new one unless given); works without a display"""
+    if surface is None:
+        surface = pygame.Surface((slot_size * 8, slot_size * 8))
+    surface.blit(get_board_surface(slot_size, LIGHT_SQUARE, DARK_SQUARE), (0, 0))
+    sprites = get_piece_sprites(slot_size)
+    for y, row in enumerate(board.board):
+        for x, piece_name in enumerate(row):
+            if piece_name != '-':
+                surface.blit(sprites[piece_name], (x * slot_size, y * slot_size))
+    return surface
+
+
+def render_fen(fen: str, size: int = DEFAULT_SIZE) -> pygame.Surface:
+    """Render a FEN position to a size x size Surface"""
+    board = Board()
+    board.loadFen(fen)
+    return render_position(board, max(1, size // 8))
+
+
+def iter_fen_file(path: str) -> Iterator[Tuple[str, str]]:
+    """(name, fen) for each position in a file: one FEN per line, optionally 'name<TAB>fen'"""
+    with open(path, "r") as f:
+        index = 0
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            index += 1
+            name, _, fen = line.rpartition("\t")
+            yield name or f"position_{index:05d}", fen
+
+
+def iter_game_positions(directory: str, ply: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+    """(name, fen) for each saved game, after `ply` half-moves or at the end of the game"""
+    for game in iter_saved_games(directory):
+        board = chess.Board(game.start_fen) if game.start_fen else chess.Board()
+        try:
+            for move in game.moves[:ply]:
+                board.push_uci(move)
+        except ValueError as e:
+            print(f"Skipping {game.name}: {e}")
+            continue
+        # games.chai#12 -> games_12, game_20240101_120000.txt -> game_20240101_120000
+        if game.name.endswith(".txt"):
+            name = game.name[:-len(".txt")]
+        else:
+            name = game.name.replace(ARCHIVE_EXTENSION + "#", "_")
+        yield name, board.fen()
+
+
+_output_dir: Optional[str] = None
+_size: int = DEFAULT_SIZE
+
+
+def _init_worker(output_dir: str, size: int) -> None:
+    global _output_dir, _size
+    _output_dir = output_dir
+    _size = size
+
+
+def render_thumbnail(task: Tuple[str, str]) -> Tuple[str, Optional[str]]:
+    """Render one (name, fen) task to <output>/<name>.png; returns (name, error)"""
+    name, fen = task
+    try:
+        pygame.image.save(render_fen(fen, _size), os.path.join(_output_dir, f"{name}.png"))
+    except (ValueError, IndexError, pygame.error) as e:
+        return name, str(e)
+    return name, None
+
+
+def export_thumbnails(tasks: Iterator[Tuple[str, str]], output_dir: str, size: int = DEFAULT_SIZE,
+                      workers: Optional[int] = None) -> int:
+    """Render (name, fen) tasks to PNG files with a process pool; returns the number written"""
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(output_dir, size)) as pool:
+        for name, error in bounded_imap(pool, render_thumbnail, tasks, workers * 4):
+            if error:
+                print(f"Error rendering {name}: {error}")
+                continue
+            written += 1
+            if written % 500 == 0:
+                print(f"Rendered {written} thumbnails")
+        pool.close()
+        pool.join()
+    return written
+
+
+def build_parser(parser) -> None:
+    """Add the thumbnails command's arguments to an argparse parser"""
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fen", action="append", help="A FEN position to render (repeatable)")
+    source.add_argument("--fen-file", help="File with one FEN per line (optionally 'name<TAB>fen')")
+    source.add_argument("--games", help="Directory of saved games (e.g. games/) or a game archive file")
+    parser.add_argument("--ply", type=int, default=None,
+                        help="With --games, render the position after this many half-moves instead of the final one")
+    parser.add_argument("-o", "--output", default="thumbnails", help="Directory to write PNG files to")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Image width and height in pixels")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (defaults to one per core)")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai thumbnails`"""
+    if args.fen:
+        tasks = ((f"position_{i:05d}", fen) for i, fen in enumerate(args.fen, 1))
+    elif args.fen_file:
+        tasks = iter_fen_file(args.fen_file)
+    else:
+        if not os.path.exists(args.games):
+            print(f"Games not found: {args.games}", file=sys.stderr)
+            return 1
+        tasks = iter_game_positions(args.games, args.ply)
+
+    count = export_thumbnails(tasks, args.output, args.size, args.workers)
+    print(f"Rendered {count} thumbnails -> {args.output}")
+    return 0
@@ -0,0 +1 @@
+"""Headless micro-benchmarks: python -m benchmarks (or python -m chessai bench)"""
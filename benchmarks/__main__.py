@@ -0,0 +1,9 @@
+import argparse
+import sys
+
+from benchmarks.harness import build_parser, cli_main
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Headless micro-benchmarks")
+    build_parser(parser)
+    sys.exit(cli_main(parser.parse_args()))
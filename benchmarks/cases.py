@@ -0,0 +1,201 @@
+import os
+import sys
+
+# Rendering cases draw off-screen; the dummy driver needs no window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import chess
+
+from DataClasses.Board import Board
+from MovementManger import get_piece_moves, is_king_in_check, is_checkmate
+from benchmarks.harness import case
+
+FAKE_ENGINE = os.path.join(os.path.dirname(__file__), "fake_uci_engine.py")
+
+START = chess.STARTING_FEN
+MIDDLEGAME = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"  # "Kiwipete"
+ENDGAME = "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"
+IN_CHECK = "rnbqkbnr/ppp2ppp/8/1B1pp3/4P3/8/PPPP1PPP/RNBQK1NR b KQkq - 1 3"  # Black has evasions
+CHECKMATE = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"  # Fool's mate
+MATE_IN_2 = "2r4k/6pp/7N/3Q4/8/8/6PP/6K1 w - - 1 2"  # Philidor's legacy, Qg8+ Rxg8 Nf7#
+
+
+def _board(fen: str) -> Board:
+    board = Board()
+    board.loadFen(fen)
+    return board
+
+
+def _pieces(board: Board):
+    return [(x, y) for y in range(8) for x in range(8) if board.getPiece(x, y)]
+
+
+def _all_moves(fen: str):
+    board = _board(fen)
+    squares = _pieces(board)
+
+    def run():
+        for x, y in squares:
+            get_piece_moves(board, x, y)
+    yield run
+
+
+@case("movegen", "get_piece_moves, every piece, start")
+def movegen_start():
+    yield from _all_moves(START)
+
+
+@case("movegen", "get_piece_moves, every piece, middlegame")
+def movegen_middlegame():
+    yield from _all_moves(MIDDLEGAME)
+
+
+@case("movegen", "get_piece_moves, every piece, endgame")
+def movegen_endgame():
+    yield from _all_moves(ENDGAME)
+
+
+@case("status", "is_king_in_check, both sides, middlegame")
+def king_in_check():
+    board = _board(MIDDLEGAME)
+
+    def run():
+        is_king_in_check(board, "White")
+        is_king_in_check(board, "Black")
+    yield run
+
+
+@case("status", "is_checkmate, in check with evasions")
+def checkmate_evasions():
+    board = _board(IN_CHECK)
+    yield lambda: is_checkmate(board, "Black")
+
+
+@case("status", "is_checkmate, mated")
+def checkmate_mated():
+    board = _board(CHECKMATE)
+    yield lambda: is_checkmate(board, "White")
+
+
+@case("search", "MateSearch, mate in 2")
+def mate_search():
+    from MateSearch import find_mate
+    yield lambda: find_mate(MATE_IN_2, 2)
+
+
+@case("search", "MateSearch, no mate in 2, middlegame")
+def mate_search_none():
+    from MateSearch import find_mate
+    yield lambda: find_mate(MIDDLEGAME, 2)
+
+
+@case("board", "Board.copy, middlegame")
+def board_copy():
+    board = _board(MIDDLEGAME)
+    yield board.copy
+
+
+@case("board", "Board.movePiece + undoMove, middlegame")
+def board_move():
+    board = _board(MIDDLEGAME)
+
+    def run():
+        board.movePiece(4, 3, 3, 1)  # Ne5xd7
+        board.undoMove()
+    yield run
+
+
+def _chess_board(fen: str = MIDDLEGAME):
+    """An off-screen ChessBoard showing fen"""
+    import pygame
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))  # Sprites are converted for the display format
+    from main import ChessBoard
+    import settings
+    game = ChessBoard(screen=pygame.Surface((settings.ScreenSize[0] + 300, settings.ScreenSize[1])))
+    game.game.current_turn = game.board.loadFen(fen)
+    return game
+
+
+@case("sync", "_sync_chess_board, middlegame")
+def sync_chess_board():
+    game = _chess_board()
+    yield game._sync_chess_board
+    game.cleanup()
+
+
+@case("render", "ChessBoard.draw, full frame")
+def draw_full():
+    game = _chess_board()
+
+    def run():
+        game.full_redraw = True
+        game.draw()
+    yield run
+    game.cleanup()
+
+
+@case("render", "ChessBoard.draw, idle frame")
+def draw_idle():
+    game = _chess_board()
+    game.draw()
+    yield game.draw
+    game.cleanup()
+
+
+@case("render", "ChessBoard.draw, selection change")
+def draw_selection():
+    game = _chess_board()
+    selections = [((x, y), list(get_piece_moves(game.board, x, y))) for x, y in ((4, 3), (5, 5))]  # Ne5, Qf3
+    state = {"turn": 0}
+
+    def run():
+        state["turn"] ^= 1
+        game.game.selected_coords, game.game.possible_moves = selections[state["turn"]]
+        game.draw()
+    yield run
+    game.cleanup()
+
+
+def _fake_engine():
+    import chess.engine
+    return chess.engine.SimpleEngine.popen_uci([sys.executable, FAKE_ENGINE], timeout=10.0)
+
+
+@case("engine", "isready round trip, fake UCI engine")
+def engine_ping():
+    engine = _fake_engine()
+    yield engine.ping
+    engine.quit()
+
+
+@case("engine", "go/bestmove round trip, fake UCI engine")
+def engine_play():
+    import chess.engine
+    engine = _fake_engine()
+    board = chess.Board(MIDDLEGAME)
+    limit = chess.engine.Limit(nodes=1)
+    yield lambda: engine.play(board, limit)
+    engine.quit()
+
+
+@case("engine", "EngineSupervisor.request_move, fake UCI engine")
+def supervisor_request():
+    import time
+    import chess.engine
+    from EngineSupervisor import EngineSupervisor
+    supervisor = EngineSupervisor([sys.executable, FAKE_ENGINE])
+    supervisor.start()
+    deadline = time.monotonic() + 10.0
+    while not supervisor.is_healthy():
+        if time.monotonic() > deadline:
+            supervisor.stop()
+            raise RuntimeError(f"fake engine did not start: {supervisor.metrics().last_error}")
+        time.sleep(0.01)
+    board = chess.Board(MIDDLEGAME)
+    limit = chess.engine.Limit(nodes=1)
+    yield lambda: supervisor.request_move(board, limit).result(timeout=10.0)
+    supervisor.stop()
@@ -0,0 +1,79 @@
+"""A minimal UCI engine for benchmarks and tests.
+
+It answers the protocol immediately (or after --delay-ms) and plays the
+first legal move in UCI order, or a seeded random one with --random, so
+engine round trips can be measured without Stockfish's search time. The
+random moves can be reseeded with `setoption name Seed value N`.
+
+    python benchmarks/fake_uci_engine.py [--delay-ms N] [--random] [--seed N]
+"""
+import argparse
+import random
+import sys
+import time
+
+import chess
+
+NAME = "FakeUCI"
+MAX_SEED = 2 ** 31 - 1
+
+
+def parse_position(tokens) -> chess.Board:
+    """The board for a `position [startpos | fen ...] [moves ...]` command"""
+    if "moves" in tokens:
+        split = tokens.index("moves")
+        setup, moves = tokens[:split], tokens[split + 1:]
+    else:
+        setup, moves = tokens, []
+    board = chess.Board(" ".join(setup[1:])) if setup and setup[0] == "fen" else chess.Board()
+    for uci in moves:
+        board.push_uci(uci)
+    return board
+
+
+def choose_move(board: chess.Board, rng: random.Random = None) -> str:
+    moves = sorted(move.uci() for move in board.legal_moves)
+    if not moves:
+        return "0000"
+    return rng.choice(moves) if rng else moves[0]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="think time before each bestmove")
+    parser.add_argument("--random", action="store_true", help="play a random legal move instead of the first")
+    parser.add_argument("--seed", type=int, default=None, help="seed for --random")
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed) if args.random else None
+
+    board = chess.Board()
+    out = sys.stdout
+    for line in sys.stdin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == "uci":
+            out.write(f"id name {NAME}\nid author benchmarks\n"
+                      f"option name Seed type spin default 0 min 0 max {MAX_SEED}\nuciok\n")
+        elif command == "isready":
+            out.write("readyok\n")
+        elif command == "ucinewgame":
+            board = chess.Board()
+        elif command == "position":
+            board = parse_position(tokens[1:])
+        elif command == "go":
+            if args.delay_ms:
+                time.sleep(args.delay_ms / 1000.0)
+            out.write(f"info depth 1 score cp 0 nodes 1\nbestmove {choose_move(board, rng)}\n")
+        elif command == "setoption" and rng and tokens[1:4] == ["name", "Seed", "value"]:
+            rng.seed(int(tokens[4]))
+        elif command == "quit":
+            break
+        # Other options, stop, debug and anything unknown need no reply
+        out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
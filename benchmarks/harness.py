@@ -0,0 +1,237 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_REPEAT = 7
+DEFAULT_MIN_TIME = 0.1  # Seconds per timed batch; the call count per batch is scaled to reach it
+DEFAULT_WARMUP = 0.2  # Seconds of untimed calls first (caches, lazy imports, branch predictors)
+DEFAULT_THRESHOLD = 0.10  # Median slowdown that counts as a regression
+
+# A case is a generator: setup, `yield` the callable to time, then teardown
+Setup = Callable[[], Iterator[Callable[[], None]]]
+
+
+@dataclass
+class Case:
+    name: str
+    group: str  # movegen, status, search, board, sync, render, engine
+    setup: Setup
+
+
+@dataclass
+class Result:
+    """Per-call timings of one case, in microseconds"""
+    name: str
+    group: str
+    number: int  # Calls per timed batch
+    repeat: int  # Timed batches
+    min_us: float
+    median_us: float
+    mean_us: float
+    stdev_us: float
+
+
+_cases: Dict[str, Case] = {}
+
+
+def case(group: str, name: str) -> Callable[[Setup], Setup]:
+    """Register a benchmark case under a group"""
+    def register(setup: Setup) -> Setup:
+        _cases[name] = Case(name, group, setup)
+        return setup
+    return register
+
+
+def cases(pattern: str = "") -> List[Case]:
+    """Registered cases whose name or group contains pattern"""
+    from benchmarks import cases as _  # Registers the built-in cases
+    return [c for c in _cases.values() if pattern in c.name or pattern == c.group]
+
+
+def measure(run: Callable[[], None], repeat: int = DEFAULT_REPEAT, min_time: float = DEFAULT_MIN_TIME,
+            warmup: float = DEFAULT_WARMUP) -> Tuple[int, List[float]]:
+    """Warm up, pick a batch size that takes at least min_time, then time repeat batches.
+
+    Returns the batch size and the per-call time of each batch in seconds. The
+    garbage collector is off while a batch runs, as in timeit.
+    """
+    deadline = time.perf_counter() + warmup
+    run()
+    while time.perf_counter() < deadline:
+        run()
+
+    number = 1
+    while True:
+        elapsed = _time_batch(run, number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+
+    return number, [_time_batch(run, number) / number for _ in range(repeat)]
+
+
+def _time_batch(run: Callable[[], None], number: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def run_case(bench: Case, repeat: int, min_time: float, warmup: float) -> Result:
+    steps = bench.setup()
+    run = next(steps)
+    try:
+        number, times = measure(run, repeat, min_time, warmup)
+    finally:
+        next(steps, None)  # Teardown
+    times_us = [t * 1e6 for t in times]
+    return Result(
+        name=bench.name,
+        group=bench.group,
+        number=number,
+        repeat=repeat,
+        min_us=min(times_us),
+        median_us=statistics.median(times_us),
+        mean_us=statistics.fmean(times_us),
+        stdev_us=statistics.stdev(times_us) if len(times_us) > 1 else 0.0
+    )
+
+
+def environment() -> Dict[str, object]:
+    """What the numbers were measured on; only runs on the same setup are comparable"""
+    import chess
+    info = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "python-chess": chess.__version__,
+    }
+    try:
+        import pygame
+        info["pygame"] = pygame.version.ver
+    except ImportError:
+        pass
+    return info
+
+
+def save_results(path: str, results: List[Result], settings: Dict[str, object]) -> None:
+    report = {
+        "written_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "settings": settings,
+        "results": {result.name: asdict(result) for result in results}
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare(baseline: Dict[str, dict], results: List[Result],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float, float, float, str]]:
+    """(name, baseline median, median, ratio, verdict) for every case in both runs.
+
+    The verdict is "regression" when the median got slower by more than
+    threshold, "faster" when it improved by as much, and "" otherwise.
+    """
+    rows = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        ratio = result.median_us / base["median_us"] if base["median_us"] else 1.0
+        if ratio > 1 + threshold:
+            verdict = "regression"
+        elif ratio < 1 / (1 + threshold):
+            verdict = "faster"
+        else:
+            verdict = ""
+        rows.append((result.name, base["median_us"], result.median_us, ratio, verdict))
+    return rows
+
+
+def _format_us(us: float) -> str:
+    if us >= 1000:
+        return f"{us / 1000:.2f} ms"
+    return f"{us:.1f} us"
+
+
+def build_parser(parser) -> None:
+    """Add the bench command's arguments to an argparse parser"""
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this, or a group name")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed batches per case")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Minimum seconds per batch")
+    parser.add_argument("--warmup", type=float, default=DEFAULT_WARMUP, help="Seconds of untimed calls per case")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Results JSON (defaults to benchmarks/results/bench_<time>.json)")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Median slowdown flagged as a regression (0.10 = 10%%)")
+
+
+def cli_main(args) -> int:
+    """Entry point for `python -m chessai bench`"""
+    selected = cases(args.filter)
+    if args.list:
+        for bench in selected:
+            print(f"{bench.group:<9}{bench.name}")
+        return 0
+    if not selected:
+        print(f"No benchmark matches {args.filter!r}", file=sys.stderr)
+        return 1
+
+    baseline: Optional[Dict[str, dict]] = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading baseline: {e}", file=sys.stderr)
+            return 1
+
+    results = []
+    width = max(len(bench.name) for bench in selected)
+    print(f"{'case':<{width}}  {'median':>10}  {'min':>10}  {'stdev':>6}")
+    for bench in selected:
+        try:
+            result = run_case(bench, args.repeat, args.min_time, args.warmup)
+        except Exception as e:  # E.g. no display driver or the fake engine failed to start
+            print(f"{bench.name:<{width}}  skipped: {e}")
+            continue
+        results.append(result)
+        spread = result.stdev_us / result.median_us if result.median_us else 0.0
+        print(f"{result.name:<{width}}  {_format_us(result.median_us):>10}  {_format_us(result.min_us):>10}  "
+              f"{spread:>6.1%}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    try:
+        save_results(output, results, {"repeat": args.repeat, "min_time": args.min_time, "warmup": args.warmup})
+    except OSError as e:
+        print(f"Error writing results: {e}", file=sys.stderr)
+        return 1
+    print(f"Results written to {output}")
+
+    if baseline is None:
+        return 0
+    rows = compare(baseline, results, args.threshold)
+    print(f"\nAgainst {args.baseline} (threshold {args.threshold:.0%}):")
+    for name, base_us, median_us, ratio, verdict in rows:
+        print(f"{name:<{width}}  {_format_us(base_us):>10} -> {_format_us(median_us):>10}  {ratio:>6.2f}x  {verdict}")
+    regressions = sum(1 for row in rows if row[4] == "regression")
+    print(f"{regressions} regression(s) in {len(rows)} compared case(s)")
+    return 1 if regressions else 0
@@ -17,6 +17,7 @@ pyinstaller --noconfirm ^
     --add-data="res/icon.png;res" ^
     --add-data="res/ChessPieces;res/ChessPieces" ^
     --add-data="res/audio;res/audio" ^
+    --add-data="res/puzzles.csv;res" ^
     --hidden-import=pygame ^
     --hidden-import=chess ^
     --hidden-import=chess.engine ^
@@ -0,0 +1,126 @@
+"""Run the Stockfish downloader against a local HTTP stand-in server.
+
+A launcher for benchmarks/fake_uci_engine.py is served with Range support,
+and the downloader is pointed at it (CHESS_AI_STOCKFISH_URL) with a temporary
+home directory, to check resuming, SHA-256 verification, the unpinned
+fallback and the verified cache. Unix only, as the stand-in is a shell script.
+
+    python check_download.py
+"""
+import hashlib
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fake_uci_engine.py")
+PADDING_LINES = 40000  # Comment lines that make the download span several chunks
+
+
+def stand_in_binary() -> bytes:
+    """A shell script that speaks UCI, padded to a few megabytes"""
+    script = f"#!/bin/sh\nexec '{sys.executable}' '{FAKE_ENGINE}'\n"
+    return (script + ("#" * 79 + "\n") * PADDING_LINES).encode()
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves the server's payload, honouring `Range: bytes=N-`"""
+
+    def do_GET(self):
+        payload = self.server.payload
+        requested = self.headers.get("Range")
+        self.server.requests.append(requested)
+        start = int(requested.split("=")[1].split("-")[0]) if requested else 0
+        if start >= len(payload):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(payload)}")
+            self.end_headers()
+            return
+        self.send_response(206 if requested else 200)
+        if requested:
+            self.send_header("Content-Range", f"bytes {start}-{len(payload) - 1}/{len(payload)}")
+        self.send_header("Content-Length", str(len(payload) - start))
+        self.end_headers()
+        self.wfile.write(payload[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main() -> int:
+    if platform.system() == "Windows":
+        print("The stand-in engine is a shell script; run this check on macOS or Linux", file=sys.stderr)
+        return 1
+
+    payload = stand_in_binary()
+    digest = hashlib.sha256(payload).hexdigest()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.payload = payload
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    home = tempfile.mkdtemp(prefix="chessai-download-")
+    os.environ["HOME"] = home
+    os.environ["CHESS_AI_STOCKFISH_URL"] = f"http://127.0.0.1:{server.server_address[1]}/stockfish"
+    os.environ.pop("CHESS_AI_STOCKFISH_SHA256", None)
+
+    # Imported after HOME and the URL are set up, like the game would see them
+    from StockfishDownloader import download_stockfish, get_stockfish_path, file_sha256, _marker_path
+
+    target = get_stockfish_path()
+    failures = []
+
+    def check(name, ok):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+        if not ok:
+            failures.append(name)
+
+    def reset():
+        for path in (target, target + ".part", _marker_path(target)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def downloaded():
+        return os.path.exists(target) and file_sha256(target) == digest
+
+    path = download_stockfish()
+    check("unpinned download is trusted after the UCI handshake", path == target and downloaded())
+    check("binary is executable", os.access(target, os.X_OK))
+    check("hash is recorded next to the binary", digest in open(_marker_path(target)).read())
+
+    requests_made = len(server.requests)
+    check("verified binary is reused without a request",
+          download_stockfish() == target and len(server.requests) == requests_made)
+
+    with open(target, "ab") as f:
+        f.write(b"# tampered\n")
+    check("changed unpinned binary is refused and downloaded again", download_stockfish() == target and downloaded())
+
+    reset()
+    with open(target + ".part", "wb") as f:
+        f.write(payload[:len(payload) // 2])
+    path = download_stockfish()
+    check("interrupted download resumes with a Range request",
+          server.requests[-1] == f"bytes={len(payload) // 2}-" and path == target and downloaded())
+
+    reset()
+    os.environ["CHESS_AI_STOCKFISH_SHA256"] = "0" * 64
+    check("download that does not match the pin is rejected",
+          download_stockfish() is None and not os.path.exists(target) and not os.path.exists(target + ".part"))
+
+    os.environ["CHESS_AI_STOCKFISH_SHA256"] = digest
+    check("download that matches the pin is accepted", download_stockfish() == target and downloaded())
+
+    server.shutdown()
+    shutil.rmtree(home, ignore_errors=True)
+    if failures:
+        print(f"{len(failures)} check(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import argparse
+import importlib
+import sys
+import multiprocessing
+from typing import List, Optional
+
+# Sub-command name -> (module, help text). Each module provides
+# build_parser(parser) and cli_main(args) -> exit code. Only the chosen
+# command's module is imported, so e.g. `match` never loads pygame.
+COMMANDS = {
+    "analyze": ("GameAnalyzer", "Evaluate every saved game with a pool of engines"),
+    "archive": ("GameArchive", "Import PGN into a binary game archive, export it as PGN, or summarize it"),
+    "bench": ("benchmarks.harness", "Time move generation, board updates, rendering and engine round trips"),
+    "calibrate": ("EngineCalibration", "Measure this host's engine speed and set node budgets per difficulty"),
+    "db": ("GameDatabase", "Index games by position in a SQLite database and query it"),
+    "import": ("PgnImport", "Stream large, optionally compressed PGN files into a game archive or database"),
+    "mate": ("MateSearch", "Find the shortest forced mate with a proof-number search, or mine mate puzzles from games"),
+    "match": ("MatchRunner", "Play engine-vs-engine matches on a process pool and report Elo or SPRT results"),
+    "puzzles": ("PuzzleStore", "Build a memory-mapped puzzle store from Lichess puzzle CSV and draw puzzles from it"),
+    "thumbnails": ("Thumbnails", "Render positions from FENs or saved games to PNG images"),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Headless command line tools: python -m chessai <command> ..."""
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(prog="chessai", description="Chess AI command line tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (module_name, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        # Other commands' options are never parsed, so their modules stay unloaded
+        if argv and argv[0] == name:
+            importlib.import_module(module_name).build_parser(subparser)
+
+    args = parser.parse_args(argv)
+    module_name, _ = COMMANDS[args.command]
+    return importlib.import_module(module_name).cli_main(args)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,25 +1,69 @@
 import os
 import sys
+from StartupProfile import startup_profile
+
+# Enabled before the remaining imports so that they are timed too
+if __name__ == "__main__" and "--startup-profile" in sys.argv:
+    startup_profile.enable()
+
+import time
 import pygame
-import chess.engine
 from enum import Enum, auto
 from dataclasses import dataclass, field
-from typing import List, Tuple, Final, Dict
+from typing import List, Tuple, Final, Dict, Optional, Set, TYPE_CHECKING
 from datetime import datetime
-import time
+from concurrent.futures import Future
 
 import settings
 from DataClasses.Board import Board
 from DataClasses.Pieces import PieceType, PieceImage, pieces
-from GameInfoMenu import GameInfo
+from DataClasses.Images import resource_path
+from DataClasses.MoveHistory import MoveHistory, MoveFlags
+from GameInfoMenu import GameInfo, AnalysisPanel
+from Assets import get_piece_sprites, get_board_surface, get_sound, get_font, render_text
 from MovementManger import GetMovements, IsCheckMate
 from StockfishDifficulty import StockfishDifficulty
-from MainMenu import MainMenu
-from StockfishDownloader import download_stockfish
+from MainMenu import MainMenu, GameSettings, get_background_gradient
+from StockfishDownloader import get_stockfish_path
+from EngineAnalysis import LiveAnalysis
+from FrameScheduler import FrameScheduler, post_wakeup
+from Metrics import metrics, timed
+from Diagnostics import get_logger, configure as configure_logging
+from InputScript import InputPlayer, InputRecorder, SCRIPTED_EVENTS
+from GameArchive import ArchivedGame, append_game, DEFAULT_ARCHIVE_NAME
+from PuzzleStore import PuzzleStore, DEFAULT_STORE_NAME, build_from_csv
+from PuzzleMode import PuzzleAttempt
+from GameJournal import GameJournal, JournalState, SyncPolicy, JOURNAL_NAME, read_journal, start_journal, resume_journal
+from EngineProvisioner import EngineProvisioner, ProvisioningState
 from LoadingScreen import LoadingScreen
 from SplashScreen import SplashScreen
 import chess
 
+# The engine modules pull in asyncio and chess.engine; two-player games never load them
+if TYPE_CHECKING:
+    import argparse
+    import chess.engine
+    from EngineSupervisor import EngineSupervisor
+    from SessionProfiler import SessionProfiler
+
+GAMES_DIR: Final[str] = os.path.join(os.path.dirname(__file__), "games")
+METRICS_DIR: Final[str] = os.path.join(os.path.dirname(__file__), "metrics")
+PROFILES_DIR: Final[str] = os.path.join(os.path.dirname(__file__), "profiles")
+SAMPLE_PUZZLES: Final[str] = resource_path(os.path.join("res", "puzzles.csv"))  # Builds the puzzle store on first use
+
+log = get_logger("game")
+engine_log = get_logger("engine")
+sync_log = get_logger("sync")
+
+CHESS_PIECE_TYPES: Final[Dict[PieceType, int]] = {
+    PieceType.PAWN: chess.PAWN,
+    PieceType.KNIGHT: chess.KNIGHT,
+    PieceType.BISHOP: chess.BISHOP,
+    PieceType.ROOK: chess.ROOK,
+    PieceType.QUEEN: chess.QUEEN,
+    PieceType.KING: chess.KING
+}
+
 class GameState(Enum):
     PLAYING = auto()
     CHECKMATE = auto()
@@ -32,7 +76,7 @@ class GameContext:
     current_turn: str = "White"
     state: GameState = GameState.PLAYING
     can_undo: bool = False
-    move_history: List[dict] = field(default_factory=list)
+    move_history: MoveHistory = field(default_factory=MoveHistory)
     winner: str = ""
 
 class Button:
@@ -47,8 +91,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, (0, 0, 0), self.rect, 2)  
         
-        font = pygame.font.Font(None, 36)
-        text_surface = font.render(self.text, True, (255, 255, 255))
+        text_surface = render_text(get_font(None, 36), self.text, (255, 255, 255))
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
     
@@ -63,56 +106,43 @@ class Button:
 
 class ChessBoard:
     BOARD_SIZE: Final[int] = 8
+    PUZZLE_REPLY_DELAY_MS: Final[int] = 500  # Pause before the opponent answers a correct puzzle move
+    PUZZLE_DRAWS: Final[int] = 10  # Random puzzles tried before giving up on finding a valid one
+    ANALYSIS_LINES_HEIGHT: Final[int] = 130  # Kept clear below the game info for the engine lines
     
-    def __init__(self, use_stockfish: bool = False, stockfish_difficulty: StockfishDifficulty = StockfishDifficulty.NORMAL) -> None:
+    def __init__(self, use_stockfish: bool = False, stockfish_difficulty: StockfishDifficulty = StockfishDifficulty.NORMAL,
+                 stockfish: Optional["EngineSupervisor"] = None, screen: Optional[pygame.Surface] = None,
+                 journal_path: Optional[str] = None, resume: Optional[JournalState] = None,
+                 puzzles: Optional[PuzzleStore] = None) -> None:
         self.width: Final[int] = settings.ScreenSize[0] + 300
         self.height: Final[int] = settings.ScreenSize[1]
-        self.screen: pygame.Surface = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Chess")
+        # Pass a plain Surface to render off-screen (e.g. with the SDL dummy driver)
+        self.headless: bool = screen is not None
+        if screen is None:
+            screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption("Chess")
+        self.screen: pygame.Surface = screen
         
         self.game_info: GameInfo = GameInfo(
             self.screen,
             settings.ScreenSize[0] + 10,
             10,
             290,
-            settings.ScreenSize[1] - 20
+            settings.ScreenSize[1] - 30 - self.ANALYSIS_LINES_HEIGHT
         )
         
         self.board: Board = Board()
         self.board.generateDefaultBoard()
         self.game: GameContext = GameContext()
-        self.start_time: str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Get resource paths
-        def resource_path(relative_path):
-            if getattr(sys, 'frozen', False):
-                if hasattr(sys, '_MEIPASS'):
-                    # PyInstaller path
-                    base_path = sys._MEIPASS
-                else:
-                    # macOS app bundle Resources path
-                    bundle_dir = os.path.abspath(os.path.dirname(sys.executable))
-                    if bundle_dir.endswith('MacOS'):
-                        base_path = os.path.abspath(os.path.join(bundle_dir, '..', 'Resources'))
-                    else:
-                        base_path = os.path.abspath(".")
-            else:
-                # Development environment
-                base_path = os.path.abspath(".")
-            
-            return os.path.join(base_path, relative_path)
+        self.started_at: datetime = datetime.fromtimestamp(resume.started_at) if resume else datetime.now()
         
         # Load audio with resource path
-        self.move_audio: pygame.mixer.Sound = pygame.mixer.Sound(resource_path("res/audio/move.mp3"))
+        self.move_audio: pygame.mixer.Sound = get_sound(resource_path("res/audio/move.mp3"))
         
-        self.chess_moves: List[str] = []
         self.chess_board = chess.Board()  
         
-        # Load piece images with resource path
-        self.piece_images: Dict[str, pygame.Surface] = {}
-        for piece_name, piece in pieces.items():
-            image_path = resource_path(piece.Image)
-            self.piece_images[piece_name] = pygame.image.load(image_path).convert_alpha()
+        # Piece sprites come from the shared atlas, loaded once per process
+        self.piece_images: Dict[str, pygame.Surface] = get_piece_sprites(settings.SlotSize)
         
         self.board_positions: List[List[Tuple[int, int, int, int]]] = [
             [
@@ -127,18 +157,42 @@ class ChessBoard:
         self.dark_square: Final[Tuple[int, int, int]] = (181, 136, 99)
         self.move_indicator: Final[Tuple[int, int, int]] = (70, 92, 111)
         self.move_indicator_alpha: Final[Tuple[int, int, int, int]] = (70, 92, 111, 40)
+        self.board_surface: pygame.Surface = get_board_surface(settings.SlotSize, self.light_square, self.dark_square)
         
         self.use_stockfish = use_stockfish
         self.stockfish_difficulty = stockfish_difficulty
-        self.stockfish = None
-        self.stockfish_depth = 15
-        self.stockfish_time = 1.0
-        self.stockfish_init_retries = 3
+        self.stockfish: Optional["EngineSupervisor"] = None
+        self.stockfish_limit: Optional["chess.engine.Limit"] = None
+        self.pending_engine_move: Optional[Future] = None
+        self.engine_requested_at: float = 0.0
         
         if use_stockfish:
-            self._initialize_stockfish()
+            from EngineCalibration import engine_limit, load_calibration
             
-        self.clock: pygame.time.Clock = pygame.time.Clock()
+            # Fixed node budgets (calibrated per host with `python -m chessai calibrate`)
+            # keep the engine's strength independent of machine load and core count
+            self.stockfish_limit = engine_limit(self.stockfish_difficulty, load_calibration())
+            if stockfish:
+                # Take over an engine that was provisioned in the background
+                self.stockfish = stockfish
+                self.stockfish.reconfigure(self._configure_stockfish_difficulty)
+            else:
+                self._initialize_stockfish()
+        
+        # Live analysis board (toggled with the A key)
+        self.live_analysis: Optional[LiveAnalysis] = None
+        self.analysis_panel: Optional[AnalysisPanel] = None
+        self.analysis_position_key: Optional[tuple] = None
+            
+        metrics.reset()  # Timings and counters are reported per game
+        
+        # Sleeps between frames unless something on screen is changing
+        self.scheduler: FrameScheduler = FrameScheduler()
+        
+        # Set by main() for --record, --replay and --profile
+        self.input_recorder: Optional[InputRecorder] = None
+        self.input_player: Optional[InputPlayer] = None
+        self.profiler: Optional["SessionProfiler"] = None
 
         button_width = 200
         button_height = 50
@@ -149,216 +203,281 @@ class ChessBoard:
         self.main_menu_button = Button(start_x, start_y, button_width, button_height, "Main Menu")
         self.quit_button = Button(start_x, start_y + button_height + button_spacing, 
                                 button_width, button_height, "Quit Game")
+        
+        # What is currently on screen, so draw() only repaints what changed
+        self.full_redraw: bool = True
+        self.drawn_board: List[List[str]] = []
+        self.drawn_move_indicators: Set[Tuple[int, int]] = set()
+        self.drawn_overlay_key: Optional[tuple] = None
+        
+        # Autosave: each move is appended to a journal so an unfinished game can be resumed
+        self.journal: Optional[GameJournal] = None
+        self.clock_start: float = time.monotonic()  # For move timestamps in the journal
+        if resume:
+            self._replay_moves(resume)
+        if journal_path:
+            self._open_journal(journal_path, resume)
+        
+        # Puzzle mode: positions are drawn from the puzzle store instead of a game from the start
+        self.puzzles: Optional[PuzzleStore] = puzzles
+        self.puzzle: Optional[PuzzleAttempt] = None
+        self.puzzle_reply_due: Optional[int] = None  # pygame ticks at which the opponent answers
+        if puzzles:
+            self._next_puzzle()
 
     def _initialize_stockfish(self):
-        """Initialize Stockfish engine with retries"""
-        for attempt in range(self.stockfish_init_retries):
-            try:
-                # Use the home directory location for Stockfish
-                home_dir = os.path.expanduser("~")
-                stockfish_dir = os.path.join(home_dir, ".chess_ai", "stockfish")
-                stockfish_path = os.path.join(stockfish_dir, self.get_stockfish_filename())
-                print(f"Attempting to initialize Stockfish from: {stockfish_path}")
-                
-                if not os.path.exists(stockfish_path):
-                    print(f"Stockfish not found at: {stockfish_path}")
-                    self.use_stockfish = False
-                    return
-                
-                # Make sure Stockfish is executable
-                if sys.platform != "win32":
-                    try:
-                        os.chmod(stockfish_path, 0o755)  # Give execute permission
-                    except Exception as e:
-                        print(f"Error setting Stockfish permissions: {e}")
-                        self.use_stockfish = False
-                        return
-                
-                # Initialize Stockfish with a timeout
-                try:
-                    self.stockfish = chess.engine.SimpleEngine.popen_uci(
-                        stockfish_path,
-                        timeout=5.0  # 5 second timeout for initialization
-                    )
-                    print("Stockfish initialized successfully")
-                    self._configure_stockfish_difficulty()
-                    return
-                except chess.engine.EngineTerminatedError:
-                    print("Stockfish engine terminated during initialization")
-                    self.stockfish = None
-                except TimeoutError:
-                    print("Stockfish initialization timed out")
-                    self.stockfish = None
-                except Exception as e:
-                    print(f"Error initializing Stockfish: {e}")
-                    self.stockfish = None
-                
-                if attempt < self.stockfish_init_retries - 1:
-                    print(f"Retrying Stockfish initialization (attempt {attempt + 2}/{self.stockfish_init_retries})")
-                    time.sleep(1)  # Wait before retrying
-            except Exception as e:
-                print(f"Unexpected error during Stockfish initialization: {e}")
-                if attempt == self.stockfish_init_retries - 1:
-                    print("Max retries reached. Disabling Stockfish.")
-                    self.use_stockfish = False
-                    self.stockfish = None
-
-    def get_stockfish_filename(self):
-        if sys.platform == "win32":
-            return "stockfish-windows.exe"
-        elif sys.platform == "darwin":  
-            return "stockfish-macos"
-        else:  
-            return "stockfish-linux"
-
-    def _reinitialize_stockfish_if_needed(self):
-        if self.use_stockfish and self.stockfish is None:
-            print("Stockfish engine not initialized, attempting to initialize...")
-            self._initialize_stockfish()
-
-    def _get_stockfish_move(self):
-        """Get the best move from Stockfish based on current difficulty"""
-        if not self.use_stockfish:
-            return None
-
-        max_retries = 3
-        for attempt in range(max_retries):
+        """Start the supervised Stockfish engine in the background"""
+        stockfish_path = get_stockfish_path()
+        engine_log.info("Starting Stockfish from %s", stockfish_path)
+        
+        if not os.path.exists(stockfish_path):
+            engine_log.warning("Stockfish not found at: %s", stockfish_path)
+            self.use_stockfish = False
+            return
+        
+        # Make sure Stockfish is executable
+        if sys.platform != "win32":
             try:
-                # Check if Stockfish needs reinitialization
-                self._reinitialize_stockfish_if_needed()
-                
-                if not self.stockfish:
-                    return None
-
-                # Sync board and get current position FEN
-                self.chess_board = self._sync_chess_board()
-                fen = self.chess_board.fen()
-                print(f"Current position FEN: {fen}")
-                
-                # Set position and get move with time limit
-                try:
-                    # Use time limit as a form of timeout
-                    result = self.stockfish.play(
-                        self.chess_board,
-                        chess.engine.Limit(
-                            depth=self.stockfish_depth,
-                            time=min(self.stockfish_time, 10.0)  # Cap at 10 seconds
-                        )
-                    )
-                    
-                    if result.move:
-                        return result.move
-                    
-                except chess.engine.EngineTerminatedError:
-                    print("Stockfish engine terminated unexpectedly")
-                    self.stockfish = None
-                    if attempt < max_retries - 1:
-                        print(f"Retrying move calculation (attempt {attempt + 2}/{max_retries})")
-                        self._reinitialize_stockfish_if_needed()
-                        continue
-                    
-                except Exception as e:
-                    print(f"Error during Stockfish move calculation: {e}")
-                    if "engine process died" in str(e):
-                        self.stockfish = None
-                        if attempt < max_retries - 1:
-                            print(f"Retrying after engine death (attempt {attempt + 2}/{max_retries})")
-                            self._reinitialize_stockfish_if_needed()
-                            continue
-                
+                os.chmod(stockfish_path, 0o755)  # Give execute permission
             except Exception as e:
-                print(f"Unexpected error getting Stockfish move: {e}")
-                if attempt < max_retries - 1:
-                    print(f"Retrying after error (attempt {attempt + 2}/{max_retries})")
-                    time.sleep(1)
-                    continue
+                engine_log.error("Error setting Stockfish permissions: %s", e)
+                self.use_stockfish = False
+                return
         
-        print("Failed to get Stockfish move after all retries")
-        return None
+        from EngineSupervisor import EngineSupervisor
+        
+        # The supervisor spawns, health-checks and restarts the engine off the game loop
+        self.stockfish = EngineSupervisor(stockfish_path, configure=self._configure_stockfish_difficulty)
+        self.stockfish.start()
 
-    def _configure_stockfish_difficulty(self):
-        if not self.stockfish:
+    def _request_stockfish_move(self) -> None:
+        """Ask Stockfish for a move; the game loop picks it up in update()"""
+        if not self.use_stockfish or not self.stockfish or self.pending_engine_move:
             return
+        
+        self.chess_board = self._sync_chess_board()
+        if engine_log.debug_enabled:
+            engine_log.debug("Requesting a move for %s", self.chess_board.fen())
+        self.engine_requested_at = time.perf_counter()
+        metrics.count("engine requests")
+        self.pending_engine_move = self.stockfish.request_move(self.chess_board, self.stockfish_limit)
+        # Wake the (possibly idle) game loop as soon as the reply is in
+        self.pending_engine_move.add_done_callback(lambda _: post_wakeup())
 
-        difficulty_settings = {
-            StockfishDifficulty.EASY: {
-                'Skill Level': 5,     
-                'Hash': 32,           
-            },
-            StockfishDifficulty.NORMAL: {
-                'Skill Level': 10,    
-                'Hash': 64,
-            },
-            StockfishDifficulty.HARD: {
-                'Skill Level': 20,    
-                'Hash': 128,
-            }
-        }
-
-        settings = difficulty_settings[self.stockfish_difficulty]
+    def _configure_stockfish_difficulty(self, engine: "chess.engine.SimpleEngine") -> None:
+        from EngineCalibration import configure_engine
         
         try:
-            self.stockfish.configure(settings)
-            
-            self.stockfish_depth = {
-                StockfishDifficulty.EASY: 5,
-                StockfishDifficulty.NORMAL: 12,
-                StockfishDifficulty.HARD: 20
-            }[self.stockfish_difficulty]
-            
-            self.stockfish_time = {
-                StockfishDifficulty.EASY: 0.1,
-                StockfishDifficulty.NORMAL: 0.5,
-                StockfishDifficulty.HARD: 1.0
-            }[self.stockfish_difficulty]
-            
+            configure_engine(engine, self.stockfish_difficulty)
         except Exception as e:
-            print(f"Error configuring Stockfish difficulty: {e}")
+            engine_log.error("Error configuring Stockfish difficulty: %s", e)
+
+    def update(self) -> None:
+        """Per-frame game updates that do not depend on input"""
+        if self.game.state == GameState.PLAYING:
+            self.game_info.update()
+        
+        if self.pending_engine_move and self.pending_engine_move.done():
+            future, self.pending_engine_move = self.pending_engine_move, None
+            metrics.record("engine reply", (time.perf_counter() - self.engine_requested_at) * 1000)
+            stockfish_move = None if future.cancelled() else future.result()
+            if self.game.state == GameState.PLAYING and self.game.current_turn == "Black":
+                self._apply_stockfish_move(stockfish_move)
+        
+        if self.puzzle_reply_due is not None and pygame.time.get_ticks() >= self.puzzle_reply_due:
+            self.puzzle_reply_due = None
+            self._play_uci(self.puzzle.reply())
+            self.game_info.update_turn(self.game.current_turn)
+            self.game_info.puzzle_lines = self.puzzle.status_lines()
+        
+        if self.stockfish:
+            engine_metrics = self.stockfish.metrics()
+            latency = f" ({engine_metrics.avg_ping_ms:.0f} ms)" if engine_metrics.avg_ping_ms is not None else ""
+            thinking = ", thinking" if self.pending_engine_move else ""
+            self.game_info.engine_status = f"Engine: {engine_metrics.health.name.title()}{latency}{thinking}"
+
+    def next_frame_deadline_ms(self) -> Optional[int]:
+        """How long the loop may sleep before something on screen changes by itself (None: until input)"""
+        deadlines = []
+        if self.game.state == GameState.PLAYING:
+            deadlines.append(self.game_info.ms_until_next_tick())
+        if self.live_analysis:
+            deadlines.append(self.analysis_panel.refresh_interval_ms)
+        if self.game_info.show_metrics:
+            deadlines.append(self.game_info.METRICS_REFRESH_MS)
+        if self.input_player and self.input_player.ms_until_next() is not None:
+            deadlines.append(self.input_player.ms_until_next())
+        if self.puzzle_reply_due is not None:
+            deadlines.append(max(0, self.puzzle_reply_due - pygame.time.get_ticks()))
+        return min(deadlines) if deadlines else None
+
+    def next_events(self) -> List[pygame.event.Event]:
+        """Wait for the next frame's events; a replayed script stands in for the player's input"""
+        events = self.scheduler.wait(self.next_frame_deadline_ms())
+        # Scripts are held while the board is locked, so replays do not depend on engine speed
+        locked = self.board_locked
+        if self.input_player:
+            events = [event for event in events if event.type not in SCRIPTED_EVENTS]
+            events.extend(self.input_player.due_events(locked))
+        if self.input_recorder:
+            self.input_recorder.record(events, locked)
+        return events
+
+    @property
+    def board_locked(self) -> bool:
+        """Whether the player has to wait: the engine is thinking, or a puzzle reply is due or it is solved"""
+        if self.pending_engine_move:
+            return True
+        return bool(self.puzzle and (self.puzzle.solved or self.puzzle_reply_due is not None))
+
+    @property
+    def replay_finished(self) -> bool:
+        """Whether a replayed script has run out and the engine is no longer thinking"""
+        return bool(self.input_player and self.input_player.finished and not self.pending_engine_move)
+
+    def toggle_metrics(self) -> None:
+        """Show or hide the timings overlay; showing it starts collecting timings"""
+        self.game_info.show_metrics = not self.game_info.show_metrics
+        if self.game_info.show_metrics:
+            metrics.enabled = True
+        self.full_redraw = True
+
+    def toggle_analysis(self) -> None:
+        """Start or stop the background engine analysis of the current position"""
+        self.full_redraw = True
+        if self.live_analysis:
+            self.live_analysis.stop()
+            self.live_analysis = None
+            self.analysis_panel = None
+            return
+
+        stockfish_path = get_stockfish_path()
+        if not os.path.exists(stockfish_path):
+            engine_log.warning("Analysis unavailable, Stockfish not found at: %s", stockfish_path)
+            return
+
+        self.live_analysis = LiveAnalysis(stockfish_path)
+        self.live_analysis.start()
+        self.analysis_panel = AnalysisPanel(
+            self.screen,
+            pygame.Rect(settings.ScreenSize[0] + 2, 10, 6, settings.ScreenSize[1] - 20),
+            pygame.Rect(self.game_info.x, self.game_info.rect.bottom + 10, self.game_info.width, self.ANALYSIS_LINES_HEIGHT)
+        )
+        self.analysis_position_key = None
+
+    def _update_analysis_position(self) -> None:
+        """Hand the analysis a new position whenever a move has been made"""
+        position_key = (len(self.game.move_history), self.game.current_turn, self.board.LastMove)
+        if position_key != self.analysis_position_key:
+            self.analysis_position_key = position_key
+            self.live_analysis.set_position(self._sync_chess_board())
 
     def _get_board_position(self, x: int, y: int) -> Tuple[int, int, int, int]:
         return self.board_positions[x][y]
     
+    def _open_journal(self, path: str, resume: Optional[JournalState]) -> None:
+        sync_policy = SyncPolicy[settings.journal_sync.upper()]
+        try:
+            if resume:
+                self.journal = resume_journal(path, resume, sync_policy, settings.journal_sync_interval)
+            else:
+                self.journal = start_journal(path, self.use_stockfish, self.stockfish_difficulty.value,
+                                             int(self.started_at.timestamp()), sync_policy,
+                                             settings.journal_sync_interval)
+        except OSError as e:
+            log.warning("Autosave disabled, cannot open journal: %s", e)
+
+    def _elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.clock_start) * 1000)
+
+    def _replay_moves(self, state: JournalState) -> None:
+        """Restore an unfinished game by replaying its journal"""
+        self.clock_start = time.monotonic() - (state.elapsed_ms[-1] / 1000.0 if state.elapsed_ms else 0.0)
+        for ply, uci in enumerate(state.moves):
+            move = chess.Move.from_uci(uci)
+            (from_x, from_y), (to_x, to_y) = self._chess_move_to_coords(move)
+            piece = self.board.getPiece(from_x, from_y)
+            if not piece or piece.Color.value != self.game.current_turn:
+                log.warning("Journal move %d (%s) does not fit the position, resuming before it", ply + 1, uci)
+                del state.moves[ply:]
+                del state.elapsed_ms[ply:]
+                break
+            self.board.previous_states.append(self.board.copy())
+            self._play_move(from_x, from_y, to_x, to_y, chess.piece_symbol(move.promotion) if move.promotion else None,
+                            timestamp=self.clock_start + state.elapsed_ms[ply] / 1000.0)
+            self.game.current_turn = "Black" if self.game.current_turn == "White" else "White"
+        
+        # Clocks: each side's time is the sum of the gaps before its own moves
+        previous_ms = 0
+        for ply, elapsed_ms in enumerate(state.elapsed_ms):
+            if ply % 2 == 0:
+                self.game_info.white_time += (elapsed_ms - previous_ms) / 1000.0
+            else:
+                self.game_info.black_time += (elapsed_ms - previous_ms) / 1000.0
+            previous_ms = elapsed_ms
+        self.clock_start = time.monotonic() - previous_ms / 1000.0
+        self.game_info.start_ticks = pygame.time.get_ticks() - previous_ms
+        self.game_info.current_turn = self.game.current_turn
+        
+        self.game.can_undo = bool(state.moves)
+        self.chess_board = self._sync_chess_board()
+        if self.game.current_turn == "Black" and self.use_stockfish:
+            self._request_stockfish_move()
+
+    def _play_move(self, from_x: int, from_y: int, to_x: int, to_y: int, promotion: Optional[str] = None,
+                   timestamp: Optional[float] = None) -> None:
+        """Apply a move to the board and record it in the move history and the journal"""
+        moving_piece = self.board.getPiece(from_x, from_y)
+        captured_piece = self.board.getPiece(to_x, to_y)
+        flags = MoveFlags.NONE
+        
+        if moving_piece.Type == PieceType.KING and abs(to_x - from_x) == 2 and to_y == from_y:
+            flags |= MoveFlags.CASTLING
+        elif moving_piece.Type == PieceType.PAWN and from_x != to_x and not captured_piece:
+            # En passant: the captured pawn stands beside the moving one
+            captured_piece = self.board.getPiece(to_x, from_y)
+            self.board.removePiece(to_x, from_y)
+            flags |= MoveFlags.EN_PASSANT
+        
+        self.board.movePiece(from_x, from_y, to_x, to_y)
+        
+        if flags & MoveFlags.CASTLING:
+            rook_from_x, rook_to_x = (7, 5) if to_x > from_x else (0, 3)
+            self.board.movePiece(rook_from_x, to_y, rook_to_x, to_y)
+        
+        promotion_type = 0
+        if promotion:
+            self.board.setPiece(to_x, to_y, pieces[moving_piece.Name[0] + promotion.upper()])
+            promotion_type = chess.PIECE_SYMBOLS.index(promotion)
+        
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        ply = self.game.move_history.append(
+            chess.square(from_x, 7 - from_y),
+            chess.square(to_x, 7 - to_y),
+            promotion_type,
+            CHESS_PIECE_TYPES[captured_piece.Type] if captured_piece else 0,
+            flags,
+            timestamp
+        )
+        if self.journal:
+            self.journal.append(self.game.move_history.uci(ply), int((timestamp - self.clock_start) * 1000))
+        metrics.count("moves")
+
     def _handle_piece_movement(self, x: int, y: int) -> None:
         if (x, y) in self.game.possible_moves:
             self.board.previous_states.append(self.board.copy())
             
             from_x, from_y = self.game.selected_coords
-            moving_piece = self.board.getPiece(from_x, from_y)
-            captured_piece = self.board.getPiece(x, y)
-            
-            is_castling = False
-            rook_move = None
-            if moving_piece.Type == PieceType.KING:
-                if abs(x - from_x) == 2 and y == from_y:
-                    is_castling = True
-                    if x > from_x:  
-                        rook_move = (7, y, 5, y)  
-                    else:  
-                        rook_move = (0, y, 3, y)  
-
-            move_record = {
-                'turn_number': len(self.game.move_history) // 2 + 1,
-                'player': self.game.current_turn,
-                'piece': moving_piece.Type.value,
-                'from': f"({from_x}, {from_y})",
-                'to': f"({x}, {y})",
-                'captured': captured_piece.Type.value if captured_piece else None,
-                'castling': is_castling,
-                'time': datetime.now().strftime('%H:%M:%S')
-            }
-            
-            self.board.movePiece(from_x, from_y, x, y)
-            
-            if is_castling and rook_move:
-                rx1, ry1, rx2, ry2 = rook_move
-                self.board.movePiece(rx1, ry1, rx2, ry2)
+            self._play_move(from_x, from_y, x, y)
             
             self.move_audio.play()
             
-            self.game.move_history.append(move_record)
-            
             self.chess_board = self._sync_chess_board()
             
+            if self.puzzle:
+                self._judge_puzzle_move()
+                return
+            
             if IsCheckMate(self.board, self.game.current_turn):
                 self.game.state = GameState.CHECKMATE_MENU
                 self.game.winner = "Black" if self.game.current_turn == "White" else "White"
@@ -374,47 +493,103 @@ class ChessBoard:
             self.game.can_undo = True
             
             if self.game.current_turn == "Black" and self.use_stockfish and self.game.state == GameState.PLAYING:
-                stockfish_move = self._get_stockfish_move()
-                if stockfish_move:
-                    from_coords, to_coords = self._chess_move_to_coords(stockfish_move)
-                    
-                    from_x, from_y = from_coords
-                    to_x, to_y = to_coords
-                    moving_piece = self.board.getPiece(from_x, from_y)
-                    captured_piece = self.board.getPiece(to_x, to_y)
-                    
-                    move_record = {
-                        'turn_number': len(self.game.move_history) // 2 + 1,
-                        'player': "Black",
-                        'piece': moving_piece.Type.value,
-                        'from': f"({from_x}, {from_y})",
-                        'to': f"({to_x}, {to_y})",
-                        'captured': captured_piece.Type.value if captured_piece else None,
-                        'time': datetime.now().strftime('%H:%M:%S')
-                    }
-                    
-                    self.board.movePiece(from_x, from_y, to_x, to_y)
-                    
-                    self.move_audio.play()
-                    
-                    self.game.move_history.append(move_record)
-                    
-                    self.chess_board = self._sync_chess_board()
-                    
-                    if IsCheckMate(self.board, "White"):
-                        self.game.state = GameState.CHECKMATE_MENU
-                        self.game.winner = "Black"
-                        self._save_game_history()
-                        return
-                    
-                    self.game.current_turn = "White"
-                    self.game_info.update_turn(self.game.current_turn)
-                else:
-                    self.game.current_turn = "White"
-                    self.game_info.update_turn(self.game.current_turn)
+                self._request_stockfish_move()
         else:
             self._handle_piece_selection(x, y)
 
+    def _play_uci(self, uci: str) -> None:
+        """Play a move given in UCI notation for the side to move and pass the turn"""
+        move = chess.Move.from_uci(uci)
+        (from_x, from_y), (to_x, to_y) = self._chess_move_to_coords(move)
+        self._play_move(from_x, from_y, to_x, to_y, chess.piece_symbol(move.promotion) if move.promotion else None)
+        self.move_audio.play()
+        self.game.current_turn = "Black" if self.game.current_turn == "White" else "White"
+        self.chess_board = self._sync_chess_board()
+
+    def _next_puzzle(self) -> None:
+        """Set up a random puzzle from the store, within the configured rating band if there is one"""
+        low, high = settings.puzzle_rating_range
+        for _ in range(self.PUZZLE_DRAWS):
+            puzzle = self.puzzles.random(low, high) or self.puzzles.random()
+            if puzzle is None:
+                break
+            try:
+                attempt = PuzzleAttempt(puzzle)
+            except ValueError as e:
+                log.warning("Skipping puzzle: %s", e)
+                continue
+            self._start_puzzle(attempt)
+            return
+        self.puzzle = None
+        self.game_info.puzzle_lines = ["No puzzles available"]
+
+    def _start_puzzle(self, attempt: PuzzleAttempt) -> None:
+        """Show the puzzle's position and play the opponent's move that sets it up"""
+        self.puzzle = attempt
+        self.puzzle_reply_due = None
+        self.game = GameContext(current_turn=self.board.loadFen(attempt.puzzle.fen),
+                                move_history=MoveHistory(attempt.puzzle.fen))
+        self._play_uci(attempt.setup_move)
+        self.game_info.reset_clocks()
+        self.game_info.current_turn = self.game.current_turn
+        self.game_info.puzzle_lines = attempt.status_lines()
+        self.full_redraw = True
+
+    def _judge_puzzle_move(self) -> None:
+        """Compare the player's move with the puzzle's solution; a wrong move is taken back"""
+        record = self.game.move_history[-1]
+        uci = record.uci
+        to_x, to_y = chess.square_file(record.to_square), 7 - chess.square_rank(record.to_square)
+        piece = self.board.getPiece(to_x, to_y)
+        if piece.Type == PieceType.PAWN and to_y in (0, 7):
+            # There is no promotion picker on the board, so the pawn becomes the solution's piece
+            promotion = self.puzzle.promotion_for(uci)
+            self.board.setPiece(to_x, to_y, pieces[piece.Name[0] + promotion.upper()])
+            self.game.move_history.set_promotion(-1, chess.PIECE_SYMBOLS.index(promotion))
+            uci += promotion
+        
+        self.game.selected_coords = (-1, -1)
+        self.game.possible_moves = []
+        opponent = "Black" if self.game.current_turn == "White" else "White"
+        if self.puzzle.check(uci, IsCheckMate(self.board, opponent)):
+            self.game.current_turn = opponent
+            self.game_info.update_turn(opponent)
+            if not self.puzzle.solved:
+                self.puzzle_reply_due = pygame.time.get_ticks() + self.PUZZLE_REPLY_DELAY_MS
+        else:
+            self.game.move_history.truncate(len(self.game.move_history) - 1)
+            self.board.loadFen(self.game.move_history.board().fen())
+        self.chess_board = self._sync_chess_board()
+        self.game_info.puzzle_lines = self.puzzle.status_lines()
+
+    def _show_puzzle_hint(self) -> None:
+        """Select the piece the solution moves next"""
+        if self.board_locked or not self.puzzle:
+            return
+        (x, y), _ = self._chess_move_to_coords(chess.Move.from_uci(self.puzzle.expected))
+        self.game.selected_coords = (x, y)
+        self.game.possible_moves = GetMovements(self.board, x, y)
+
+    def _apply_stockfish_move(self, stockfish_move: Optional[chess.Move]) -> None:
+        """Play the move Stockfish returned for Black"""
+        if stockfish_move:
+            (from_x, from_y), (to_x, to_y) = self._chess_move_to_coords(stockfish_move)
+            promotion = chess.piece_symbol(stockfish_move.promotion) if stockfish_move.promotion else None
+            self._play_move(from_x, from_y, to_x, to_y, promotion)
+            
+            self.move_audio.play()
+            
+            self.chess_board = self._sync_chess_board()
+            
+            if IsCheckMate(self.board, "White"):
+                self.game.state = GameState.CHECKMATE_MENU
+                self.game.winner = "Black"
+                self._save_game_history()
+                return
+        
+        self.game.current_turn = "White"
+        self.game_info.update_turn(self.game.current_turn)
+
     def _handle_piece_selection(self, x: int, y: int) -> None:
         """Handle selecting a piece on the board."""
         piece = self.board.getPiece(x, y)
@@ -424,9 +599,9 @@ class ChessBoard:
             if piece and piece.Color.value == self.game.current_turn:
                 self.game.selected_coords = (x, y)
                 self.game.possible_moves = GetMovements(self.board, x, y)
-                print(f"Selected piece at ({x}, {y}), found {len(self.game.possible_moves)} possible moves")
+                log.debug("Selected piece at (%d, %d), found %d possible moves", x, y, len(self.game.possible_moves))
             else:
-                print(f"Invalid selection: {'no piece' if not piece else 'wrong color'}")
+                log.debug("Invalid selection: %s", "no piece" if not piece else "wrong color")
         # If a piece is already selected, try to move it
         else:
             if (x, y) in self.game.possible_moves:
@@ -435,12 +610,13 @@ class ChessBoard:
                 # Select new piece
                 self.game.selected_coords = (x, y)
                 self.game.possible_moves = GetMovements(self.board, x, y)
-                print(f"Selected new piece at ({x}, {y}), found {len(self.game.possible_moves)} possible moves")
+                log.debug("Selected new piece at (%d, %d), found %d possible moves", x, y,
+                          len(self.game.possible_moves))
             else:
                 # Clear selection
                 self.game.selected_coords = (-1, -1)
                 self.game.possible_moves = []
-                print("Cleared selection")
+                log.debug("Cleared selection")
 
     def _handle_piece_move(self, x: int, y: int) -> None:
         """Handle moving a piece on the board."""
@@ -460,7 +636,7 @@ class ChessBoard:
 
         # Move the piece
         if self.board.movePiece(self.game.selected_coords[0], self.game.selected_coords[1], x, y):
-            print(f"Moving {selected_piece.Type} from {self.game.selected_coords} to ({x}, {y})")
+            log.debug("Moving %s from %s to (%d, %d)", selected_piece.Type, self.game.selected_coords, x, y)
             
             # Clear selection and possible moves
             self.game.selected_coords = (-1, -1)
@@ -471,103 +647,69 @@ class ChessBoard:
             
             # If AI mode is enabled and it's AI's turn
             if self.game.current_turn == "Black" and self.use_stockfish and self.game.state == GameState.PLAYING:
-                stockfish_move = self._get_stockfish_move()
-                if stockfish_move:
-                    from_coords, to_coords = self._chess_move_to_coords(stockfish_move)
-                    
-                    from_x, from_y = from_coords
-                    to_x, to_y = to_coords
-                    moving_piece = self.board.getPiece(from_x, from_y)
-                    captured_piece = self.board.getPiece(to_x, to_y)
-                    
-                    move_record = {
-                        'turn_number': len(self.game.move_history) // 2 + 1,
-                        'player': "Black",
-                        'piece': moving_piece.Type.value,
-                        'from': f"({from_x}, {from_y})",
-                        'to': f"({to_x}, {to_y})",
-                        'captured': captured_piece.Type.value if captured_piece else None,
-                        'time': datetime.now().strftime('%H:%M:%S')
-                    }
-                    
-                    self.board.movePiece(from_x, from_y, to_x, to_y)
-                    
-                    self.move_audio.play()
-                    
-                    self.game.move_history.append(move_record)
-                    
-                    self.chess_board = self._sync_chess_board()
-                    
-                    if IsCheckMate(self.board, "White"):
-                        self.game.state = GameState.CHECKMATE_MENU
-                        self.game.winner = "Black"
-                        self._save_game_history()
-                        return
-                    
-                    self.game.current_turn = "White"
-                    self.game_info.update_turn(self.game.current_turn)
+                self._request_stockfish_move()
 
     def _save_game_history(self) -> None:
-        """Save the game history to a file"""
-        # Create games directory if it doesn't exist
-        games_dir = os.path.join(os.path.dirname(__file__), "games")
-        os.makedirs(games_dir, exist_ok=True)
-        
-        # Generate filename with timestamp
-        filename = f"game_{self.start_time}.txt"
-        filepath = os.path.join(games_dir, filename)
-        
-        # Write game history to file
-        with open(filepath, "w") as f:
-            f.write(f"Game played on {self.start_time}\n")
-            f.write(f"Winner: {self.game.winner}\n\n")
-            f.write("Move History:\n")
-            for move in self.game.move_history:
-                piece = move['piece']
-                # Handle string piece representation
-                if isinstance(piece, str):
-                    color = 'White' if piece[0] == 'W' else 'Black'
-                    piece_type = piece[1:]  # Remove W/B prefix
-                else:
-                    color = piece.Color.value
-                    piece_type = piece.Type.value
-                    
-                f.write(f"{color}'s {piece_type} from ({move['from'][0]}, {move['from'][1]}) "
-                       f"to ({move['to'][0]}, {move['to'][1]})\n")
-            f.write(f"\nFinal FEN: {self.chess_board.fen()}")
+        """Append the finished game to the game archive"""
+        os.makedirs(GAMES_DIR, exist_ok=True)
+        
+        result = {"White": "1-0", "Black": "0-1"}.get(self.game.winner, "*")
+        opponent = f"Stockfish ({self.stockfish_difficulty.name.title()})" if self.use_stockfish else "Player"
+        game = ArchivedGame(
+            white="Player",
+            black=opponent,
+            result=result,
+            played_at=int(self.started_at.timestamp()),
+            moves=self.game.move_history.uci_moves()
+        )
+        try:
+            append_game(os.path.join(GAMES_DIR, DEFAULT_ARCHIVE_NAME), game)
+        except (OSError, ValueError) as e:
+            log.error("Error saving game: %s", e)
+            return
+        
+        # Archived, so there is nothing left to resume
+        if self.journal:
+            self.journal.discard()
+            self.journal = None
+
+        # Also index it for position queries; the archive stays the source of truth
+        import sqlite3
+        from GameDatabase import GameDatabase, DEFAULT_DATABASE_NAME
+        try:
+            with GameDatabase(os.path.join(GAMES_DIR, DEFAULT_DATABASE_NAME)) as database:
+                database.add_game(game)
+        except (sqlite3.Error, ValueError, OSError) as e:
+            log.error("Error indexing game: %s", e)
+    
+    def _dump_metrics(self) -> None:
+        """Write this game's timings and counters to metrics/"""
+        path = os.path.join(METRICS_DIR, f"game_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            metrics.dump_json(path)
+            log.info("Metrics written to %s", path)
+        except OSError as e:
+            log.error("Error writing metrics: %s", e)
     
+    @timed("sync_chess_board")
     def _sync_chess_board(self) -> chess.Board:
         board = chess.Board()
         board.clear()  
         
-        piece_map = {
-            PieceType.PAWN: chess.PAWN,
-            PieceType.KNIGHT: chess.KNIGHT,
-            PieceType.BISHOP: chess.BISHOP,
-            PieceType.ROOK: chess.ROOK,
-            PieceType.QUEEN: chess.QUEEN,
-            PieceType.KING: chess.KING
-        }
-        
-        print("\nCurrent board state:")  
-        self.board.printBoard()  
-        
-        print("\nSyncing board state:")  
         for y in range(8):
             for x in range(8):
                 piece = self.board.getPiece(x, y)
                 if piece:
                     square = chess.square(x, 7 - y)  
                     color = chess.WHITE if piece.Color.value == "White" else chess.BLACK
-                    piece_type = piece_map[piece.Type]
+                    piece_type = CHESS_PIECE_TYPES[piece.Type]
                     board.set_piece_at(square, chess.Piece(piece_type, color))
-                    print(f"Placed {piece.Color.value} {piece.Type.value} at ({x}, {y}) -> square {square}")  
         
         board.turn = chess.BLACK if self.game.current_turn == "Black" else chess.WHITE  
         
-        print("\nFinal chess board state:")
-        print(board)
-        print(f"Final FEN: {board.fen()}")  
+        if sync_log.debug_enabled:
+            sync_log.debug("Synced board from:\n%s\nto %s", self.board.boardText(), board.fen())
         
         return board
 
@@ -583,11 +725,12 @@ class ChessBoard:
         return ((from_x, from_y), (to_x, to_y))
 
     def _get_stockfish_notation(self):
+        chess_moves = self.game.move_history.uci_moves()
         moves_text = ""
-        for i in range(0, len(self.chess_moves), 2):
+        for i in range(0, len(chess_moves), 2):
             move_number = i // 2 + 1
-            white_move = self.chess_moves[i]
-            black_move = self.chess_moves[i + 1] if i + 1 < len(self.chess_moves) else ""
+            white_move = chess_moves[i]
+            black_move = chess_moves[i + 1] if i + 1 < len(chess_moves) else ""
             
             if black_move:
                 moves_text += f"{move_number}. {white_move} {black_move} "
@@ -639,7 +782,9 @@ class ChessBoard:
         self.move_audio.play()
         
         if self.game.move_history:
-            self.game.move_history[-1]['promotion'] = new_piece.Name
+            self.game.move_history.set_promotion(-1, CHESS_PIECE_TYPES[new_piece.Type])
+            if self.journal:
+                self.journal.rewrite_last(self.game.move_history.uci(-1), self._elapsed_ms())
 
         self.game.selected_coords = (-1, -1)
         self.game.possible_moves = []
@@ -654,15 +799,37 @@ class ChessBoard:
     def _handle_events(self, event: pygame.event.Event) -> bool:
         if event.type == pygame.QUIT:
             return False
+        
+        # The window contents were lost (e.g. uncovered or restored)
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            self.full_redraw = True
             
         if self.game.state == GameState.CHECKMATE_MENU:
             if self.main_menu_button.handle_event(event):
                 return False  
             elif self.quit_button.handle_event(event):
+                self.cleanup()
                 sys.exit()
             return True
             
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_a:
+            self.toggle_analysis()
+            return True
+        
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+            self.toggle_metrics()
+            return True
+        
+        if self.puzzles and event.type == pygame.KEYDOWN and event.key == pygame.K_n:
+            self._next_puzzle()
+            return True
+        
+        if self.puzzles and event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+            self._show_puzzle_hint()
+            return True
+            
+        # The board is locked while Stockfish is thinking or a puzzle move is being answered
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not self.board_locked:
             mouse_x, mouse_y = event.pos
             board_x = mouse_x // settings.SlotSize
             board_y = mouse_y // settings.SlotSize
@@ -675,58 +842,98 @@ class ChessBoard:
         
         return True
 
+    def _draw_square(self, x: int, y: int, move_indicators: Set[Tuple[int, int]]) -> pygame.Rect:
+        """Draw one board square with its piece and move indicator"""
+        rect = self._get_board_position(x, y)
+        self.screen.blit(self.board_surface, rect, area=rect)
+
+        piece = self.board.getPiece(x, y)
+        if piece:
+            piece_img = self.piece_images[piece.Name]
+            self.screen.blit(piece_img, rect)
+
+        if (x, y) in move_indicators:
+            circle_x = rect[0] + rect[2] // 2
+            circle_y = rect[1] + rect[3] // 2
+            circle_radius = rect[2] // 4
+            
+            pygame.draw.circle(
+                self.screen,
+                self.move_indicator,
+                (circle_x, circle_y),
+                circle_radius,
+                2
+            )
+        return pygame.Rect(rect)
+
+    def _changed_squares(self, move_indicators: Set[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """Squares whose piece or move indicator differs from what is on screen"""
+        changed = move_indicators ^ self.drawn_move_indicators
+        for y, (row, drawn_row) in enumerate(zip(self.board.board, self.drawn_board)):
+            if row != drawn_row:
+                changed.update((x, y) for x in range(self.BOARD_SIZE) if row[x] != drawn_row[x])
+        return changed
+
+    @timed("draw")
     def draw(self) -> None:
-        self.screen.fill((255, 255, 255))
+        """Repaint whatever changed since the last frame and push only those areas to the display"""
+        move_indicators = set(self.game.possible_moves) if self.game.selected_coords != (-1, -1) else set()
+        squares = self._changed_squares(move_indicators) if not self.full_redraw else set()
+        info_changed = self.game_info.needs_redraw()
+        if self.live_analysis:
+            self._update_analysis_position()
         
-        for x in range(self.BOARD_SIZE):
-            for y in range(self.BOARD_SIZE):
-                rect = self._get_board_position(x, y)
-                color = self.light_square if (x + y) % 2 == 0 else self.dark_square
-                pygame.draw.rect(self.screen, color, rect)
-
-                piece = self.board.getPiece(x, y)
-                if piece:
-                    piece_img = self.piece_images[piece.Name]
-                    self.screen.blit(piece_img, rect)
-
-        if self.game.selected_coords != (-1, -1):
-            for move_x, move_y in self.game.possible_moves:
-                rect = self._get_board_position(move_x, move_y)
-                circle_x = rect[0] + rect[2] // 2
-                circle_y = rect[1] + rect[3] // 2
-                circle_radius = rect[2] // 4
-                
-                pygame.draw.circle(
-                    self.screen,
-                    self.move_indicator,
-                    (circle_x, circle_y),
-                    circle_radius,
-                    2
-                )
+        # Anything changing under the checkmate overlay means repainting the whole frame
+        if self.game.state == GameState.CHECKMATE_MENU:
+            overlay_key = (self.main_menu_button.hover, self.quit_button.hover)
+            if overlay_key != self.drawn_overlay_key or squares or info_changed:
+                self.full_redraw = True
+            self.drawn_overlay_key = overlay_key
         
-        self.game_info.draw()
+        full_redraw = self.full_redraw
+        if full_redraw:
+            self.screen.fill((255, 255, 255))
+            squares = {(x, y) for x in range(self.BOARD_SIZE) for y in range(self.BOARD_SIZE)}
         
-        if self.game.state == GameState.CHECKMATE_MENU:
+        dirty_rects = [self._draw_square(x, y, move_indicators) for x, y in squares]
+        
+        if full_redraw or info_changed:
+            self.game_info.draw()
+            dirty_rects.append(self.game_info.rect)
+        
+        if self.live_analysis:
+            if self.analysis_panel.draw(self.live_analysis, force=full_redraw or info_changed):
+                dirty_rects.extend(self.analysis_panel.rects)
+        
+        if full_redraw and self.game.state == GameState.CHECKMATE_MENU:
             overlay = pygame.Surface((self.width, self.height))
             overlay.fill((0, 0, 0))
             overlay.set_alpha(128)
             self.screen.blit(overlay, (0, 0))
             
-            font = pygame.font.Font(None, 74)
             text = f"Checkmate! {self.game.winner} wins!"
-            text_surface = font.render(text, True, (255, 255, 255))
+            text_surface = render_text(get_font(None, 74), text, (255, 255, 255))
             text_rect = text_surface.get_rect(center=(self.width // 2, self.height // 3))
             self.screen.blit(text_surface, text_rect)
             
             self.main_menu_button.draw(self.screen)
             self.quit_button.draw(self.screen)
         
-        pygame.display.flip()
+        self.drawn_board = [list(row) for row in self.board.board]
+        self.drawn_move_indicators = move_indicators
+        self.full_redraw = False
+        
+        if self.headless:
+            return
+        if full_redraw:
+            pygame.display.flip()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
 
     def run(self) -> None:
         running = True
         while running:
-            for event in pygame.event.get():
+            for event in self.next_events():
                 if event.type == pygame.QUIT:
                     running = False
                     break
@@ -734,25 +941,68 @@ class ChessBoard:
                 if not self._handle_events(event):  
                     running = False
             
+            self.update()
             self.draw()
-            pygame.display.flip()
-            self.clock.tick(60)
     
     def cleanup(self):
         """Clean up resources before exit"""
+        if metrics.enabled:
+            self._dump_metrics()
+        if self.live_analysis:
+            self.live_analysis.stop()
+            self.live_analysis = None
         if self.stockfish:
-            try:
-                self.stockfish.quit(timeout=2.0)  # Add timeout to quit command
-            except Exception as e:
-                print(f"Error cleaning up Stockfish: {e}")
-                try:
-                    # Force terminate if quit fails
-                    self.stockfish.close()
-                except:
-                    pass
+            self.stockfish.stop()
             self.stockfish = None
+        if self.journal:
+            self.journal.close()  # Kept, so the game can be resumed from the menu
+            self.journal = None
+        if self.input_recorder:
+            try:
+                self.input_recorder.save()
+            except OSError as e:
+                log.error("Error saving input script: %s", e)
+            self.input_recorder = None
+        if self.profiler:
+            self.profiler.stop()
+            self.profiler = None
+
+def _open_puzzle_store() -> Optional[PuzzleStore]:
+    """The puzzle store in games/, built from the bundled sample puzzles if there is none yet"""
+    path = os.path.join(GAMES_DIR, DEFAULT_STORE_NAME)
+    try:
+        if not os.path.exists(path):
+            os.makedirs(GAMES_DIR, exist_ok=True)
+            build_from_csv([SAMPLE_PUZZLES], path)
+        return PuzzleStore(path)
+    except (OSError, ValueError) as e:
+        log.error("Puzzles unavailable: %s", e)
+        return None
+
+def _parse_args() -> "argparse.Namespace":
+    import argparse
+    parser = argparse.ArgumentParser(description="Chess AI")
+    parser.add_argument("--startup-profile", action="store_true", help="report how long each startup phase takes")
+    parser.add_argument("--metrics", action="store_true", help="collect hot-path timings from the start")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each game session into profiles/, grouped by subsystem")
+    parser.add_argument("--record", metavar="SCRIPT", help="record the next game's input to a JSON script")
+    parser.add_argument("--replay", metavar="SCRIPT", help="play a recorded script as a new game, then exit")
+    parser.add_argument("--log", metavar="LEVELS", default=settings.log_levels,
+                        help='log levels, e.g. "info,movegen=debug" (default: settings.log_levels)')
+    parser.add_argument("--log-file", metavar="PATH", default=settings.log_file,
+                        help="also write the log to PATH, from a background thread")
+    # parse_known_args: macOS passes a process serial number to app bundles
+    return parser.parse_known_args()[0]
 
 def main() -> None:
+    args = _parse_args()
+    try:
+        configure_logging(args.log, args.log_file)
+    except (ValueError, OSError) as e:
+        print(f"Error setting up logging: {e}")
+        return
+    
     # Set up working directory for macOS app bundle
     if getattr(sys, 'frozen', False):
         if hasattr(sys, '_MEIPASS'):
@@ -763,56 +1013,126 @@ def main() -> None:
                 resources_dir = os.path.join(bundle_dir, '..', 'Resources')
                 os.chdir(resources_dir)
 
-    # Show splash screen immediately
-    splash = SplashScreen(settings.ScreenSize)
-    splash.update()
+    # Collect hot-path timings from the start (otherwise they start when the M overlay is first shown)
+    if args.metrics:
+        metrics.enabled = True
     
-    # Initialize pygame after showing splash screen
-    pygame.init()
-    screen = pygame.display.set_mode(settings.ScreenSize)
-    pygame.display.set_caption("Chess AI")
+    replay = None
+    if args.replay:
+        try:
+            replay = InputPlayer(args.replay)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading input script: {e}")
+            return
+
+    # Locate, download and start Stockfish in the background while the menu is up
+    with startup_profile.phase("start engine provisioning"):
+        provisioner = EngineProvisioner()
+        provisioner.start()
+
+    # Show splash screen immediately (this also initializes pygame and the window)
+    with startup_profile.phase("splash screen"):
+        splash = SplashScreen(settings.ScreenSize)
+        splash.update()
     
-    # Keep splash screen visible during resource loading
-    for _ in range(10):  # Show splash for a short time
+    # The splash stays up exactly as long as the menu's and board's resources take to load
+    with startup_profile.phase("load resources"):
+        get_piece_sprites(settings.SlotSize)
+        get_piece_sprites(GameInfo.PIECE_SIZE)
+        get_background_gradient(settings.ScreenSize)
         splash.update()
-        pygame.time.wait(50)
+    
+    screen = splash.screen
+    pygame.display.set_caption("Chess AI")
 
+    journal_path = os.path.join(GAMES_DIR, JOURNAL_NAME)
+    puzzles: Optional[PuzzleStore] = None  # Opened the first time puzzles are chosen, then kept
     while True:
-        menu = MainMenu(screen)
-        game_settings = menu.run()
+        if replay:
+            # The recorded game's settings instead of the menu
+            unfinished = None
+            game_settings = GameSettings(use_stockfish=replay.game_settings.get("use_stockfish", False))
+            difficulty = replay.game_settings.get("stockfish_difficulty")
+            if difficulty in StockfishDifficulty.__members__:
+                game_settings.stockfish_difficulty = StockfishDifficulty[difficulty]
+        else:
+            # A game that was quit (or crashed) before it ended can be resumed from the menu
+            unfinished = read_journal(journal_path)
+            if unfinished and not unfinished.moves:
+                unfinished = None
+            menu = MainMenu(screen, can_resume=unfinished is not None)
+            if startup_profile.enabled:
+                with startup_profile.phase("first menu frame"):
+                    menu.draw()
+                startup_profile.report()
+            game_settings = menu.run()
         
         if game_settings is None:  
             break
+        
+        resume = unfinished if game_settings.resume else None
+        if game_settings.puzzles:
+            puzzles = puzzles or _open_puzzle_store()
+            if not puzzles:
+                continue
+            game_settings.use_stockfish = False
+        if resume:
+            game_settings.use_stockfish = resume.use_stockfish
+            try:
+                game_settings.stockfish_difficulty = StockfishDifficulty(resume.difficulty)
+            except ValueError:
+                pass  # Keep the menu's difficulty
             
+        stockfish = None
         if game_settings.use_stockfish:
-            loading_screen = LoadingScreen(settings.ScreenSize)
+            if provisioner.state == ProvisioningState.FAILED:
+                provisioner.start()  # Try again, e.g. the network is back
             
-            def progress_callback(progress):
-                loading_screen.update(progress)
-                pygame.time.wait(10)  # Small delay to ensure loading screen updates
+            # Only shown if the player was quicker than the background provisioning
+            if not provisioner.is_finished():
+                loading_screen = LoadingScreen(settings.ScreenSize, "Preparing Stockfish...")
+                loading_clock = pygame.time.Clock()
+                while not provisioner.is_finished():
+                    loading_screen.update(provisioner.progress)
+                    loading_clock.tick(30)
             
-            stockfish_path = download_stockfish(progress_callback)
-            
-            if not stockfish_path:
-                print("Failed to download Stockfish. AI opponent will be disabled.")
+            stockfish = provisioner.take_supervisor()
+            if not stockfish:
+                engine_log.warning("%s. AI opponent will be disabled.", provisioner.error)
                 game_settings.use_stockfish = False
-            else:
-                # Give user feedback that Stockfish is ready
-                loading_screen.update(100)
-                pygame.time.wait(500)  # Show 100% completion briefly
+        
+        if args.profile:
+            from SessionProfiler import SessionProfiler
+            profiler = SessionProfiler(PROFILES_DIR)
+            profiler.start()
         
         game = ChessBoard(
             use_stockfish=game_settings.use_stockfish,
-            stockfish_difficulty=game_settings.stockfish_difficulty
+            stockfish_difficulty=game_settings.stockfish_difficulty,
+            stockfish=stockfish,
+            journal_path=None if replay or game_settings.puzzles else journal_path,  # A replay leaves the autosave alone
+            resume=resume,
+            puzzles=puzzles if game_settings.puzzles else None
         )
+        if args.profile:
+            game.profiler = profiler
+        if replay:
+            game.input_player = replay
+        elif args.record and not resume and not game_settings.puzzles:
+            game.input_recorder = InputRecorder(args.record, {
+                "use_stockfish": game_settings.use_stockfish,
+                "stockfish_difficulty": game_settings.stockfish_difficulty.name
+            })
+            args.record = None  # One game per script
         
         running = True
-        clock = pygame.time.Clock()
         
         while running:
-            for event in pygame.event.get():
+            for event in game.next_events():
                 if event.type == pygame.QUIT:
                     running = False
+                    game.cleanup()
+                    provisioner.shutdown()
                     pygame.quit()
                     sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -821,9 +1141,10 @@ def main() -> None:
                 if not game._handle_events(event):  
                     running = False
             
+            game.update()
             game.draw()
-            pygame.display.flip()
-            clock.tick(60)
+            if game.replay_finished:
+                running = False
             
             # Remove the automatic return to main menu
             # if game.game.state == GameState.CHECKMATE_MENU:
@@ -831,7 +1152,12 @@ def main() -> None:
             #     running = False
         
         game.cleanup()
+        if replay:
+            break
 
+    if puzzles:
+        puzzles.close()
+    provisioner.shutdown()
     pygame.quit()
     sys.exit()
 
@@ -3,4 +3,16 @@ BoardSize = (8, 8)
 ScreenSize = (640, 640)  # Added 60 pixels for the turn indicator panel
 
 # Stockfish settings
-use_stockfish = True  # Enable/disable Stockfish AI
\ No newline at end of file
+use_stockfish = True  # Enable/disable Stockfish AI
+
+# Autosave journal: "never", "interval" or "always" fsync after a move (see GameJournal.SyncPolicy)
+journal_sync = "interval"
+journal_sync_interval = 2.0  # Seconds, for "interval"
+
+# Diagnostics: a default level plus per-channel levels, e.g. "info,movegen=debug,sync=debug"
+# Channels: game, board, movegen, sync, engine, download
+log_levels = "warning"
+log_file = None  # e.g. "logs/chessai.log", written from a background thread
+
+# Puzzle mode: rating band of the puzzles drawn from games/puzzles.chpz (build it with `python -m chessai puzzles`)
+puzzle_rating_range = (400, 1800)